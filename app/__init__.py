@@ -4,6 +4,9 @@ import os
 from datetime import datetime, timedelta
 import logging
 from app.models.prediction import db
+from app.models.migrations import check_indexes, migrate_at_startup
+from app.models.sqlite_profile import READONLY_BIND, apply_sqlite_profile, readonly_url
+from app.models.database import database_url, engine_options
 from app.routes.main import main_bp
 from app.routes.predictions import predictions_bp
 from app.routes.api import api_bp
@@ -13,14 +16,21 @@ def create_app(test_config=None):
     """Create and configure the Flask application"""
     app = Flask(__name__, instance_relative_config=True)
     
-    # Configure the app
+    # Configure the app; DATABASE_URL selects the database, SQLite app.db by default
+    database_uri = database_url()
     app.config.from_mapping(
         SECRET_KEY=os.environ.get('SECRET_KEY', 'dev'),
-        SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app.db')}",
+        SQLALCHEMY_DATABASE_URI=database_uri,
+        SQLALCHEMY_ENGINE_OPTIONS=engine_options(database_uri),
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
         SPORTRADAR_API_KEY=os.environ.get('SPORTRADAR_API_KEY', '')
     )
     
+    # GET requests read through a read-only connection to the same SQLite file
+    readonly = readonly_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if readonly and os.environ.get('SQLITE_READONLY_GETS', '1') == '1':
+        app.config['SQLALCHEMY_BINDS'] = {READONLY_BIND: readonly}
+    
     # Configure logging
     logging.basicConfig(
         level=logging.INFO,
@@ -40,8 +50,13 @@ def create_app(test_config=None):
     app.register_blueprint(api_bp, url_prefix='/api')
     app.register_blueprint(import_bp, url_prefix='/import')  # Added this line inside the function
     
-    # Create database tables
+    # Create database tables, apply pending schema migrations (DB_AUTO_MIGRATE=0 only
+    # reports them) and report indexes that `flask migrate-db` would add
     with app.app_context():
+        for bind_key, engine in db.engines.items():
+            apply_sqlite_profile(engine, read_only=(bind_key == READONLY_BIND))
         db.create_all()
+        migrate_at_startup(db.engine, apply=os.environ.get('DB_AUTO_MIGRATE', '1') == '1')
+        check_indexes(db.engine)
     
     return app
@@ -0,0 +1,132 @@
+import logging
+from collections import defaultdict
+
+import numpy as np
+
+from app.api.probability import ProbabilityEngine
+
+logger = logging.getLogger('batch_inference')
+
+# Columns of the feature matrix built from each prediction input
+FEATURE_COLUMNS = ('season_avg', 'last_5_avg', 'opponent_defense_rank', 'days_rest', 'is_home', 'line')
+COLUMN = {name: i for i, name in enumerate(FEATURE_COLUMNS)}
+
+CONFIDENCE_LEVELS = np.array(['Low', 'Medium', 'High'])
+
+def placeholder_model(matrix, rng):
+    """
+    Placeholder prediction model, applied to a whole feature matrix at once
+
+    Args:
+        matrix (np.ndarray): Feature matrix with FEATURE_COLUMNS as columns
+        rng (np.random.Generator): Source of the model's noise
+
+    Returns:
+        np.ndarray: Predicted stat values
+    """
+    # Base prediction on season average and last 5 average
+    base_prediction = 0.6 * matrix[:, COLUMN['season_avg']] + 0.4 * matrix[:, COLUMN['last_5_avg']]
+
+    # Adjust for opponent defense (1 = best defense, 30 = worst), home advantage and rest
+    defense_factor = 0.9 + (matrix[:, COLUMN['opponent_defense_rank']] / 30) * 0.2
+    home_factor = np.where(matrix[:, COLUMN['is_home']] > 0, 1.03, 0.97)
+    rest_factor = 1.0 + np.minimum(matrix[:, COLUMN['days_rest']] - 1, 3) * 0.01
+
+    predicted = base_prediction * defense_factor * home_factor * rest_factor
+
+    # Add some noise
+    predicted *= 0.95 + 0.1 * rng.random(len(matrix))
+
+    return np.maximum(predicted, 0.0)
+
+def confidence_levels(over_probability):
+    """
+    Confidence level of each prediction from its edge over a coin flip
+
+    Args:
+        over_probability (np.ndarray): Probabilities of going over the line
+
+    Returns:
+        np.ndarray: 'High' for an edge of 0.2 or more, 'Medium' for 0.1 or more, otherwise 'Low'
+    """
+    edge = np.abs(over_probability - 0.5)
+    return CONFIDENCE_LEVELS[(edge >= 0.1).astype(int) + (edge >= 0.2).astype(int)]
+
+class BatchInferenceEngine:
+    """
+    Scores prediction inputs in batches, one feature matrix per sport and stat type
+    """
+
+    def __init__(self, model=None, seed=None, probabilities=None):
+        """
+        Initialize the engine
+
+        Args:
+            model (callable): model(matrix, rng) returning predicted values. Defaults to placeholder_model.
+            seed (int): Seed for the model's noise, for reproducible runs
+            probabilities (ProbabilityEngine): Turns predicted values into over probabilities
+        """
+        self.model = model or placeholder_model
+        self.rng = np.random.default_rng(seed)
+        self.probabilities = probabilities or ProbabilityEngine()
+
+    def build_batches(self, prediction_inputs):
+        """
+        Group prediction inputs by sport and stat type and build their feature matrices
+
+        Inputs with missing or malformed features are logged and left out.
+
+        Args:
+            prediction_inputs (list): PredictionInput records from LiveDataPipeline.prepare_prediction_input
+
+        Returns:
+            dict: {(sport, stat_type): (indices into prediction_inputs, feature matrix)}
+        """
+        rows = defaultdict(list)
+        indices = defaultdict(list)
+
+        for i, input_data in enumerate(prediction_inputs):
+            try:
+                features = input_data.features
+                row = (
+                    float(features.season_avg),
+                    float(features.last_5_avg),
+                    float(features.opponent_defense_rank),
+                    float(features.days_rest),
+                    1.0 if input_data.player.is_home else 0.0,
+                    float(input_data.prizepicks_line)
+                )
+                key = (input_data.player.sport, input_data.stat_type)
+            except (AttributeError, TypeError, ValueError) as e:
+                logger.error(f"Skipping malformed prediction input for {input_data.player.player_id}: {e}")
+                continue
+            rows[key].append(row)
+            indices[key].append(i)
+
+        return {
+            key: (np.array(indices[key]), np.array(rows[key], dtype=np.float64))
+            for key in rows
+        }
+
+    def score(self, prediction_inputs):
+        """
+        Score prediction inputs
+
+        Args:
+            prediction_inputs (list): PredictionInput records
+
+        Yields:
+            tuple: (index into prediction_inputs, predicted value, over probability, confidence),
+                grouped by sport and stat type
+        """
+        for key, (batch_indices, matrix) in self.build_batches(prediction_inputs).items():
+            try:
+                predicted = self.model(matrix, self.rng)
+            except Exception as e:
+                logger.error(f"Error scoring {key[0]} {key[1]} batch of {len(matrix)}: {e}")
+                continue
+
+            probability = self.probabilities.over_probabilities(key[0], key[1], predicted, matrix[:, COLUMN['line']])
+            confidence = confidence_levels(probability)
+
+            yield from zip(batch_indices.tolist(), predicted.tolist(), probability.tolist(), confidence.tolist())
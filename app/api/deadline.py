@@ -0,0 +1,84 @@
+import os
+import time
+import functools
+import contextvars
+from contextlib import contextmanager
+
+# Deadline of the request being served, if any. Context variables follow the request
+# into the transport's worker threads (see HttpTransport.map_concurrent).
+_current = contextvars.ContextVar('sportradar_deadline', default=None)
+
+class Deadline:
+    """
+    Point in time by which a caller needs its answer
+    """
+
+    def __init__(self, seconds, hedge=False):
+        """
+        Initialize the deadline
+
+        Args:
+            seconds (float): Time budget from now
+            hedge (bool): Whether slow upstream reads made under this deadline may be hedged
+        """
+        self.expires_at = time.monotonic() + seconds
+        self.hedge = hedge
+
+    def remaining(self):
+        """Seconds left before the deadline, never below 0"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        """Whether the deadline has passed"""
+        return time.monotonic() >= self.expires_at
+
+@contextmanager
+def request_deadline(seconds, hedge=False):
+    """
+    Bound every Sportradar call made inside the block by a shared deadline
+
+    A deadline already in effect is kept if it is earlier.
+
+    Args:
+        seconds (float): Time budget for the block
+        hedge (bool): Allow hedged requests for latency-critical reads inside the block
+
+    Yields:
+        Deadline: The deadline in effect
+    """
+    deadline = Deadline(seconds, hedge)
+    outer = _current.get()
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline.expires_at = outer.expires_at
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+def current_deadline():
+    """
+    Get the deadline of the current request
+
+    Returns:
+        Deadline: The deadline, or None outside of request_deadline()
+    """
+    return _current.get()
+
+def with_deadline(seconds=None, hedge=False):
+    """
+    Decorator running a view under request_deadline()
+
+    Args:
+        seconds (float): Time budget of the view. Defaults to SPORTRADAR_REQUEST_DEADLINE or 8.
+        hedge (bool): Allow hedged requests for latency-critical reads
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            budget = seconds or float(os.environ.get('SPORTRADAR_REQUEST_DEADLINE', 8))
+            with request_deadline(budget, hedge):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
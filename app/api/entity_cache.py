@@ -0,0 +1,98 @@
+import logging
+import threading
+from collections import Counter
+
+logger = logging.getLogger('entity_cache')
+
+class EntityCache:
+    """
+    Entities resolved during one pipeline run, e.g. team rosters and player stats.
+
+    Each entity is fetched once and shared by every game that references it. The
+    cache only lives as long as the run, so nothing in it can go stale between runs.
+    """
+
+    def __init__(self):
+        """Initialize an empty cache"""
+        self._entries = {}
+        # Keys looked up through get(); prefetched entities are only stored until then
+        self._used = set()
+        self._lock = threading.Lock()
+        self.fetched = Counter()
+        self.reused = Counter()
+
+    def get(self, kind, key, fetch):
+        """
+        Get an entity, fetching it on first use
+
+        Failed fetches (None) are remembered too, so they are not retried for every game.
+        A lookup counts as a reuse from the second get() of a key on; the first one of
+        a prefetched entity is its first use.
+
+        Args:
+            kind (str): Entity kind, e.g. 'roster'
+            key (tuple): Entity key within the kind
+            fetch (callable): Called with no arguments to resolve the entity
+
+        Returns:
+            The entity
+        """
+        with self._lock:
+            if (kind, key) in self._entries:
+                if (kind, key) in self._used:
+                    self.reused[kind] += 1
+                else:
+                    self._used.add((kind, key))
+                return self._entries[(kind, key)]
+
+        value = fetch()
+        self.put(kind, key, value)
+        with self._lock:
+            self._used.add((kind, key))
+        return value
+
+    def put(self, kind, key, value):
+        """
+        Store an entity resolved elsewhere, e.g. by a concurrent prefetch
+
+        Args:
+            kind (str): Entity kind
+            key (tuple): Entity key within the kind
+            value: The entity
+        """
+        with self._lock:
+            if (kind, key) not in self._entries:
+                self.fetched[kind] += 1
+            self._entries[(kind, key)] = value
+
+    def missing(self, kind, keys):
+        """
+        Get the keys of a kind that have not been resolved yet
+
+        Args:
+            kind (str): Entity kind
+            keys (iterable): Entity keys
+
+        Returns:
+            list: Unresolved keys, without duplicates, in their original order
+        """
+        keys = list(dict.fromkeys(keys))
+        with self._lock:
+            return [key for key in keys if (kind, key) not in self._entries]
+
+    def clear(self):
+        """Drop every entity, keeping the fetch and reuse counts"""
+        with self._lock:
+            self._entries.clear()
+            self._used.clear()
+
+    def summary(self):
+        """
+        Get fetch and reuse counts per entity kind
+
+        Returns:
+            dict: {kind: {'fetched': n, 'reused': n}}
+        """
+        with self._lock:
+            kinds = set(self.fetched) | set(self.reused)
+            return {kind: {'fetched': self.fetched[kind], 'reused': self.reused[kind]} for kind in sorted(kinds)}
@@ -0,0 +1,269 @@
+import os
+import sqlite3
+import logging
+import threading
+
+import numpy as np
+
+logger = logging.getLogger('feature_store')
+
+# Feature vector layout and the type each value is restored to when read back
+FEATURES = (
+    ('player_age', int),
+    ('player_height', int),
+    ('player_weight', int),
+    ('season_avg', float),
+    ('last_5_avg', float),
+    ('opponent_defense_rank', int),
+    ('days_rest', int),
+    ('is_home', bool),
+    ('is_starter', bool)
+)
+FEATURE_NAMES = tuple(name for name, _ in FEATURES)
+
+# Rows added to a sport's matrix file whenever it runs out of space
+GROWTH_ROWS = 4096
+
+def encode_features(features):
+    """
+    Convert a features dict into a float64 vector
+
+    Args:
+        features (dict): Features by name
+
+    Returns:
+        np.ndarray: Vector in FEATURE_NAMES order; missing or non-numeric values are NaN
+    """
+    vector = np.full(len(FEATURES), np.nan)
+    for i, name in enumerate(FEATURE_NAMES):
+        try:
+            vector[i] = float(features[name])
+        except (KeyError, TypeError, ValueError):
+            pass
+    return vector
+
+def decode_features(vector):
+    """
+    Convert a stored vector back into a features dict
+
+    Args:
+        vector (np.ndarray): Vector in FEATURE_NAMES order
+
+    Returns:
+        dict: Features by name; NaN values become None
+    """
+    features = {}
+    for value, (name, kind) in zip(vector.tolist(), FEATURES):
+        if value != value:
+            features[name] = None
+        elif kind is int:
+            features[name] = int(value) if value.is_integer() else value
+        else:
+            features[name] = kind(value)
+    return features
+
+class FeatureStore:
+    """
+    Persistent store of player feature vectors keyed by (sport, player_id, stat_type, as_of_date).
+
+    Each sport's vectors are rows of one float64 matrix file that is read through
+    np.memmap, so bulk slices for backtests or retraining come straight off the page
+    cache without parsing anything. A SQLite index maps keys to row numbers.
+    """
+
+    def __init__(self, store_dir):
+        """
+        Initialize the feature store
+
+        Args:
+            store_dir (str): Directory holding the matrix files and their index
+        """
+        self.store_dir = store_dir
+        self.width = len(FEATURES)
+        self.row_bytes = self.width * np.dtype(np.float64).itemsize
+        self._local = threading.local()
+
+        os.makedirs(store_dir, exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS feature_row ("
+            "sport TEXT NOT NULL, player_id TEXT NOT NULL, stat_type TEXT NOT NULL, "
+            "as_of_date TEXT NOT NULL, row INTEGER NOT NULL, "
+            "PRIMARY KEY (sport, player_id, stat_type, as_of_date))"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_feature_row_date ON feature_row (sport, as_of_date, stat_type)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS feature_matrix (sport TEXT PRIMARY KEY, rows INTEGER NOT NULL)"
+        )
+
+    def _connection(self):
+        """SQLite connection for the current thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.store_dir, 'index.db'), timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def _matrix_path(self, sport):
+        return os.path.join(self.store_dir, f"{sport}.f64")
+
+    def _matrix(self, sport, mode='r'):
+        """
+        Memory-map a sport's matrix file
+
+        Returns:
+            np.memmap: The matrix, or None if the sport has no rows yet
+        """
+        path = self._matrix_path(sport)
+        if not os.path.exists(path):
+            return None
+        rows = os.path.getsize(path) // self.row_bytes
+        if not rows:
+            return None
+        return np.memmap(path, dtype=np.float64, mode=mode, shape=(rows, self.width))
+
+    def _rows_for(self, sport, keys):
+        """Look up the rows of (player_id, stat_type, as_of_date) keys, in chunks"""
+        rows = {}
+        conn = self._connection()
+        keys = list(dict.fromkeys(keys))
+
+        for i in range(0, len(keys), 300):
+            chunk = keys[i:i + 300]
+            clauses = ' OR '.join('(player_id = ? AND stat_type = ? AND as_of_date = ?)' for _ in chunk)
+            params = [sport] + [value for key in chunk for value in key]
+            for player_id, stat_type, as_of_date, row in conn.execute(
+                f"SELECT player_id, stat_type, as_of_date, row FROM feature_row WHERE sport = ? AND ({clauses})",
+                params
+            ):
+                rows[(player_id, stat_type, as_of_date)] = row
+
+        return rows
+
+    def get(self, sport, player_id, stat_type, as_of_date):
+        """
+        Get the features of one player and stat type
+
+        Args:
+            sport (str): Sport code
+            player_id (str): Player ID
+            stat_type (str): Stat type
+            as_of_date (str): Date the features describe, as YYYY-MM-DD
+
+        Returns:
+            dict: Features, or None if they are not stored
+        """
+        return self.get_many(sport, [(player_id, stat_type, as_of_date)]).get((player_id, stat_type, as_of_date))
+
+    def get_many(self, sport, keys):
+        """
+        Get the features of several players and stat types
+
+        Args:
+            sport (str): Sport code
+            keys (iterable): (player_id, stat_type, as_of_date) tuples
+
+        Returns:
+            dict: Features by key; keys that are not stored are left out
+        """
+        rows = self._rows_for(sport, keys)
+        matrix = self._matrix(sport) if rows else None
+        if matrix is None:
+            return {}
+
+        found = {key: row for key, row in rows.items() if row < len(matrix)}
+        if not found:
+            return {}
+        vectors = matrix[np.fromiter(found.values(), dtype=np.int64, count=len(found))]
+        return {key: decode_features(vector) for key, vector in zip(found, vectors)}
+
+    def put_many(self, sport, records):
+        """
+        Store features, replacing any already stored under the same keys
+
+        Args:
+            sport (str): Sport code
+            records (list): ((player_id, stat_type, as_of_date), features dict) pairs
+
+        Returns:
+            int: Number of records stored
+        """
+        records = list(dict(records).items())
+        if not records:
+            return 0
+
+        conn = self._connection()
+
+        # Rows are allocated under the index's write lock so concurrent writers never share one
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            existing = self._rows_for(sport, [key for key, _ in records])
+            row = conn.execute("SELECT rows FROM feature_matrix WHERE sport = ?", (sport,)).fetchone()
+            next_row = row[0] if row else 0
+            rows = []
+            for key, _ in records:
+                if key in existing:
+                    rows.append(existing[key])
+                else:
+                    rows.append(next_row)
+                    next_row += 1
+
+            # Vectors are on disk before the index points at them, so readers never see unwritten rows
+            self._ensure_capacity(sport, next_row)
+            matrix = self._matrix(sport, mode='r+')
+            matrix[np.array(rows)] = np.stack([encode_features(features) for _, features in records])
+            matrix.flush()
+            del matrix
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO feature_row (sport, player_id, stat_type, as_of_date, row) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(sport,) + key + (row,) for (key, _), row in zip(records, rows)]
+            )
+            conn.execute("INSERT OR REPLACE INTO feature_matrix (sport, rows) VALUES (?, ?)", (sport, next_row))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        return len(records)
+
+    def _ensure_capacity(self, sport, rows):
+        """Grow a sport's matrix file to hold at least the given number of rows"""
+        path = self._matrix_path(sport)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size >= rows * self.row_bytes:
+            return
+        capacity = (rows + GROWTH_ROWS - 1) // GROWTH_ROWS * GROWTH_ROWS
+        with open(path, 'ab') as f:
+            f.truncate(capacity * self.row_bytes)
+
+    def slice(self, sport, start_date, end_date, stat_type=None):
+        """
+        Get every stored feature vector of a sport within a date range
+
+        Args:
+            sport (str): Sport code
+            start_date (str): First date, as YYYY-MM-DD
+            end_date (str): Last date (inclusive), as YYYY-MM-DD
+            stat_type (str): Only this stat type, if given
+
+        Returns:
+            tuple: (list of (player_id, stat_type, as_of_date) keys, np.ndarray with one row per key
+                and FEATURE_NAMES as columns)
+        """
+        query = "SELECT player_id, stat_type, as_of_date, row FROM feature_row WHERE sport = ? AND as_of_date BETWEEN ? AND ?"
+        params = [sport, start_date, end_date]
+        if stat_type is not None:
+            query += " AND stat_type = ?"
+            params.append(stat_type)
+
+        result = self._connection().execute(query + " ORDER BY as_of_date, row", params).fetchall()
+        matrix = self._matrix(sport)
+        if not result or matrix is None:
+            return [], np.empty((0, self.width))
+
+        keys = [row[:3] for row in result]
+        return keys, np.asarray(matrix[np.array([row[3] for row in result])])
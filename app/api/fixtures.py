@@ -0,0 +1,583 @@
+"""
+Record/replay fixtures and a local stand-in for the Sportradar API.
+
+RecordingTransport captures real SportradarAPI traffic into a fixture archive.
+ReplayTransport serves an archive (and, optionally, synthesized full-size
+leagues for anything the archive lacks) with configurable latency, error rate
+and rate-limit responses, so the client and pipeline can be benchmarked offline.
+The same replay logic can be exposed over HTTP with `serve`:
+
+    python -m app.api.fixtures serve --archive fixtures/nba.jsonl.gz --port 8765
+    SPORTRADAR_API_HOST=http://127.0.0.1:8765 python data_pipeline_scheduled.py
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import uuid
+import random
+import hashlib
+import logging
+import argparse
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, urlencode, parse_qsl
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from app.api.http_transport import HttpTransport
+
+logger = logging.getLogger('fixtures')
+
+# (teams, players per team) for full-size leagues
+LEAGUE_SIZES = {
+    'nba': (30, 15),
+    'nfl': (32, 53),
+    'mlb': (30, 26),
+    'nhl': (32, 23),
+    'ncaafb': (130, 85),
+    'ncaamb': (350, 13)
+}
+
+# Per-game averages used to synthesize player statistics
+STAT_AVERAGES = {
+    'nba': {'points': 12.0, 'rebounds': 5.0, 'assists': 3.0, 'three_pointers': 1.4},
+    'nfl': {'passing_yards': 60.0, 'rushing_yards': 25.0, 'receiving_yards': 30.0, 'touchdowns': 0.3},
+    'mlb': {'hits': 0.9, 'runs': 0.5, 'rbis': 0.5, 'strikeouts': 1.0},
+    'nhl': {'goals': 0.25, 'assists': 0.4, 'shots': 2.0, 'saves': 3.0},
+    'ncaafb': {'passing_yards': 40.0, 'rushing_yards': 20.0, 'receiving_yards': 22.0, 'touchdowns': 0.2},
+    'ncaamb': {'points': 9.0, 'rebounds': 4.0, 'assists': 2.0, 'three_pointers': 1.1}
+}
+
+FIXTURE_NAMESPACE = uuid.UUID('6f1c2a52-4d1e-4a3c-9a49-3f6f3b0d7e21')
+
+def fixture_key(url, params=None):
+    """
+    Get the archive key of a request: its path plus query, without the API key
+
+    Args:
+        url (str): Request URL (absolute, or a path for the stand-in server)
+        params (dict): Query parameters
+
+    Returns:
+        str: Fixture key
+    """
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query.update(params or {})
+    query.pop('api_key', None)
+    key = parts.path
+    if query:
+        key += '?' + urlencode(sorted(query.items()))
+    return key
+
+class FixtureResponse:
+    """
+    Minimal stand-in for requests.Response built from a fixture
+    """
+
+    def __init__(self, status_code, body=None, headers=None, url=''):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.url = url
+        self._body = body
+
+    @property
+    def text(self):
+        return json.dumps(self._body) if self._body is not None else ''
+
+    def json(self):
+        if self._body is None:
+            raise ValueError('Response has no JSON body')
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+class FixtureArchive:
+    """
+    Gzipped JSON-lines archive of recorded responses, one line per request
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the archive
+
+        Args:
+            path (str): Archive path, conventionally ending in .jsonl.gz
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, key, status_code, body, headers=None):
+        """Record one response"""
+        record = {
+            'key': key,
+            'status': status_code,
+            'headers': {k: v for k, v in (headers or {}).items() if k.lower() in ('etag', 'last-modified')},
+            'body': body
+        }
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with gzip.open(self.path, 'at', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+
+    def load(self):
+        """
+        Load every recorded response; later recordings of a key replace earlier ones
+
+        Returns:
+            dict: Records by fixture key
+        """
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    records[record['key']] = record
+        return records
+
+class RecordingTransport(HttpTransport):
+    """
+    HttpTransport that records every response it receives into a fixture archive
+    """
+
+    def __init__(self, archive_path, **kwargs):
+        super().__init__(**kwargs)
+        self.archive = FixtureArchive(archive_path)
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        response = super().get(url, params=params, headers=headers, **kwargs)
+
+        # 304s carry no body and would shadow the recorded payload
+        if response.status_code != 304:
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+            self.archive.append(fixture_key(url, params), response.status_code, body, response.headers)
+
+        return response
+
+class LeagueSynthesizer:
+    """
+    Deterministically generates full-size leagues in the shape of Sportradar payloads
+    """
+
+    def __init__(self, seed=0, sizes=None):
+        """
+        Initialize the synthesizer
+
+        Args:
+            seed (int): Seed mixed into every generated value
+            sizes (dict): (teams, players per team) by sport. Defaults to LEAGUE_SIZES.
+        """
+        self.seed = seed
+        self.sizes = sizes or LEAGUE_SIZES
+        self._leagues = {}
+        self._lock = threading.Lock()
+
+    def _id(self, *parts):
+        return str(uuid.uuid5(FIXTURE_NAMESPACE, ':'.join(str(p) for p in (self.seed,) + parts)))
+
+    def _rng(self, *parts):
+        return random.Random(':'.join(str(p) for p in (self.seed,) + parts))
+
+    def league(self, sport):
+        """
+        Get the teams and players of a sport's league
+
+        Returns:
+            dict: {'teams': [...], 'teams_by_id': {...}, 'players_by_id': {...}}
+        """
+        with self._lock:
+            if sport in self._leagues:
+                return self._leagues[sport]
+
+            team_count, roster_size = self.sizes[sport]
+            teams, teams_by_id, players_by_id = [], {}, {}
+
+            for t in range(team_count):
+                team = {
+                    'id': self._id(sport, 'team', t),
+                    'name': f"Team {t + 1}",
+                    'market': f"City {t + 1}",
+                    'alias': f"T{t + 1:02d}",
+                    'players': []
+                }
+                for p in range(roster_size):
+                    rng = self._rng(sport, 'player', t, p)
+                    player = {
+                        'id': self._id(sport, 'player', t, p),
+                        'first_name': f"Player{p + 1}",
+                        'last_name': f"Team{t + 1}",
+                        'full_name': f"Player{p + 1} Team{t + 1}",
+                        'jersey_number': str(p + 1),
+                        'height': rng.randint(68, 84),
+                        'weight': rng.randint(170, 300),
+                        'age': rng.randint(20, 37),
+                        'is_starter': p < max(1, roster_size // 3)
+                    }
+                    team['players'].append(player)
+                    players_by_id[player['id']] = (team, player)
+                teams.append(team)
+                teams_by_id[team['id']] = team
+
+            league = {'teams': teams, 'teams_by_id': teams_by_id, 'players_by_id': players_by_id}
+            self._leagues[sport] = league
+            return league
+
+    def _season_window(self, sport, season):
+        if sport in ('nba', 'nhl', 'ncaamb'):
+            return date(season, 10, 1), date(season + 1, 6, 15)
+        if sport in ('nfl', 'ncaafb'):
+            return date(season, 9, 1), date(season + 1, 2, 15)
+        return date(season, 3, 25), date(season, 10, 31)
+
+    def _team_ref(self, team):
+        return {'id': team['id'], 'name': team['name'], 'market': team['market'], 'alias': team['alias']}
+
+    def games_on(self, sport, day):
+        """
+        Get the games a sport plays on a day
+
+        Football plays once a week with every team; other sports play most days with
+        a share of the league.
+
+        Args:
+            sport (str): Sport code
+            day (date): Game date
+
+        Returns:
+            list: Game data
+        """
+        teams = list(self.league(sport)['teams'])
+        if sport == 'nfl' and day.weekday() != 6:
+            return []
+        if sport == 'ncaafb' and day.weekday() != 5:
+            return []
+
+        share = {'mlb': 1.0, 'nfl': 1.0, 'ncaafb': 1.0, 'ncaamb': 0.3}.get(sport, 0.5)
+        self._rng(sport, 'day', day.isoformat()).shuffle(teams)
+        playing = teams[:int(len(teams) * share) // 2 * 2]
+
+        games = []
+        for home, away in zip(playing[0::2], playing[1::2]):
+            games.append({
+                'id': self._id(sport, 'game', day.isoformat(), home['id'], away['id']),
+                'status': 'scheduled',
+                'scheduled': f"{day.isoformat()}T23:00:00+00:00",
+                'home': self._team_ref(home),
+                'away': self._team_ref(away),
+                'venue': {'name': f"{home['market']} Arena"}
+            })
+        return games
+
+    def daily_schedule(self, sport, day):
+        return {'date': day.isoformat(), 'games': self.games_on(sport, day)}
+
+    def season_schedule(self, sport, season, season_type):
+        start, end = self._season_window(sport, season)
+        if season_type != 'REG':
+            return None
+
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        if sport in ('nfl', 'ncaafb'):
+            weeks = []
+            for day in days:
+                games = self.games_on(sport, day)
+                if games:
+                    weeks.append({'sequence': len(weeks) + 1, 'games': games})
+            return {'season': {'year': season, 'type': season_type}, 'weeks': weeks}
+
+        games = [game for day in days for game in self.games_on(sport, day)]
+        return {'season': {'year': season, 'type': season_type}, 'games': games}
+
+    def _player_stats(self, sport, player, season):
+        rng = self._rng(sport, 'stats', player['id'], season)
+        games_played = rng.randint(10, 70)
+        average = {
+            stat: round(base * rng.uniform(0.2, 2.2) * (1.4 if player.get('is_starter') else 0.7), 2)
+            for stat, base in STAT_AVERAGES[sport].items()
+        }
+        total = {stat: round(value * games_played, 1) for stat, value in average.items()}
+        total['games_played'] = games_played
+        return {'total': total, 'average': average}
+
+    def team_profile(self, sport, team_id):
+        team = self.league(sport)['teams_by_id'].get(team_id)
+        if team is None:
+            return None
+        return dict(self._team_ref(team), players=team['players'])
+
+    def player_profile(self, sport, player_id):
+        found = self.league(sport)['players_by_id'].get(player_id)
+        if found is None:
+            return None
+        team, player = found
+        return dict(player, team=self._team_ref(team))
+
+    def team_statistics(self, sport, team_id, season):
+        team = self.league(sport)['teams_by_id'].get(team_id)
+        if team is None:
+            return None
+        players = [
+            dict({'id': p['id'], 'full_name': p['full_name']}, **self._player_stats(sport, p, season))
+            for p in team['players']
+        ]
+        return dict(self._team_ref(team), season={'year': season}, players=players)
+
+    def player_statistics(self, sport, player_id, season, season_type):
+        found = self.league(sport)['players_by_id'].get(player_id)
+        if found is None:
+            return None
+        team, player = found
+        stats = self._player_stats(sport, player, season)
+        return {
+            'id': player['id'],
+            'full_name': player['full_name'],
+            'seasons': [{'year': season, 'type': season_type, 'teams': [dict(self._team_ref(team), **stats)]}]
+        }
+
+    def standings(self, sport, season):
+        teams = []
+        for team in self.league(sport)['teams']:
+            rng = self._rng(sport, 'standings', team['id'], season)
+            wins = rng.randint(10, 60)
+            teams.append(dict(self._team_ref(team), wins=wins, losses=rng.randint(10, 60)))
+        return {'season': {'year': season}, 'teams': sorted(teams, key=lambda t: -t['wins'])}
+
+    def game_summary(self, sport, game_id):
+        # Game IDs are hashes, so summaries only carry the ID and a status
+        return {'id': game_id, 'status': 'scheduled'}
+
+    def payload(self, path):
+        """
+        Synthesize the payload for a Sportradar request path
+
+        Args:
+            path (str): Request path, e.g. /nba/trial/v8/en/teams/<id>/profile.json
+
+        Returns:
+            dict: Payload, or None if the path is unknown
+        """
+        sport = path.strip('/').split('/')[0]
+        if sport not in self.sizes or '/en/' not in path:
+            return None
+        parts = path.split('/en/', 1)[1].split('?')[0].split('/')
+
+        try:
+            if parts[0] == 'games' and parts[-1] == 'schedule.json':
+                if len(parts) == 5:
+                    return self.daily_schedule(sport, date(int(parts[1]), int(parts[2]), int(parts[3])))
+                return self.season_schedule(sport, int(parts[1]), parts[2])
+            if parts[0] == 'games' and parts[-1] == 'summary.json':
+                return self.game_summary(sport, parts[1])
+            if parts[0] == 'teams' and parts[-1] == 'profile.json':
+                return self.team_profile(sport, parts[1])
+            if parts[0] == 'players' and parts[-1] == 'profile.json':
+                return self.player_profile(sport, parts[1])
+            if parts[0] == 'seasons' and parts[-1] == 'standings.json':
+                return self.standings(sport, int(parts[1]))
+            if parts[0] == 'seasons' and parts[3] == 'teams' and parts[-1] == 'statistics.json':
+                return self.team_statistics(sport, parts[4], int(parts[1]))
+            if parts[0] == 'seasons' and parts[3] == 'players' and parts[-1] == 'statistics.json':
+                return self.player_statistics(sport, parts[4], int(parts[1]), parts[2])
+        except (IndexError, ValueError):
+            return None
+
+        return None
+
+class ReplayTransport(HttpTransport):
+    """
+    Transport that serves recorded fixtures instead of calling the API
+
+    Requests missing from the archive are synthesized when a LeagueSynthesizer is
+    given, and answered with 404 otherwise. Latency, server errors and 429
+    rate-limit responses can be injected to reproduce production conditions.
+    """
+
+    def __init__(self, archive_path=None, synthesizer=None, latency=None, jitter=None,
+                 error_rate=None, rate_limit_rate=None, seed=None, **kwargs):
+        """
+        Initialize the replay transport
+
+        Args:
+            archive_path (str): Fixture archive to serve. Optional when synthesizing.
+            synthesizer (LeagueSynthesizer): Generator for requests missing from the archive
+            latency (float): Seconds added to every response. Defaults to SPORTRADAR_REPLAY_LATENCY or 0.
+            jitter (float): Random extra seconds of up to this much. Defaults to SPORTRADAR_REPLAY_JITTER or 0.
+            error_rate (float): Share of requests answered with a 503. Defaults to SPORTRADAR_REPLAY_ERROR_RATE or 0.
+            rate_limit_rate (float): Share of requests answered with a 429.
+                Defaults to SPORTRADAR_REPLAY_RATE_LIMIT_RATE or 0.
+            seed (int): Seed for injected faults, for reproducible runs
+        """
+        super().__init__(**kwargs)
+        self.records = FixtureArchive(archive_path).load() if archive_path else {}
+        self.synthesizer = synthesizer
+        self.latency = float(latency if latency is not None else os.environ.get('SPORTRADAR_REPLAY_LATENCY', 0))
+        self.jitter = float(jitter if jitter is not None else os.environ.get('SPORTRADAR_REPLAY_JITTER', 0))
+        self.error_rate = float(error_rate if error_rate is not None else os.environ.get('SPORTRADAR_REPLAY_ERROR_RATE', 0))
+        self.rate_limit_rate = float(
+            rate_limit_rate if rate_limit_rate is not None else os.environ.get('SPORTRADAR_REPLAY_RATE_LIMIT_RATE', 0)
+        )
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.request_count = 0
+
+    def respond(self, key, headers=None, timeout=None):
+        """
+        Build the response for a fixture key
+
+        Args:
+            key (str): Fixture key (see fixture_key)
+            headers (dict): Request headers
+            timeout (tuple): (connect, read) timeout of the client. A simulated delay
+                longer than the read timeout raises ReadTimeout, as a live request would.
+
+        Returns:
+            tuple: (status code, body, response headers)
+        """
+        with self._rng_lock:
+            self.request_count += 1
+            delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0)
+            roll = self._rng.random()
+        if timeout and delay > timeout[1]:
+            time.sleep(timeout[1])
+            raise requests.exceptions.ReadTimeout(f"Simulated read timeout after {timeout[1]}s")
+        if delay:
+            time.sleep(delay)
+
+        if roll < self.rate_limit_rate:
+            return 429, {'message': 'Too Many Requests'}, {'Retry-After': '1'}
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 503, {'message': 'Service Unavailable'}, {}
+
+        record = self.records.get(key)
+        if record is not None:
+            status, body, response_headers = record['status'], record['body'], dict(record['headers'])
+        else:
+            body = self.synthesizer.payload(key) if self.synthesizer is not None else None
+            if body is None:
+                return 404, {'message': 'Not Found'}, {}
+            status = 200
+            response_headers = {'ETag': '"' + hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest() + '"'}
+
+        etag = CaseInsensitiveDict(response_headers).get('ETag')
+        if status == 200 and etag and (headers or {}).get('If-None-Match') == etag:
+            return 304, None, response_headers
+
+        return status, body, response_headers
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        status, body, response_headers = self.respond(fixture_key(url, params), headers, timeout or self.timeout)
+        return FixtureResponse(status, body, response_headers, url)
+
+def transport_from_env():
+    """
+    Create the transport selected by SPORTRADAR_TRANSPORT
+
+    Values are 'live' (default), 'record:<archive>', 'replay:<archive>' and
+    'synthetic'. Replays also synthesize requests missing from the archive when
+    SPORTRADAR_REPLAY_SYNTHESIZE is set.
+
+    Returns:
+        HttpTransport: The configured transport
+    """
+    mode = os.environ.get('SPORTRADAR_TRANSPORT', 'live')
+    kind, _, archive = mode.partition(':')
+
+    if kind == 'record':
+        logger.info(f"Recording Sportradar traffic to {archive}")
+        return RecordingTransport(archive)
+    if kind == 'replay':
+        synthesize = os.environ.get('SPORTRADAR_REPLAY_SYNTHESIZE', '').lower() in ('1', 'true', 'yes')
+        logger.info(f"Replaying Sportradar fixtures from {archive}")
+        return ReplayTransport(archive, synthesizer=LeagueSynthesizer() if synthesize else None)
+    if kind == 'synthetic':
+        logger.info("Serving synthesized Sportradar leagues")
+        return ReplayTransport(synthesizer=LeagueSynthesizer())
+
+    return HttpTransport()
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    """HTTP handler serving a ReplayTransport"""
+
+    replay = None
+
+    def do_GET(self):
+        status, body, headers = self.replay.respond(fixture_key(self.path), dict(self.headers))
+        payload = json.dumps(body).encode('utf-8') if body is not None else b''
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+def serve(replay, host='127.0.0.1', port=8765):
+    """
+    Serve a ReplayTransport over HTTP as a local stand-in for the Sportradar API
+
+    Args:
+        replay (ReplayTransport): Transport whose fixtures to serve
+        host (str): Interface to bind
+        port (int): Port to bind
+    """
+    handler = type('ReplayHandler', (_ReplayHandler,), {'replay': replay})
+    server = ThreadingHTTPServer((host, port), handler)
+    logger.info(f"Serving Sportradar fixtures on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Sportradar fixture tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help='Run a local stand-in for the Sportradar API')
+    serve_parser.add_argument('--archive', default=None, help='Fixture archive to serve')
+    serve_parser.add_argument('--synthesize', action='store_true', help='Synthesize full-size leagues for unrecorded requests')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    serve_parser.add_argument('--jitter', type=float, default=0.0, help='Random extra latency of up to this many seconds')
+    serve_parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with a 503')
+    serve_parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Share of requests answered with a 429')
+    serve_parser.add_argument('--seed', type=int, default=None)
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        if not args.archive and not args.synthesize:
+            parser.error('serve needs --archive, --synthesize or both')
+        replay = ReplayTransport(
+            args.archive,
+            synthesizer=LeagueSynthesizer() if args.synthesize else None,
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            seed=args.seed
+        )
+        serve(replay, args.host, args.port)
+
+    return 0
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import os
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger('http_transport')
+
+class HttpTransport:
+    """
+    Pooled HTTP transport used by the Sportradar client.
+
+    A single keep-alive session is shared by every caller so repeated calls to the
+    same host reuse open TCP/TLS connections, and a thread pool runs batches of
+    calls concurrently. Every request carries a connect and read timeout.
+    """
+
+    def __init__(self, pool_size=None, max_workers=None, connect_timeout=None, read_timeout=None):
+        """
+        Initialize the transport
+
+        Args:
+            pool_size (int): Maximum number of pooled connections per host, and of
+                hosts with pooled connections. Defaults to SPORTRADAR_POOL_SIZE or 20.
+            max_workers (int): Number of threads used for concurrent fetches.
+                Defaults to SPORTRADAR_MAX_WORKERS or 8.
+            connect_timeout (float): Seconds allowed to open a connection.
+                Defaults to SPORTRADAR_CONNECT_TIMEOUT or 3.05.
+            read_timeout (float): Seconds allowed between bytes of the response.
+                Defaults to SPORTRADAR_READ_TIMEOUT or 10.
+        """
+        self.pool_size = pool_size or int(os.environ.get('SPORTRADAR_POOL_SIZE', 20))
+        self.max_workers = max_workers or int(os.environ.get('SPORTRADAR_MAX_WORKERS', 8))
+        self.timeout = (
+            float(connect_timeout or os.environ.get('SPORTRADAR_CONNECT_TIMEOUT', 3.05)),
+            float(read_timeout or os.environ.get('SPORTRADAR_READ_TIMEOUT', 10))
+        )
+        self.hedge_count = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._executor = None
+        self._hedge_executor = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def executor(self):
+        """Thread pool shared by all concurrent fetches, created on first use"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='sportradar'
+                    )
+        return self._executor
+
+    @property
+    def hedge_executor(self):
+        """
+        Thread pool for hedged requests, created on first use
+
+        Kept apart from the fetch pool so a hedged read made from a fetch_many
+        worker never waits on a slot its own batch is holding.
+        """
+        if self._hedge_executor is None:
+            with self._executor_lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers * 2,
+                        thread_name_prefix='sportradar-hedge'
+                    )
+        return self._hedge_executor
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        """
+        Issue a GET request over the pooled session
+
+        Args:
+            url (str): Full URL to request
+            params (dict): Query parameters
+            headers (dict): Extra request headers
+            timeout (tuple): (connect, read) timeout in seconds. Defaults to the transport's timeout.
+
+        Returns:
+            requests.Response: The raw response
+        """
+        return self.session.get(url, params=params, headers=headers, timeout=timeout or self.timeout)
+
+    def get_hedged(self, url, params=None, headers=None, timeout=None, hedge_after=None, allow_hedge=None):
+        """
+        Issue a GET request, sending a duplicate if the first has not answered in time
+
+        Whichever request succeeds first wins; the other one is left to finish in the background.
+
+        Args:
+            url (str): Full URL to request
+            params (dict): Query parameters
+            headers (dict): Extra request headers
+            timeout (tuple): (connect, read) timeout in seconds
+            hedge_after (float): Seconds to wait before sending the duplicate. No duplicate is sent if None.
+            allow_hedge (callable): Asked before sending the duplicate, e.g. to spend a rate limit token
+
+        Returns:
+            requests.Response: The first successful response
+        """
+        if hedge_after is None:
+            return self.get(url, params=params, headers=headers, timeout=timeout)
+
+        first = self.hedge_executor.submit(self.get, url, params=params, headers=headers, timeout=timeout)
+        done, _ = wait([first], timeout=hedge_after)
+        if done or (allow_hedge is not None and not allow_hedge()):
+            return first.result()
+
+        logger.info(f"Hedging request to {url} after {hedge_after:.2f}s")
+        self.hedge_count += 1
+        second = self.hedge_executor.submit(self.get, url, params=params, headers=headers, timeout=timeout)
+
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = e
+        raise error
+
+    def map_concurrent(self, func, calls):
+        """
+        Run func(*args) for every args tuple in calls on the thread pool
+
+        Args:
+            func (callable): Function to call
+            calls (iterable): Iterable of argument tuples
+
+        Yields:
+            tuple: (args, result) pairs in completion order. The result is None
+                if the call raised.
+        """
+        # Each call runs in a copy of the caller's context, so request deadlines carry over
+        futures = {
+            self.executor.submit(contextvars.copy_context().run, func, *args): args
+            for args in calls
+        }
+
+        for future in as_completed(futures):
+            args = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Concurrent call {args} failed: {e}")
+                result = None
+            yield args, result
+
+    def close(self):
+        """Shut down the thread pool and close pooled connections"""
+        for executor in (self._executor, self._hedge_executor):
+            if executor is not None:
+                executor.shutdown(wait=False)
+        self._executor = None
+        self._hedge_executor = None
+        self.session.close()
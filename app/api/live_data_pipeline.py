@@ -1,15 +1,29 @@
 import os
 import sys
 import json
+import queue
+import random
+import hashlib
 import logging
-from datetime import datetime, timedelta
-import pandas as pd
-from sqlalchemy import create_engine, text
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from sqlalchemy import text
 
 # Add the app directory to the path
 sys.path.append('/home/ubuntu/sports_predictor_web')
 from app.api.sportradar_client import SportradarAPI
-from app.models.prediction import db, Prediction, ActualResult
+from app.api.player_stats_store import PlayerStatsStore
+from app.api.entity_cache import EntityCache
+from app.api.batch_inference import BatchInferenceEngine
+from app.api.probability import ProbabilityEngine
+from app.api.model_server import model_from_env, model_identity
+from app.api.prediction_writer import PredictionFileWriter
+from app.api.feature_store import FeatureStore
+from app.api.records import Features, PlayerGame, PredictionInput, PredictionRecord
+from app.models.prediction import db, GameFingerprint, upsert_predictions, upsert_rows
+from app.models.migrations import migrate
+from app.models.database import make_engine
 
 # Configure logging
 logging.basicConfig(
@@ -22,6 +36,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger('data_pipeline')
 
+# Bump when the feature logic changes, so every game is recomputed once; the model
+# and the over-probability distributions are part of the fingerprint already
+FINGERPRINT_VERSION = 1
+
 class LiveDataPipeline:
     """
     Pipeline for fetching live sports data from Sportradar API and preparing it for the prediction model
@@ -35,12 +53,33 @@ class LiveDataPipeline:
             api_key (str): Sportradar API key. If None, will look for SPORTRADAR_API_KEY env variable
         """
         self.api = SportradarAPI(api_key)
+        
+        # Per-player season stats ingested in bulk from team statistics
+        self.stats_store = PlayerStatsStore(os.path.join(self.api.cache_dir, 'player_stats.db'))
+        
+        # Extracted features persisted by (sport, player, stat type, date) for reuse across runs
+        self.feature_store = FeatureStore(
+            os.environ.get('FEATURE_STORE_DIR', os.path.join(self.api.cache_dir, 'features'))
+        )
+        
+        # Rosters and player stats resolved once per pipeline run; None outside of run_pipeline
+        self.entities = None
+        self.skipped_games = []
+        
+        # Scores prediction inputs in vectorized batches, with over probabilities from
+        # per-stat distributions fitted on settled predictions. The model runs on the
+        # model server when MODEL_SERVER_SOCKET is set.
+        self.probabilities = ProbabilityEngine()
+        self.inference = BatchInferenceEngine(model=model_from_env(), probabilities=self.probabilities)
+        
+        # Games per chunk and predictions per batch flowing through run_pipeline's stages
+        self.game_chunk_size = int(os.environ.get('PIPELINE_GAME_CHUNK', 8))
+        self.batch_size = int(os.environ.get('PIPELINE_BATCH_SIZE', 2000))
         self.output_dir = '/home/ubuntu/sports_predictor/home/ubuntu/neural_sports_predictor/output/predictions'
         os.makedirs(self.output_dir, exist_ok=True)
         
-        # Connect to database
-        self.db_path = '/home/ubuntu/sports_predictor_web/app.db'
-        self.engine = create_engine(f'sqlite:///{self.db_path}')
+        # Connect to the application database (DATABASE_URL, or the default SQLite file)
+        self.engine = make_engine()
         
         # Sports supported by our prediction model
         self.supported_sports = ['nba', 'nfl', 'mlb', 'nhl', 'ncaafb', 'ncaamb']
@@ -55,19 +94,27 @@ class LiveDataPipeline:
         Returns:
             dict: Dictionary of upcoming games by sport
         """
-        upcoming_games = {}
+        return dict(self.iter_upcoming_games(days_ahead=days_ahead))
+    
+    def iter_upcoming_games(self, days_ahead=7):
+        """
+        Fetch upcoming games one sport at a time
         
+        Args:
+            days_ahead (int): Number of days to look ahead
+            
+        Yields:
+            tuple: (sport, list of game data)
+        """
         for sport in self.supported_sports:
             try:
                 logger.info(f"Fetching upcoming games for {sport}")
                 games = self.api.get_upcoming_games(sport, days=days_ahead)
-                upcoming_games[sport] = games
                 logger.info(f"Found {len(games)} upcoming {sport} games")
             except Exception as e:
                 logger.error(f"Error fetching upcoming games for {sport}: {e}")
-                upcoming_games[sport] = []
-                
-        return upcoming_games
+                games = []
+            yield sport, games
     
     def fetch_player_data(self, sport, game):
         """
@@ -91,8 +138,8 @@ class LiveDataPipeline:
             away_team_id = game['away']['id']
             
             # Get team rosters
-            home_roster = self.api.get_team_roster(sport, home_team_id)
-            away_roster = self.api.get_team_roster(sport, away_team_id)
+            home_roster = self._team_roster(sport, home_team_id)
+            away_roster = self._team_roster(sport, away_team_id)
             
             # Extract player data
             if home_roster and 'players' in home_roster:
@@ -110,10 +157,97 @@ class LiveDataPipeline:
             
         return player_data
     
+    def _team_roster(self, sport, team_id):
+        """Get a team roster, resolved once per pipeline run"""
+        if self.entities is None:
+            return self.api.get_team_roster(sport, team_id)
+        return self.entities.get('roster', (sport, team_id), lambda: self.api.get_team_roster(sport, team_id))
+    
+    def prefetch_rosters(self, sport, games):
+        """
+        Fetch the rosters of every team playing in the given games concurrently
+        
+        Args:
+            sport (str): Sport code
+            games (list): Game data from the API
+        """
+        team_ids = set()
+        for game in games:
+            try:
+                team_ids.add(game['home']['id'])
+                team_ids.add(game['away']['id'])
+            except (KeyError, TypeError):
+                continue
+        
+        if self.entities is not None:
+            team_ids = [key[1] for key in self.entities.missing('roster', ((sport, team_id) for team_id in team_ids))]
+        
+        for call, roster in self.api.fetch_many(('get_team_roster', sport, team_id) for team_id in team_ids):
+            if self.entities is not None:
+                self.entities.put('roster', (sport, call[2]), roster)
+    
+    def ingest_team_stats(self, sport, team_ids):
+        """
+        Pull season statistics for whole teams and store them as per-player records
+        
+        One team statistics request replaces a player statistics request for every
+        player on that team. Teams ingested within the store's max age are skipped.
+        
+        Args:
+            sport (str): Sport code
+            team_ids (iterable): Team IDs
+            
+        Returns:
+            int: Number of player records stored
+        """
+        season = self.api.season_year_for(sport, datetime.now().date())
+        stale = self.stats_store.stale_teams(sport, season, team_ids)
+        stored = 0
+        
+        calls = [('get_team_season_stats', sport, team_id, season) for team_id in stale]
+        for call, team_stats in self.api.fetch_many(calls):
+            if not team_stats:
+                logger.warning(f"No team statistics for {sport} team {call[2]}")
+                continue
+            stored += self.stats_store.store_team(sport, season, call[2], team_stats)
+        
+        if stale:
+            logger.info(f"Ingested statistics for {stored} {sport} players from {len(stale)} teams")
+        return stored
+    
+    def prefetch_player_stats(self, sport, player_ids):
+        """
+        Fetch statistics concurrently for the given players that are not in the stats store
+        
+        Args:
+            sport (str): Sport code
+            player_ids (list): Player IDs
+        """
+        if self.entities is not None:
+            player_ids = [key[1] for key in self.entities.missing('player_stats', ((sport, player_id) for player_id in player_ids))]
+        
+        season = self.api.season_year_for(sport, datetime.now().date())
+        stored = self.stats_store.get_many(sport, season, player_ids)
+        missing = set(player_ids) - set(stored)
+        
+        fetched = self.api.fetch_many(('get_player_stats', sport, player_id) for player_id in missing)
+        if self.entities is not None:
+            for player_id, stats in stored.items():
+                self.entities.put('player_stats', (sport, player_id), stats)
+            for call, stats in fetched:
+                self.entities.put('player_stats', (sport, call[2]), stats)
+        else:
+            for _ in fetched:
+                pass
+    
     def fetch_player_stats(self, sport, player_id):
         """
         Fetch player statistics
         
+        Reads from the stats store filled by ingest_team_stats, falling back to a
+        per-player API call for players it does not have. During a pipeline run each
+        player's stats are resolved only once.
+        
         Args:
             sport (str): Sport code
             player_id (str): Player ID
@@ -122,98 +256,88 @@ class LiveDataPipeline:
             dict: Player statistics
         """
         try:
-            return self.api.get_player_stats(sport, player_id)
+            if self.entities is not None:
+                return self.entities.get('player_stats', (sport, player_id), lambda: self._load_player_stats(sport, player_id))
+            return self._load_player_stats(sport, player_id)
         except Exception as e:
             logger.error(f"Error fetching player stats for {player_id}: {e}")
             return None
     
+    def _load_player_stats(self, sport, player_id):
+        """Get player statistics from the stats store or, failing that, the API"""
+        season = self.api.season_year_for(sport, datetime.now().date())
+        stats = self.stats_store.get(sport, season, player_id)
+        if stats is not None:
+            return stats
+        return self.api.get_player_stats(sport, player_id)
+    
     def prepare_prediction_input(self, sport, game, player_data):
         """
         Prepare input data for the prediction model
         
+        Features already in the feature store for the game date are reused; only
+        missing ones are extracted (and the player's stats fetched) and then stored.
+        Each player's inputs share one PlayerGame and one block of player-level features.
+        
         Args:
             sport (str): Sport code
             game (dict): Game data
             player_data (dict): Player data
             
         Returns:
-            list: List of player prediction inputs
+            list: List of PredictionInput records
         """
         prediction_inputs = []
         
         try:
             game_date = datetime.strptime(game['scheduled'], '%Y-%m-%dT%H:%M:%S%z').date()
             game_id = game['id']
+            as_of_date = game_date.strftime('%Y-%m-%d')
+            stat_types = self._get_stat_types_for_sport(sport)
             
-            # Process home team players
-            for player in player_data['home_team']['players']:
-                player_id = player['id']
-                player_name = f"{player.get('first_name', '')} {player.get('last_name', '')}"
-                
-                # Get player stats
-                stats = self.fetch_player_stats(sport, player_id)
-                
-                # Create prediction input for each relevant stat type
-                stat_types = self._get_stat_types_for_sport(sport)
-                
-                for stat_type in stat_types:
-                    # Extract relevant features for this player and stat type
-                    features = self._extract_player_features(player, stats, stat_type, sport)
-                    
-                    # Get PrizePicks line (would come from their API in production)
-                    # For now, we'll use a placeholder based on average stats
-                    prizepicks_line = self._get_placeholder_line(features, stat_type, sport)
-                    
-                    prediction_input = {
-                        'player_id': player_id,
-                        'player_name': player_name,
-                        'team': player_data['home_team']['name'],
-                        'opponent': player_data['away_team']['name'],
-                        'is_home': True,
-                        'game_id': game_id,
-                        'game_date': game_date.strftime('%Y-%m-%d'),
-                        'sport': sport,
-                        'stat_type': stat_type,
-                        'prizepicks_line': prizepicks_line,
-                        'features': features
-                    }
-                    
-                    prediction_inputs.append(prediction_input)
+            sides = [
+                (player_data['home_team'], player_data['away_team'], True),
+                (player_data['away_team'], player_data['home_team'], False)
+            ]
             
-            # Process away team players
-            for player in player_data['away_team']['players']:
-                player_id = player['id']
-                player_name = f"{player.get('first_name', '')} {player.get('last_name', '')}"
-                
-                # Get player stats
-                stats = self.fetch_player_stats(sport, player_id)
-                
-                # Create prediction input for each relevant stat type
-                stat_types = self._get_stat_types_for_sport(sport)
-                
-                for stat_type in stat_types:
-                    # Extract relevant features for this player and stat type
-                    features = self._extract_player_features(player, stats, stat_type, sport)
-                    
-                    # Get PrizePicks line (would come from their API in production)
-                    # For now, we'll use a placeholder based on average stats
-                    prizepicks_line = self._get_placeholder_line(features, stat_type, sport)
+            # Look up every player's stored features for this date in one batch
+            stored = self.feature_store.get_many(sport, [
+                (player['id'], stat_type, as_of_date)
+                for team, _, _ in sides for player in team['players'] for stat_type in stat_types
+            ])
+            extracted = []
+            blocks = {}
+            
+            for team, opponent, is_home in sides:
+                for player in team['players']:
+                    player_id = player['id']
+                    player_name = f"{player.get('first_name', '')} {player.get('last_name', '')}"
+                    player_game = PlayerGame(player_id, player_name, team['name'], opponent['name'],
+                                             is_home, game_id, as_of_date, sport)
                     
-                    prediction_input = {
-                        'player_id': player_id,
-                        'player_name': player_name,
-                        'team': player_data['away_team']['name'],
-                        'opponent': player_data['home_team']['name'],
-                        'is_home': False,
-                        'game_id': game_id,
-                        'game_date': game_date.strftime('%Y-%m-%d'),
-                        'sport': sport,
-                        'stat_type': stat_type,
-                        'prizepicks_line': prizepicks_line,
-                        'features': features
-                    }
+                    # Only fetch player stats if some features have to be extracted
+                    stats = None
+                    if any((player_id, stat_type, as_of_date) not in stored for stat_type in stat_types):
+                        stats = self.fetch_player_stats(sport, player_id)
                     
-                    prediction_inputs.append(prediction_input)
+                    # Create prediction input for each relevant stat type
+                    for stat_type in stat_types:
+                        key = (player_id, stat_type, as_of_date)
+                        features = stored.get(key)
+                        if features is None:
+                            # Extract relevant features for this player and stat type
+                            features = self._extract_player_features(player, stats, stat_type, sport)
+                            extracted.append((key, features))
+                        features = Features.from_dict(features, blocks)
+                        
+                        # Get PrizePicks line (would come from their API in production)
+                        # For now, we'll use a placeholder based on average stats
+                        prizepicks_line = self._get_placeholder_line(features, stat_type, sport)
+                        
+                        prediction_inputs.append(PredictionInput(player_game, stat_type, prizepicks_line, features))
+            
+            if extracted:
+                self.feature_store.put_many(sport, extracted)
                     
         except Exception as e:
             logger.error(f"Error preparing prediction input for game {game.get('id', 'unknown')}: {e}")
@@ -313,7 +437,7 @@ class LiveDataPipeline:
         Generate a placeholder PrizePicks line based on features
         
         Args:
-            features (dict): Player features
+            features (Features): Player features
             stat_type (str): Type of statistic
             sport (str): Sport code
             
@@ -321,10 +445,11 @@ class LiveDataPipeline:
             float: PrizePicks line
         """
         # In production, this would come from the PrizePicks API
-        # For now, we'll use the season average with a slight adjustment
+        # For now, we'll use the season average with a slight adjustment, seeded by the
+        # features so unchanged inputs keep the same line from run to run
         season_avg = features['season_avg']
-        import random
-        adjustment = random.uniform(-0.5, 0.5)
+        rng = random.Random(f"{sport}:{stat_type}:{sorted(features.items())}")
+        adjustment = rng.uniform(-0.5, 0.5)
         
         # Round to nearest 0.5
         line = round((season_avg + adjustment) * 2) / 2
@@ -334,65 +459,533 @@ class LiveDataPipeline:
         """
         Generate predictions for player stats
         
+        Inputs are scored in batches, one feature matrix per sport and stat type
+        (see app/api/batch_inference.py).
+        
         Args:
-            prediction_inputs (list): List of prediction inputs
+            prediction_inputs (list): List of PredictionInput records
             
         Returns:
-            list: List of predictions
+            list: List of PredictionRecord predictions, in input order
         """
         predictions = []
         
-        for input_data in prediction_inputs:
+        # In production, the engine would wrap the actual neural network model
+        scored = sorted(self.inference.score(prediction_inputs))
+        
+        for index, predicted_value, over_probability, confidence in scored:
             try:
-                # In production, this would call the actual neural network model
-                # For now, we'll use a simplified placeholder model
-                predicted_value = self._placeholder_prediction_model(input_data)
-                
-                # Calculate over probability based on predicted value and line
-                line = input_data['prizepicks_line']
-                over_probability = self._calculate_over_probability(predicted_value, line)
-                
-                # Determine confidence level
-                confidence = self._determine_confidence(predicted_value, line, over_probability)
-                
-                # Generate top factors
-                top_factors = self._generate_top_factors(input_data, predicted_value, line)
-                
-                prediction = {
-                    'player': input_data['player_name'],
-                    'player_id': input_data['player_id'],
-                    'team': input_data['team'],
-                    'opponent': input_data['opponent'],
-                    'date': input_data['game_date'],
-                    'game_id': input_data['game_id'],
-                    'sport': input_data['sport'],
-                    'stat': input_data['stat_type'],
-                    'predicted_value': round(predicted_value, 1),
-                    'over_probability': round(over_probability, 2),
-                    'line': line,
-                    'confidence': confidence,
-                    'top_factors': top_factors
-                }
-                
-                predictions.append(prediction)
-                
+                predictions.append(PredictionRecord.from_input(
+                    prediction_inputs[index], predicted_value, over_probability, confidence
+                ))
             except Exception as e:
                 logger.error(f"Error generating prediction: {e}")
                 
         return predictions
     
-    def _placeholder_prediction_model(self, input_data):
+    def iter_game_chunks(self, sport, games):
+        """
+        Resolve rosters and player stats for games, a chunk of games at a time
+        
+        Each chunk's rosters, team statistics and remaining player stats are fetched
+        concurrently before the chunk is handed on, so the next stage never waits on
+        the network one player at a time.
+        
+        Args:
+            sport (str): Sport code
+            games (list): Game data from the API
+            
+        Yields:
+            list: (game, player data) pairs for up to game_chunk_size games
+        """
+        for i in range(0, len(games), self.game_chunk_size):
+            chunk = games[i:i + self.game_chunk_size]
+            
+            # Warm the entity cache with every roster this chunk needs in one concurrent batch
+            self.prefetch_rosters(sport, chunk)
+            
+            # Load every team's player stats in bulk instead of one request per player
+            team_ids = {game[side]['id'] for game in chunk for side in ('home', 'away') if game.get(side, {}).get('id')}
+            self.ingest_team_stats(sport, team_ids)
+            
+            game_players = [(game, self.fetch_player_data(sport, game)) for game in chunk]
+            
+            # Fetch stats for any players the team statistics did not cover
+            player_ids = [player['id'] for _, player_data in game_players
+                          for team in ('home_team', 'away_team')
+                          for player in player_data[team]['players']]
+            self.prefetch_player_stats(sport, player_ids)
+            
+            yield game_players
+    
+    def game_fingerprint(self, sport, game, player_data, prediction_inputs, stats_digests):
+        """
+        Digest everything a game's predictions are built from
+        
+        Covers the schedule entry (time and status), both rosters, the team statistics
+        the players' stats came from, every input's line and features, the model and
+        the over-probability distributions of the game's stat types, so a model change
+        or a refit recomputes the game.
+        
+        Args:
+            sport (str): Sport code
+            game (dict): Game data
+            player_data (dict): Player data for home and away teams
+            prediction_inputs (list): The game's prediction inputs
+            stats_digests (dict): Team statistics digests by team ID
+            
+        Returns:
+            str: Hex digest
+        """
+        team_ids = [player_data[team].get('id') for team in ('home_team', 'away_team')]
+        distributions = {
+            stat_type: self.probabilities.distribution(sport, stat_type)
+            for stat_type in {item.stat_type for item in prediction_inputs}
+        }
+        digest_input = {
+            'version': FINGERPRINT_VERSION,
+            'game': [game.get('id'), game.get('scheduled'), game.get('status')],
+            'rosters': [sorted(player['id'] for player in player_data[team]['players'])
+                        for team in ('home_team', 'away_team')],
+            'stats': [stats_digests.get(team_id) for team_id in team_ids],
+            'inputs': sorted(
+                [item.player.player_id, item.stat_type, item.prizepicks_line, sorted(item.features.items())]
+                for item in prediction_inputs
+            ),
+            'model': model_identity(self.inference.model),
+            'distributions': sorted(
+                [stat_type, dist.family, dist.cv, dist.dispersion] for stat_type, dist in distributions.items()
+            )
+        }
+        return hashlib.sha1(json.dumps(digest_input, default=str).encode()).hexdigest()
+    
+    def iter_changed_games(self, sport, game_players, incremental=True):
+        """
+        Build prediction inputs for a chunk of games, skipping games whose inputs are unchanged
+        
+        Args:
+            sport (str): Sport code
+            game_players (list): (game, player data) pairs
+            incremental (bool): Skip games whose fingerprint matches the stored one
+            
+        Yields:
+            tuple: (game, prediction inputs, fingerprint) for each game that needs predictions
+        """
+        season = self.api.season_year_for(sport, datetime.now().date())
+        team_ids = [player_data[team].get('id') for _, player_data in game_players for team in ('home_team', 'away_team')]
+        stats_digests = self.stats_store.team_digests(sport, season, [team_id for team_id in team_ids if team_id])
+        stored = self.load_fingerprints([game.get('id') for game, _ in game_players]) if incremental else {}
+        
+        for game, player_data in game_players:
+            prediction_inputs = self.prepare_prediction_input(sport, game, player_data)
+            fingerprint = self.game_fingerprint(sport, game, player_data, prediction_inputs, stats_digests)
+            if incremental and stored.get(game.get('id')) == fingerprint:
+                self.skipped_games.append(game['id'])
+                continue
+            yield game, prediction_inputs, fingerprint
+    
+    def load_fingerprints(self, game_ids):
+        """
+        Get the stored fingerprints of some games
+        
+        Args:
+            game_ids (list): Game IDs
+            
+        Returns:
+            dict: Fingerprint by game ID; games without one are left out
+        """
+        game_ids = [game_id for game_id in game_ids if game_id]
+        if not game_ids:
+            return {}
+        try:
+            with self.engine.connect() as conn:
+                placeholders = ', '.join(f':id{i}' for i in range(len(game_ids)))
+                rows = conn.execute(text(
+                    f"SELECT game_id, fingerprint FROM game_fingerprint WHERE game_id IN ({placeholders})"
+                ), {f'id{i}': game_id for i, game_id in enumerate(game_ids)}).fetchall()
+            return {row[0]: row[1] for row in rows}
+        except Exception as e:
+            logger.error(f"Error loading game fingerprints: {e}")
+            return {}
+    
+    def save_fingerprints(self, sport, fingerprints):
+        """
+        Record the fingerprints of games whose predictions were saved
+        
+        Args:
+            sport (str): Sport code
+            fingerprints (dict): Fingerprint by game ID
+        """
+        if not fingerprints:
+            return
+        now = datetime.utcnow()
+        try:
+            with self.engine.begin() as conn:
+                upsert_rows(conn, GameFingerprint.__table__, ('game_id',), [
+                    {'game_id': game_id, 'sport': sport, 'fingerprint': fingerprint, 'updated_at': now}
+                    for game_id, fingerprint in fingerprints.items()
+                ])
+        except Exception as e:
+            logger.error(f"Error saving game fingerprints: {e}")
+    
+    def load_saved_predictions(self, game_ids):
+        """
+        Read the stored predictions of some games back in the pipeline's prediction format
+        
+        Args:
+            game_ids (list): Game IDs
+            
+        Returns:
+            list: PredictionRecord predictions
+        """
+        predictions = []
+        for i in range(0, len(game_ids), 500):
+            chunk = game_ids[i:i + 500]
+            placeholders = ', '.join(f':id{j}' for j in range(len(chunk)))
+            with self.engine.connect() as conn:
+                rows = conn.execute(text(
+                    "SELECT player_name, player_id, team, opponent, game_date, game_id, sport, stat_type, "
+                    "predicted_value, over_probability, line, confidence, top_factors "
+                    f"FROM prediction WHERE game_id IN ({placeholders}) ORDER BY id"
+                ), {f'id{j}': game_id for j, game_id in enumerate(chunk)}).fetchall()
+            predictions.extend(PredictionRecord.from_row(row) for row in rows)
+        return predictions
+    
+    def iter_prediction_batches(self, prediction_inputs):
+        """
+        Score prediction inputs in batches of batch_size
+        
+        Args:
+            prediction_inputs (iterable): Prediction inputs
+            
+        Yields:
+            list: Predictions for one batch
+        """
+        batch = []
+        for input_data in prediction_inputs:
+            batch.append(input_data)
+            if len(batch) >= self.batch_size:
+                yield self.generate_predictions(batch)
+                batch = []
+        if batch:
+            yield self.generate_predictions(batch)
+    
+    def save_predictions(self, predictions):
+        """
+        Save predictions to the database and to JSON files in the output directory
+        
+        Args:
+            predictions (list): List of PredictionRecord predictions
+            
+        Returns:
+            int: Number of predictions saved
+        """
+        saved = self.save_predictions_to_db(predictions)
+        
+        # Also write JSON files in the format expected by the import command
+        by_sport = {}
+        for prediction in predictions:
+            by_sport.setdefault(prediction.sport, []).append(prediction)
+        
+        for sport, sport_predictions in by_sport.items():
+            with PredictionFileWriter(self._predictions_file(sport)) as writer:
+                writer.write(sport_predictions)
+        
+        return saved
+    
+    def _predictions_file(self, sport):
+        """Path of today's predictions JSON file for a sport"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        return os.path.join(self.output_dir, f"predictions_{today}_{sport}.json")
+    
+    def save_predictions_to_db(self, predictions):
+        """
+        Save predictions to the database, updating existing ones for the same player, game and stat
+        
+        The predictions are upserted in chunks inside one transaction.
+        
+        Args:
+            predictions (list): List of PredictionRecord predictions
+            
+        Returns:
+            int: Number of predictions saved
+        """
+        if not predictions:
+            return 0
+        
+        now = datetime.utcnow()
+        
+        try:
+            rows = [prediction.to_row(now) for prediction in predictions]
+            with self.engine.begin() as conn:
+                return upsert_predictions(conn, rows)
+        except Exception as e:
+            logger.error(f"Error saving {len(predictions)} predictions: {e}")
+            return 0
+    
+    def iter_sport_results(self, sport, games, incremental=True):
+        """
+        Run one sport's fetch -> feature -> predict chain
+        
+        The consumer must apply each event before pulling the next one: fingerprints
+        are only yielded after the predictions they cover.
+        
+        Args:
+            sport (str): Sport code
+            games (list): The sport's upcoming games
+            incremental (bool): Skip games whose inputs are unchanged
+            
+        Yields:
+            tuple: ('predictions', list of predictions), ('fingerprints', {game_id: fingerprint})
+                after each chunk of games, and finally ('skipped', list of unchanged game IDs)
+        """
+        self.skipped_games = []
+        self.probabilities.refresh(self.engine)
+        for game_players in self.iter_game_chunks(sport, games):
+            fingerprints = {}
+            
+            def changed_inputs():
+                for game, prediction_inputs, fingerprint in self.iter_changed_games(sport, game_players, incremental):
+                    fingerprints[game['id']] = fingerprint
+                    yield from prediction_inputs
+            
+            for predictions in self.iter_prediction_batches(changed_inputs()):
+                yield 'predictions', predictions
+            
+            yield 'fingerprints', fingerprints
+        
+        yield 'skipped', self.skipped_games
+    
+    def run_pipeline(self, days_ahead=7, incremental=True, workers=None):
+        """
+        Run the full pipeline: fetch games, rosters and stats, generate predictions and save them
+        
+        The stages (games -> rosters and stats -> inputs -> predictions -> writes) are
+        generators pulled one chunk at a time, so memory stays bounded by the chunk
+        and batch sizes rather than the number of days and sports requested, and each
+        batch reaches the database as soon as it is scored.
+        
+        In incremental mode each game's inputs are fingerprinted, and games whose
+        fingerprint matches the one recorded by the last run are not scored or
+        written again.
+        
+        With more than one worker, each sport runs in its own worker process and this
+        process is the single writer for every sport's results.
+        
+        Args:
+            days_ahead (int): Number of days to look ahead
+            incremental (bool): Only recompute games whose inputs changed
+            workers (int): Worker processes. Defaults to PIPELINE_WORKERS or 1 (run in this process).
+            
+        Returns:
+            int: Number of predictions saved
+        """
+        logger.info(f"Starting live data pipeline run for the next {days_ahead} days")
+        
+        workers = int(workers or os.environ.get('PIPELINE_WORKERS', 1))
+        self._ensure_tables()
+        
+        if workers > 1:
+            total_saved = self._run_parallel(days_ahead, incremental, workers)
+            logger.info(f"Live data pipeline run complete: {total_saved} predictions saved")
+            return total_saved
+        
+        total_saved = 0
+        
+        # Each roster and player's stats are resolved once and shared by every game that needs them
+        self.entities = EntityCache()
+        try:
+            for sport, games in self.iter_upcoming_games(days_ahead=days_ahead):
+                if not games:
+                    continue
+                
+                writer = SportResultWriter(self, sport)
+                try:
+                    for kind, payload in self.iter_sport_results(sport, games, incremental):
+                        writer.handle(kind, payload)
+                except Exception:
+                    writer.close(complete=False)
+                    raise
+                total_saved += writer.close()
+                
+                # Entities are per sport, so the next sport starts with an empty cache
+                self.entities.clear()
+            
+            for kind, counts in self.entities.summary().items():
+                logger.info(f"Resolved {counts['fetched']} {kind} entities, avoided {counts['reused']} repeat fetches")
+        finally:
+            self.entities = None
+        
+        logger.info(f"Live data pipeline run complete: {total_saved} predictions saved")
+        return total_saved
+    
+    def _run_parallel(self, days_ahead, incremental, workers):
         """
-        Placeholder prediction model
+        Run every sport in its own worker process, writing their results from this process
+        
+        Workers stream results through a bounded queue, so a worker blocks once the
+        writer falls behind instead of piling results up in memory.
         
         Args:
-            input_data (dict): Input data for prediction
+            days_ahead (int): Number of days to look ahead
+            incremental (bool): Only recompute games whose inputs changed
+            workers (int): Worker processes
+            
+        Returns:
+            int: Number of predictions saved
+        """
+        # Spawned workers start clean instead of inheriting this process's threads and connections
+        context = multiprocessing.get_context('spawn')
+        total_saved = 0
+        writers = {}
+        finished = set()
+        
+        with context.Manager() as manager:
+            results = manager.Queue(maxsize=workers * 4)
+            database_url = self.engine.url.render_as_string(hide_password=False)
             
+            with ProcessPoolExecutor(max_workers=min(workers, len(self.supported_sports)), mp_context=context) as pool:
+                futures = {
+                    pool.submit(run_sport_worker, self.api.api_key, sport, days_ahead, incremental, database_url, results): sport
+                    for sport in self.supported_sports
+                }
+                
+                while len(finished) < len(futures):
+                    try:
+                        sport, kind, payload = results.get(timeout=1)
+                    except queue.Empty:
+                        # A worker that died without reporting back is finished too
+                        for future, sport in futures.items():
+                            if sport not in finished and future.done() and future.exception() is not None:
+                                logger.error(f"Worker for {sport} failed: {future.exception()}")
+                                finished.add(sport)
+                                if sport in writers:
+                                    total_saved += writers.pop(sport).close(complete=False)
+                        continue
+                    
+                    if kind in ('done', 'error'):
+                        finished.add(sport)
+                        if kind == 'error':
+                            logger.error(f"Error running pipeline for {sport}: {payload}")
+                        else:
+                            for entity_kind, counts in payload.items():
+                                logger.info(f"Resolved {counts['fetched']} {sport} {entity_kind} entities, "
+                                            f"avoided {counts['reused']} repeat fetches")
+                        if sport in writers:
+                            total_saved += writers.pop(sport).close(complete=(kind == 'done'))
+                        continue
+                    
+                    if sport not in writers:
+                        writers[sport] = SportResultWriter(self, sport)
+                    writers[sport].handle(kind, payload)
+        
+        for writer in writers.values():
+            total_saved += writer.close()
+        
+        return total_saved
+    
+    def _ensure_tables(self):
+        """Create missing tables, e.g. on a fresh DATABASE_URL, and apply pending schema migrations"""
+        try:
+            db.metadata.create_all(self.engine)
+            migrate(self.engine)
+        except Exception as e:
+            logger.error(f"Error preparing pipeline tables: {e}")
+
+class SportResultWriter:
+    """
+    Applies one sport's pipeline results: saves predictions, records fingerprints and writes the JSON export
+    """
+    
+    def __init__(self, pipeline, sport):
+        """
+        Initialize the writer
+        
+        Args:
+            pipeline (LiveDataPipeline): Pipeline whose database and output directory are written to
+            sport (str): Sport code
+        """
+        self.pipeline = pipeline
+        self.sport = sport
+        self.saved = 0
+        self.skipped = []
+        # Games with predictions the database did not take; their fingerprints are not
+        # recorded, so the next incremental run predicts them again
+        self.failed_games = set()
+        self.file_writer = PredictionFileWriter(pipeline._predictions_file(sport)).__enter__()
+    
+    def handle(self, kind, payload):
+        """
+        Apply one result from LiveDataPipeline.iter_sport_results
+        
+        Args:
+            kind (str): 'predictions', 'fingerprints' or 'skipped'
+            payload: The result
+        """
+        if kind == 'predictions':
+            saved = self.pipeline.save_predictions_to_db(payload)
+            if payload and not saved:
+                self.failed_games.update(prediction.player.game_id for prediction in payload)
+            self.saved += saved
+            self.file_writer.write(payload)
+        elif kind == 'fingerprints':
+            if self.failed_games:
+                logger.warning(f"Not recording fingerprints of {len(self.failed_games)} {self.sport} games whose predictions were not saved")
+                payload = {game_id: fingerprint for game_id, fingerprint in payload.items() if game_id not in self.failed_games}
+            self.pipeline.save_fingerprints(self.sport, payload)
+        elif kind == 'skipped':
+            self.skipped = payload
+    
+    def close(self, complete=True):
+        """
+        Finish the JSON export
+        
+        Args:
+            complete (bool): Whether the sport ran to the end. An incomplete export is
+                discarded and the previous file kept.
+        
         Returns:
-            float: Predicted value
+            int: Number of predictions saved for the sport
         """
-        # In production, this would be the actual neural network model
-        # For now, we'll use a simple model based on the features
-        features = input_data['features']
+        if not complete:
+            self.file_writer.__exit__(RuntimeError, None, None)
+            logger.warning(f"Saved {self.saved} {self.sport} predictions before the run failed")
+            return self.saved
+        
+        # Keep the export complete: unchanged games keep their stored predictions.
+        # If nothing changed the writer is left empty and the previous file stays.
+        if self.file_writer.count and self.skipped:
+            self.file_writer.write(self.pipeline.load_saved_predictions(self.skipped))
+        self.file_writer.__exit__(None, None, None)
+        
+        logger.info(f"Saved {self.saved} {self.sport} predictions, {len(self.skipped)} games unchanged")
+        return self.saved
+
+def run_sport_worker(api_key, sport, days_ahead, incremental, database_url, results):
+    """
+    Worker process entry point: run one sport's chain and stream its results to the writer
+    
+    Args:
+        api_key (str): Sportradar API key
+        sport (str): Sport code
+        days_ahead (int): Number of days to look ahead
+        incremental (bool): Skip games whose inputs are unchanged
+        database_url (str): Database the stored fingerprints are read from
+        results (Queue): Queue of (sport, kind, payload) results
+    """
+    try:
+        pipeline = LiveDataPipeline(api_key)
+        pipeline.engine = make_engine(database_url)
+        pipeline.entities = EntityCache()
+        
+        logger.info(f"Fetching upcoming games for {sport}")
+        games = pipeline.api.get_upcoming_games(sport, days=days_ahead)
+        logger.info(f"Found {len(games)} upcoming {sport} games")
+        
+        if games:
+            for kind, payload in pipeline.iter_sport_results(sport, games, incremental):
+                results.put((sport, kind, payload))
         
-        # Base prediction on season average and last 5 aver<response clipped><NOTE>To save on context only part of this file has been shown to you. You should retry this tool after you have searched inside the file with `grep -n` in order to find the line numbers of what you are looking for.</NOTE>
\ No newline at end of file
+        results.put((sport, 'done', pipeline.entities.summary()))
+    except Exception as e:
+        results.put((sport, 'error', str(e)))
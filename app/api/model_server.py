@@ -0,0 +1,322 @@
+"""
+Long-lived model server with micro-batching.
+
+The model is loaded once and kept in memory. Concurrent prediction requests, whether
+made in-process or by clients on the local socket, are gathered into micro-batches
+and scored in one model call each:
+
+    python -m app.api.model_server serve --socket cache/model_server.sock
+    MODEL_SERVER_SOCKET=cache/model_server.sock python data_pipeline_scheduled.py
+
+The model is the factory named by PREDICTOR_MODEL ("package.module:factory", called
+once and returning model(matrix, rng)) or, by default, the placeholder model.
+"""
+
+import os
+import sys
+import time
+import queue
+import logging
+import argparse
+import importlib
+import threading
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+from app.api.batch_inference import placeholder_model
+
+logger = logging.getLogger('model_server')
+
+def load_model():
+    """
+    Load the prediction model named by PREDICTOR_MODEL
+
+    Returns:
+        callable: model(matrix, rng) returning predicted values
+    """
+    spec = os.environ.get('PREDICTOR_MODEL')
+    if not spec:
+        return placeholder_model
+    module_name, _, factory_name = spec.partition(':')
+    factory = getattr(importlib.import_module(module_name), factory_name or 'load_model')
+    logger.info(f"Loading prediction model from {spec}")
+    return factory()
+
+def _authkey():
+    key = os.environ.get('MODEL_SERVER_AUTHKEY')
+    return key.encode() if key else None
+
+class _Request:
+    __slots__ = ('matrix', 'future')
+
+    def __init__(self, matrix):
+        self.matrix = matrix
+        self.future = Future()
+
+class ModelServer:
+    """
+    Scores feature matrices with a model loaded once, in micro-batches.
+
+    A single worker thread takes the first waiting request, keeps collecting requests
+    for up to max_wait seconds or until max_batch rows are gathered, stacks them into
+    one matrix and makes one model call for all of them.
+    """
+
+    def __init__(self, model=None, max_batch=None, max_wait=None, seed=None):
+        """
+        Initialize the server and start its batching thread
+
+        Args:
+            model (callable): model(matrix, rng). Defaults to load_model().
+            max_batch (int): Rows per model call. Defaults to MODEL_SERVER_MAX_BATCH or 8192.
+            max_wait (float): Seconds a request may wait for others to join its batch.
+                Defaults to MODEL_SERVER_MAX_WAIT or 0.005.
+            seed (int): Seed for the model's noise
+        """
+        self.model = model or load_model()
+        self.max_batch = max_batch or int(os.environ.get('MODEL_SERVER_MAX_BATCH', 8192))
+        self.max_wait = max_wait if max_wait is not None else float(os.environ.get('MODEL_SERVER_MAX_WAIT', 0.005))
+        self.rng = np.random.default_rng(seed)
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='model-server', daemon=True)
+        self._thread.start()
+
+    def submit(self, matrix):
+        """
+        Queue a feature matrix for scoring
+
+        Args:
+            matrix (np.ndarray): Feature matrix with FEATURE_COLUMNS as columns
+
+        Returns:
+            concurrent.futures.Future: Resolves to the predicted values
+        """
+        request = _Request(np.asarray(matrix, dtype=np.float64))
+        self._queue.put(request)
+        return request.future
+
+    def predict(self, matrix, rng=None):
+        """
+        Score a feature matrix, waiting for its batch
+
+        Has the model(matrix, rng) signature so the server can stand in for the model;
+        rng is ignored in favour of the server's own.
+
+        Returns:
+            np.ndarray: Predicted values
+        """
+        return self.submit(matrix).result()
+
+    __call__ = predict
+
+    def close(self):
+        """Stop the batching thread once the queued requests are scored"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            batch = [request]
+            rows = len(request.matrix)
+            stop = False
+            deadline = time.monotonic() + self.max_wait
+
+            while rows < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+                rows += len(request.matrix)
+
+            self._score(batch)
+            if stop:
+                return
+
+    def _score(self, batch):
+        """Score a micro-batch with one model call and hand each request its rows"""
+        try:
+            matrix = batch[0].matrix if len(batch) == 1 else np.vstack([request.matrix for request in batch])
+            predicted = np.asarray(self.model(matrix, self.rng))
+        except Exception as e:
+            logger.error(f"Error scoring batch of {len(batch)} requests: {e}")
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.requests += len(batch)
+        offsets = np.cumsum([len(request.matrix) for request in batch])[:-1]
+        for request, values in zip(batch, np.split(predicted, offsets)):
+            request.future.set_result(values)
+
+    def serve(self, path):
+        """
+        Answer prediction requests on a local socket until interrupted
+
+        Each client connection is handled by its own thread; their requests share the
+        micro-batches.
+
+        Args:
+            path (str): Unix socket path
+        """
+        if os.path.exists(path):
+            os.remove(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        with Listener(path, family='AF_UNIX', authkey=_authkey()) as listener:
+            os.chmod(path, 0o600)
+            logger.info(f"Model server listening on {path}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except OSError as e:
+                    logger.error(f"Error accepting model server connection: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        """Serve one client connection"""
+        with conn:
+            while True:
+                try:
+                    matrix = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    conn.send(('ok', self.predict(matrix)))
+                except (EOFError, OSError):
+                    return
+                except Exception as e:
+                    try:
+                        conn.send(('error', str(e)))
+                    except (EOFError, OSError):
+                        return
+
+class ModelClient:
+    """
+    Model callable backed by a model server on a local socket.
+
+    Falls back to an in-process model when the server cannot be reached, so a
+    missing server slows predictions down instead of failing them.
+    """
+
+    def __init__(self, path, fallback=None, timeout=None):
+        """
+        Initialize the client
+
+        Args:
+            path (str): Unix socket path of the server
+            fallback (callable): Model used when the server is unavailable. Defaults to placeholder_model.
+            timeout (float): Seconds to wait for the server's answer. Defaults to MODEL_SERVER_TIMEOUT or 30.
+        """
+        self.path = path
+        self.fallback = fallback or placeholder_model
+        self.timeout = timeout or float(os.environ.get('MODEL_SERVER_TIMEOUT', 30))
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def __call__(self, matrix, rng=None):
+        """
+        Score a feature matrix on the server
+
+        Args:
+            matrix (np.ndarray): Feature matrix with FEATURE_COLUMNS as columns
+            rng (np.random.Generator): Only used by the fallback model
+
+        Returns:
+            np.ndarray: Predicted values
+        """
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._conn is None:
+                        self._conn = Client(self.path, family='AF_UNIX', authkey=_authkey())
+                    self._conn.send(np.asarray(matrix, dtype=np.float64))
+                    if not self._conn.poll(self.timeout):
+                        # A late answer would be read as the next request's, so drop the connection
+                        self._close()
+                        logger.warning(f"Model server at {self.path} did not answer in {self.timeout}s, scoring in-process")
+                        return self.fallback(matrix, rng or np.random.default_rng())
+                    status, result = self._conn.recv()
+                    break
+                except (EOFError, OSError) as e:
+                    # Drop the connection and retry once on a fresh one, e.g. after a server restart
+                    self._close()
+                    if attempt:
+                        logger.warning(f"Model server at {self.path} unavailable, scoring in-process: {e}")
+                        return self.fallback(matrix, rng or np.random.default_rng())
+
+        if status != 'ok':
+            raise RuntimeError(f"Model server error: {result}")
+        return result
+
+    def _close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+            self._conn = None
+
+def model_from_env():
+    """
+    Get the model to score predictions with
+
+    Returns:
+        callable: A ModelClient if MODEL_SERVER_SOCKET is set, otherwise None (use the in-process model)
+    """
+    path = os.environ.get('MODEL_SERVER_SOCKET')
+    return ModelClient(path) if path else None
+
+def model_identity(model):
+    """
+    Name the model predictions are scored with, for change detection
+
+    Args:
+        model (callable): The scoring model, e.g. BatchInferenceEngine.model
+
+    Returns:
+        str: For a ModelClient, the server's PREDICTOR_MODEL factory (or 'placeholder')
+            and socket; otherwise the model function's qualified name
+    """
+    if isinstance(model, ModelClient):
+        return f"{os.environ.get('PREDICTOR_MODEL') or 'placeholder'}@{model.path}"
+    return f"{model.__module__}:{getattr(model, '__qualname__', type(model).__qualname__)}"
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Prediction model server')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help='Load the model once and serve predictions on a local socket')
+    serve_parser.add_argument('--socket', default=os.environ.get('MODEL_SERVER_SOCKET', 'cache/model_server.sock'))
+    serve_parser.add_argument('--max-batch', type=int, default=None, help='Rows per model call')
+    serve_parser.add_argument('--max-wait', type=float, default=None, help='Seconds a request waits for its batch to fill')
+    serve_parser.add_argument('--seed', type=int, default=None)
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        server = ModelServer(max_batch=args.max_batch, max_wait=args.max_wait, seed=args.seed)
+        try:
+            server.serve(args.socket)
+        except KeyboardInterrupt:
+            pass
+
+    return 0
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -0,0 +1,214 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger('player_stats_store')
+
+def split_team_statistics(team_stats):
+    """
+    Split a team's seasonal statistics payload into per-player records
+
+    Args:
+        team_stats (dict): Team seasonal statistics payload
+
+    Returns:
+        list: Player statistics records, one per player on the team
+    """
+    if not team_stats:
+        return []
+
+    records = []
+    for player in team_stats.get('players', []):
+        if not player.get('id'):
+            continue
+        records.append({
+            'id': player['id'],
+            'team_id': team_stats.get('id'),
+            'statistics': player
+        })
+    return records
+
+class PlayerStatsStore:
+    """
+    Local store of per-player season statistics, filled in bulk from team statistics
+    """
+
+    def __init__(self, db_path, max_age=None):
+        """
+        Initialize the store
+
+        Args:
+            db_path (str): Path of the SQLite file holding the statistics
+            max_age (int): Seconds before a team's statistics are ingested again.
+                Defaults to SPORTRADAR_STATS_MAX_AGE or 86400.
+        """
+        self.db_path = db_path
+        self.max_age = int(max_age or os.environ.get('SPORTRADAR_STATS_MAX_AGE', 86400))
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS player_stats ("
+            "sport TEXT NOT NULL, season TEXT NOT NULL, player_id TEXT NOT NULL, "
+            "team_id TEXT, payload TEXT NOT NULL, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (sport, season, player_id))"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_player_stats_team ON player_stats (sport, season, team_id)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS team_stats_load ("
+            "sport TEXT NOT NULL, season TEXT NOT NULL, team_id TEXT NOT NULL, "
+            "loaded_at REAL NOT NULL, digest TEXT, PRIMARY KEY (sport, season, team_id))"
+        )
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(team_stats_load)")]
+        if 'digest' not in columns:
+            conn.execute("ALTER TABLE team_stats_load ADD COLUMN digest TEXT")
+
+    def _connection(self):
+        """SQLite connection for the current thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def stale_teams(self, sport, season, team_ids):
+        """
+        Get the teams whose statistics are missing or older than max_age
+
+        Args:
+            sport (str): Sport code
+            season (str): Season year
+            team_ids (iterable): Team IDs
+
+        Returns:
+            list: Team IDs that need to be ingested
+        """
+        team_ids = list(dict.fromkeys(team_ids))
+        cutoff = time.time() - self.max_age
+        fresh = set()
+        conn = self._connection()
+
+        for i in range(0, len(team_ids), 500):
+            chunk = team_ids[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f"SELECT team_id FROM team_stats_load WHERE sport = ? AND season = ? "
+                f"AND loaded_at >= ? AND team_id IN ({placeholders})",
+                [sport, str(season), cutoff] + chunk
+            ).fetchall()
+            fresh.update(row[0] for row in rows)
+
+        return [team_id for team_id in team_ids if team_id not in fresh]
+
+    def store_team(self, sport, season, team_id, team_stats):
+        """
+        Split a team statistics payload into per-player records and store them
+
+        Args:
+            sport (str): Sport code
+            season (str): Season year
+            team_id (str): Team ID
+            team_stats (dict): Team seasonal statistics payload
+
+        Returns:
+            int: Number of player records stored
+        """
+        now = time.time()
+        rows = [
+            (sport, str(season), record['id'], team_id, json.dumps(record), now)
+            for record in split_team_statistics(team_stats)
+        ]
+        # Stale copies served from the cache carry a '_stale' marker; it is not part of the content
+        content = {key: value for key, value in team_stats.items() if key != '_stale'}
+        digest = hashlib.sha1(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO player_stats (sport, season, player_id, team_id, payload, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO team_stats_load (sport, season, team_id, loaded_at, digest) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (sport, str(season), team_id, now, digest)
+            )
+
+        return len(rows)
+
+    def team_digests(self, sport, season, team_ids):
+        """
+        Get the content digests of the last statistics ingested for some teams
+
+        Args:
+            sport (str): Sport code
+            season (str): Season year
+            team_ids (iterable): Team IDs
+
+        Returns:
+            dict: Digest by team ID; teams never ingested are left out
+        """
+        team_ids = list(dict.fromkeys(team_ids))
+        if not team_ids:
+            return {}
+        placeholders = ','.join('?' * len(team_ids))
+        rows = self._connection().execute(
+            f"SELECT team_id, digest FROM team_stats_load WHERE sport = ? AND season = ? "
+            f"AND team_id IN ({placeholders})",
+            [sport, str(season)] + team_ids
+        ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def get(self, sport, season, player_id):
+        """
+        Get a player's statistics record
+
+        Args:
+            sport (str): Sport code
+            season (str): Season year
+            player_id (str): Player ID
+
+        Returns:
+            dict: Player statistics record, or None if the player is not stored
+        """
+        row = self._connection().execute(
+            "SELECT payload FROM player_stats WHERE sport = ? AND season = ? AND player_id = ?",
+            (sport, str(season), player_id)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, sport, season, player_ids):
+        """
+        Get statistics records for several players
+
+        Args:
+            sport (str): Sport code
+            season (str): Season year
+            player_ids (iterable): Player IDs
+
+        Returns:
+            dict: Player statistics records by player ID; players not stored are left out
+        """
+        player_ids = list(dict.fromkeys(player_ids))
+        records = {}
+        conn = self._connection()
+
+        for i in range(0, len(player_ids), 500):
+            chunk = player_ids[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f"SELECT player_id, payload FROM player_stats WHERE sport = ? AND season = ? "
+                f"AND player_id IN ({placeholders})",
+                [sport, str(season)] + chunk
+            ).fetchall()
+            records.update((row[0], json.loads(row[1])) for row in rows)
+
+        return records
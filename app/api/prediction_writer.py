@@ -0,0 +1,78 @@
+import os
+import json
+import logging
+
+logger = logging.getLogger('prediction_writer')
+
+class PredictionFileWriter:
+    """
+    Streams predictions into a JSON array file, one chunk at a time.
+
+    The file is written under a temporary name and only replaces the previous file
+    once the array is complete, so readers never see a partial file. Errors are
+    logged and do not interrupt the pipeline.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the writer
+
+        Args:
+            path (str): Path of the JSON file to write
+        """
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.count = 0
+        self._file = None
+
+    def __enter__(self):
+        try:
+            self._file = open(self.tmp_path, 'w')
+            self._file.write('[')
+        except OSError as e:
+            logger.error(f"Error writing predictions file {self.path}: {e}")
+            self._file = None
+        return self
+
+    def write(self, predictions):
+        """
+        Append predictions to the array
+
+        Args:
+            predictions (list): PredictionRecord predictions to append
+        """
+        if self._file is None:
+            return
+        try:
+            for prediction in predictions:
+                self._file.write(',\n' if self.count else '\n')
+                json.dump(prediction.to_dict(), self._file)
+                self.count += 1
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Error writing predictions file {self.path}: {e}")
+            self._abort()
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._file is None:
+            return False
+        if exc_type is not None or not self.count:
+            self._abort()
+            return False
+        try:
+            self._file.write('\n]\n')
+            self._file.close()
+            os.replace(self.tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"Error writing predictions file {self.path}: {e}")
+            self._abort()
+        self._file = None
+        return False
+
+    def _abort(self):
+        """Drop the partial file"""
+        try:
+            self._file.close()
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+        self._file = None
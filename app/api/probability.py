@@ -0,0 +1,237 @@
+import os
+import time
+import logging
+import threading
+from collections import defaultdict
+
+import numpy as np
+from sqlalchemy import text
+
+logger = logging.getLogger('probability')
+
+# Stats with large, roughly continuous totals are modelled as normal; everything else is a count
+NORMAL_STATS = {'passing_yards', 'rushing_yards', 'receiving_yards', 'points', 'saves'}
+
+# Spread of a normal stat relative to its mean when there is not enough history to fit one
+DEFAULT_CV = 0.35
+
+# Settled predictions needed before a (sport, stat type) gets fitted parameters
+MIN_SAMPLES = 50
+
+# Fitted negative binomial sizes above this are indistinguishable from Poisson
+MAX_DISPERSION = 50.0
+
+# Counts above this are evaluated with the normal approximation instead of summing the pmf
+MAX_EXACT_COUNT = 200
+
+def normal_cdf(x):
+    """
+    Standard normal CDF, vectorized
+
+    Uses the Abramowitz and Stegun 7.1.26 approximation of erf (absolute error below 1.5e-7).
+
+    Args:
+        x (np.ndarray): Standard scores
+
+    Returns:
+        np.ndarray: P(Z <= x)
+    """
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+def count_cdf(mean, counts, dispersion=None):
+    """
+    P(X <= counts) for Poisson or negative binomial counts, vectorized
+
+    Args:
+        mean (np.ndarray): Expected counts
+        counts (np.ndarray): Integer thresholds, at most MAX_EXACT_COUNT
+        dispersion (float): Negative binomial size r; None for Poisson
+
+    Returns:
+        np.ndarray: Cumulative probabilities
+    """
+    mean = np.maximum(mean, 1e-9)
+    k_max = int(counts.max()) if len(counts) else 0
+
+    if dispersion is None:
+        pmf = np.exp(-mean)
+    else:
+        p = mean / (dispersion + mean)
+        pmf = (1.0 - p) ** dispersion
+
+    cdf = np.where(counts >= 0, pmf, 0.0)
+    for k in range(1, k_max + 1):
+        if dispersion is None:
+            pmf = pmf * mean / k
+        else:
+            pmf = pmf * (k - 1 + dispersion) / k * p
+        cdf += np.where(counts >= k, pmf, 0.0)
+    return np.minimum(cdf, 1.0)
+
+class StatDistribution:
+    """
+    Distribution family and fitted parameters of one sport and stat type
+    """
+
+    def __init__(self, family, cv=DEFAULT_CV, dispersion=None, samples=0):
+        """
+        Initialize the distribution
+
+        Args:
+            family (str): 'normal', 'poisson' or 'negative_binomial'
+            cv (float): Standard deviation relative to the mean, for 'normal'
+            dispersion (float): Size r, for 'negative_binomial'
+            samples (int): Settled predictions the parameters were fitted from
+        """
+        self.family = family
+        self.cv = cv
+        self.dispersion = dispersion
+        self.samples = samples
+
+    def over_probabilities(self, mean, lines):
+        """
+        P(stat > line) for whole arrays of predictions
+
+        Args:
+            mean (np.ndarray): Predicted stat values, used as the distribution means
+            lines (np.ndarray): Lines
+
+        Returns:
+            np.ndarray: Probabilities of going over each line
+        """
+        if self.family == 'normal':
+            sigma = np.maximum(self.cv * mean, 1e-6)
+            return 1.0 - normal_cdf((lines - mean) / sigma)
+
+        counts = np.floor(lines)
+        exact = counts <= MAX_EXACT_COUNT
+        probability = np.empty(len(mean))
+
+        if exact.any():
+            probability[exact] = 1.0 - count_cdf(mean[exact], counts[exact], self.dispersion)
+        if not exact.all():
+            # Large counts: normal approximation with a continuity correction
+            m = mean[~exact]
+            variance = m if self.dispersion is None else m + m * m / self.dispersion
+            probability[~exact] = 1.0 - normal_cdf((counts[~exact] + 0.5 - m) / np.sqrt(np.maximum(variance, 1e-9)))
+        return probability
+
+    @classmethod
+    def fit(cls, stat_type, predicted, actual):
+        """
+        Fit a stat type's distribution from settled predictions
+
+        Args:
+            stat_type (str): Stat type
+            predicted (np.ndarray): Predicted values, taken as the means
+            actual (np.ndarray): Actual values
+
+        Returns:
+            StatDistribution: The fitted distribution; defaults if there are too few samples
+        """
+        if stat_type in NORMAL_STATS:
+            positive = predicted > 0
+            if positive.sum() < MIN_SAMPLES:
+                return cls('normal')
+            relative = (actual[positive] - predicted[positive]) / predicted[positive]
+            return cls('normal', cv=float(np.sqrt(np.mean(relative ** 2))), samples=int(positive.sum()))
+
+        if len(predicted) < MIN_SAMPLES:
+            return cls('poisson')
+
+        # Method of moments: Var = mu + mu^2 / r, so overdispersion beyond Poisson gives r
+        excess = float(np.mean((actual - predicted) ** 2 - predicted))
+        dispersion = float(np.mean(predicted ** 2)) / excess if excess > 0 else None
+        if dispersion is None or dispersion > MAX_DISPERSION:
+            return cls('poisson', samples=len(predicted))
+        return cls('negative_binomial', dispersion=dispersion, samples=len(predicted))
+
+class ProbabilityEngine:
+    """
+    Over probabilities from a distribution per (sport, stat type), fitted from settled predictions.
+
+    Fitted parameters are cached and refitted at most every PROBABILITY_REFIT_SECONDS
+    (default 6 hours). Sport and stat types without enough history use the stat's
+    default family.
+    """
+
+    def __init__(self, refit_seconds=None):
+        """
+        Initialize the engine
+
+        Args:
+            refit_seconds (float): Minimum time between fits. Defaults to PROBABILITY_REFIT_SECONDS or 21600.
+        """
+        self.refit_seconds = refit_seconds or float(os.environ.get('PROBABILITY_REFIT_SECONDS', 21600))
+        self.distributions = {}
+        self.fitted_at = None
+        self._lock = threading.Lock()
+
+    def refresh(self, engine):
+        """
+        Refit the distributions from the database if the cached fit is stale
+
+        Args:
+            engine (sqlalchemy.engine.Engine): Database with the prediction and actual_result tables
+        """
+        with self._lock:
+            if self.fitted_at is not None and time.monotonic() - self.fitted_at < self.refit_seconds:
+                return
+            self.fitted_at = time.monotonic()
+
+            try:
+                with engine.connect() as conn:
+                    rows = conn.execute(text(
+                        "SELECT p.sport, p.stat_type, p.predicted_value, a.actual_value "
+                        "FROM prediction p JOIN actual_result a ON a.player_id = p.player_id "
+                        "AND a.game_id = p.game_id AND a.stat_type = p.stat_type"
+                    )).fetchall()
+            except Exception as e:
+                logger.error(f"Error loading settled predictions for probability fits: {e}")
+                return
+
+            samples = defaultdict(list)
+            for sport, stat_type, predicted_value, actual_value in rows:
+                if predicted_value is not None and actual_value is not None:
+                    samples[(sport, stat_type)].append((predicted_value, actual_value))
+
+            distributions = {}
+            for (sport, stat_type), values in samples.items():
+                values = np.array(values, dtype=np.float64)
+                distributions[(sport, stat_type)] = StatDistribution.fit(stat_type, values[:, 0], values[:, 1])
+            self.distributions = distributions
+
+            fitted = sum(1 for dist in distributions.values() if dist.samples)
+            logger.info(f"Fitted over-probability distributions for {fitted} sport and stat types from {len(rows)} results")
+
+    def distribution(self, sport, stat_type):
+        """
+        Get the distribution of a sport and stat type
+
+        Returns:
+            StatDistribution: Fitted distribution, or the stat's default family
+        """
+        dist = self.distributions.get((sport, stat_type))
+        if dist is None:
+            dist = StatDistribution('normal' if stat_type in NORMAL_STATS else 'poisson')
+        return dist
+
+    def over_probabilities(self, sport, stat_type, predicted, lines):
+        """
+        Probability of going over each line
+
+        Args:
+            sport (str): Sport code
+            stat_type (str): Stat type
+            predicted (np.ndarray): Predicted stat values
+            lines (np.ndarray): PrizePicks lines
+
+        Returns:
+            np.ndarray: Probabilities clamped to [0.01, 0.99]; 0.5 where the line is not positive
+        """
+        probability = self.distribution(sport, stat_type).over_probabilities(predicted, lines)
+        return np.where(lines > 0, np.clip(probability, 0.01, 0.99), 0.5)
@@ -0,0 +1,159 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger('rate_limiter')
+
+def _positive_rate(name, value):
+    """Parse a configured rate, rejecting rates that would never refill a bucket"""
+    rate = float(value)
+    if rate <= 0:
+        raise ValueError(f"{name} must be greater than 0, got {value}")
+    return rate
+
+class TokenBucketRateLimiter:
+    """
+    Token bucket rate limiter whose state is shared by every local process.
+
+    Bucket state lives in a small SQLite file, so gunicorn workers, the web routes
+    and the scheduled pipeline all draw from the same budget. Each bucket refills
+    at `rate` tokens per second up to `burst` tokens; callers only block once the
+    bucket is empty.
+    """
+
+    def __init__(self, db_path, rate=None, burst=None):
+        """
+        Initialize the rate limiter
+
+        Args:
+            db_path (str): Path of the SQLite file holding bucket state
+            rate (float): Default refill rate in requests per second.
+                Defaults to SPORTRADAR_QPS or 1.
+            burst (float): Default bucket capacity. Defaults to SPORTRADAR_BURST or the rate.
+        """
+        self.db_path = db_path
+        self.rate = _positive_rate('SPORTRADAR_QPS', rate or os.environ.get('SPORTRADAR_QPS', 1))
+        self.burst = float(burst or os.environ.get('SPORTRADAR_BURST', self.rate))
+        # Per-sport overrides are read on every request; reject bad ones up front
+        for name, value in os.environ.items():
+            if name.startswith('SPORTRADAR_QPS_'):
+                _positive_rate(name, value)
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS token_bucket ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def _connection(self):
+        """SQLite connection for the current thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def limits_for(self, sport):
+        """
+        Get the (rate, burst) configured for a sport
+
+        Per-sport overrides are read from SPORTRADAR_QPS_<SPORT> and SPORTRADAR_BURST_<SPORT>.
+
+        Args:
+            sport (str): Sport code
+
+        Returns:
+            tuple: (rate, burst)
+        """
+        suffix = (sport or '').upper()
+        rate = _positive_rate(f'SPORTRADAR_QPS_{suffix}', os.environ.get(f'SPORTRADAR_QPS_{suffix}', self.rate))
+        burst = float(os.environ.get(f'SPORTRADAR_BURST_{suffix}', self.burst if rate == self.rate else rate))
+        return rate, max(burst, 1.0)
+
+    def try_acquire(self, key, rate, burst):
+        """
+        Take one token from a bucket if one is available
+
+        Args:
+            key (str): Bucket key
+            rate (float): Refill rate in tokens per second
+            burst (float): Bucket capacity
+
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one is available
+        """
+        conn = self._connection()
+        now = time.time()
+
+        # BEGIN IMMEDIATE takes the write lock so the read-modify-write is atomic across processes
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM token_bucket WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                tokens = burst
+            else:
+                tokens = min(burst, row[0] + max(0.0, now - row[1]) * rate)
+
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+
+            conn.execute(
+                "INSERT OR REPLACE INTO token_bucket (key, tokens, updated_at) VALUES (?, ?, ?)",
+                (key, tokens, now)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        return wait
+
+    def acquire(self, sport, key_id='', max_wait=None):
+        """
+        Block until a request for this sport and API key is allowed
+
+        Args:
+            sport (str): Sport code
+            key_id (str): Identifier of the API key the budget belongs to
+            max_wait (float): Longest to wait for a token, e.g. the time left before a
+                request deadline. Unlimited if None.
+
+        Returns:
+            float: Total seconds spent waiting, or None if no token became available within max_wait
+        """
+        rate, burst = self.limits_for(sport)
+        key = f"{sport}:{key_id}"
+        waited = 0.0
+
+        while True:
+            try:
+                wait = self.try_acquire(key, rate, burst)
+            except sqlite3.Error as e:
+                # Never fail a request because the limiter state is unavailable
+                logger.error(f"Rate limiter unavailable, falling back to local pacing: {e}")
+                wait = 1.0 / rate
+                if max_wait is not None and waited + wait > max_wait:
+                    return None
+                time.sleep(wait)
+                return waited + wait
+
+            if wait <= 0:
+                if waited:
+                    logger.info(f"Rate limited {key} for {waited:.2f}s")
+                return waited
+
+            if max_wait is not None and waited + wait > max_wait:
+                logger.warning(f"Rate limited {key}: no token within {max_wait:.2f}s")
+                return None
+
+            time.sleep(wait)
+            waited += wait
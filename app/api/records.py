@@ -0,0 +1,313 @@
+import sys
+import json
+from datetime import date
+
+def _intern(value):
+    """Intern strings so repeated team, sport, stat and date values share one object"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+class FeatureBlock:
+    """
+    Player-level features, shared by every stat type of a player
+    """
+    __slots__ = ('player_age', 'player_height', 'player_weight', 'is_home', 'is_starter')
+
+    def __init__(self, player_age, player_height, player_weight, is_home, is_starter):
+        self.player_age = player_age
+        self.player_height = player_height
+        self.player_weight = player_weight
+        self.is_home = is_home
+        self.is_starter = is_starter
+
+    def key(self):
+        return (self.player_age, self.player_height, self.player_weight, self.is_home, self.is_starter)
+
+class Features:
+    """
+    Features of one player and stat type
+
+    Reads like the features dict it replaces (features['season_avg'], items()), so the
+    feature store and fingerprints see the same values as before.
+    """
+    __slots__ = ('block', 'season_avg', 'last_5_avg', 'opponent_defense_rank', 'days_rest')
+
+    # Same order as the features dict built by LiveDataPipeline._extract_player_features
+    NAMES = ('player_age', 'player_height', 'player_weight', 'season_avg', 'last_5_avg',
+             'opponent_defense_rank', 'days_rest', 'is_home', 'is_starter')
+
+    def __init__(self, block, season_avg, last_5_avg, opponent_defense_rank, days_rest):
+        self.block = block
+        self.season_avg = season_avg
+        self.last_5_avg = last_5_avg
+        self.opponent_defense_rank = opponent_defense_rank
+        self.days_rest = days_rest
+
+    @classmethod
+    def from_dict(cls, features, blocks):
+        """
+        Build features from a features dict
+
+        Args:
+            features (dict): Features by name
+            blocks (dict): Player-level blocks already built, by value. Identical blocks are
+                shared instead of duplicated.
+
+        Returns:
+            Features: The features
+        """
+        block = FeatureBlock(
+            features.get('player_age'),
+            features.get('player_height'),
+            features.get('player_weight'),
+            features.get('is_home'),
+            features.get('is_starter')
+        )
+        block = blocks.setdefault(block.key(), block)
+        return cls(
+            block,
+            features.get('season_avg'),
+            features.get('last_5_avg'),
+            features.get('opponent_defense_rank'),
+            features.get('days_rest')
+        )
+
+    def __getitem__(self, name):
+        if name in FeatureBlock.__slots__:
+            return getattr(self.block, name)
+        if name in Features.__slots__ and name != 'block':
+            return getattr(self, name)
+        raise KeyError(name)
+
+    def items(self):
+        return [(name, self[name]) for name in self.NAMES]
+
+    def to_dict(self):
+        return dict(self.items())
+
+class PlayerGame:
+    """
+    A player in one game, shared by the player's prediction inputs and predictions for every stat type
+    """
+    __slots__ = ('player_id', 'player_name', 'team', 'opponent', 'is_home', 'game_id', 'game_date', 'sport')
+
+    def __init__(self, player_id, player_name, team, opponent, is_home, game_id, game_date, sport):
+        self.player_id = player_id
+        self.player_name = player_name
+        self.team = _intern(team)
+        self.opponent = _intern(opponent)
+        self.is_home = is_home
+        self.game_id = _intern(game_id)
+        self.game_date = _intern(game_date)
+        self.sport = _intern(sport)
+
+class PredictionInput:
+    """
+    Input of the prediction model for one player, game and stat type
+    """
+    __slots__ = ('player', 'stat_type', 'prizepicks_line', 'features')
+
+    def __init__(self, player, stat_type, prizepicks_line, features):
+        """
+        Initialize the input
+
+        Args:
+            player (PlayerGame): Player and game
+            stat_type (str): Stat type
+            prizepicks_line (float): PrizePicks line
+            features (Features): Features of the player and stat type
+        """
+        self.player = player
+        self.stat_type = _intern(stat_type)
+        self.prizepicks_line = prizepicks_line
+        self.features = features
+
+    def to_dict(self):
+        """
+        Get the input as a dict, in the format prediction inputs used to have
+
+        Returns:
+            dict: Input data
+        """
+        player = self.player
+        return {
+            'player_id': player.player_id,
+            'player_name': player.player_name,
+            'team': player.team,
+            'opponent': player.opponent,
+            'is_home': player.is_home,
+            'game_id': player.game_id,
+            'game_date': player.game_date,
+            'sport': player.sport,
+            'stat_type': self.stat_type,
+            'prizepicks_line': self.prizepicks_line,
+            'features': self.features.to_dict()
+        }
+
+def top_factors(features, is_home):
+    """
+    Generate the top factors behind a prediction
+
+    Args:
+        features (Features): Features of the prediction's input
+        is_home (bool): Whether the player's team is at home
+
+    Returns:
+        list: Up to three human readable factors
+    """
+    factors = []
+
+    if features['last_5_avg'] > features['season_avg']:
+        factors.append(f"Trending up: {features['last_5_avg']} over last 5 vs {features['season_avg']} season average")
+    else:
+        factors.append(f"Trending down: {features['last_5_avg']} over last 5 vs {features['season_avg']} season average")
+
+    defense_rank = features['opponent_defense_rank']
+    if defense_rank >= 20:
+        factors.append(f"Favorable matchup against #{defense_rank} ranked defense")
+    elif defense_rank <= 10:
+        factors.append(f"Tough matchup against #{defense_rank} ranked defense")
+
+    if features['days_rest'] >= 3:
+        factors.append(f"Well rested ({features['days_rest']} days)")
+
+    factors.append('Home game' if is_home else 'Road game')
+
+    return factors[:3]
+
+class PredictionRecord:
+    """
+    Prediction for one player, game and stat type
+
+    The player and game fields live on the shared PlayerGame. Top factors are derived
+    from the input's features when needed rather than stored, except for predictions
+    read back from the database.
+    """
+    __slots__ = ('player', 'stat_type', 'line', 'predicted_value', 'over_probability', 'confidence',
+                 'features', '_top_factors')
+
+    def __init__(self, player, stat_type, line, predicted_value, over_probability, confidence,
+                 features=None, top_factors=None):
+        """
+        Initialize the prediction
+
+        Args:
+            player (PlayerGame): Player and game
+            stat_type (str): Stat type
+            line (float): PrizePicks line
+            predicted_value (float): Predicted stat value
+            over_probability (float): Probability of going over the line
+            confidence (str): 'High', 'Medium' or 'Low'
+            features (Features): Features the prediction was made from
+            top_factors (list): Stored top factors, for predictions without features
+        """
+        self.player = player
+        self.stat_type = _intern(stat_type)
+        self.line = line
+        self.predicted_value = predicted_value
+        self.over_probability = over_probability
+        self.confidence = _intern(confidence)
+        self.features = features
+        self._top_factors = top_factors
+
+    @classmethod
+    def from_input(cls, input_data, predicted_value, over_probability, confidence):
+        """
+        Build the prediction for a scored input
+
+        Args:
+            input_data (PredictionInput): The input
+            predicted_value (float): Predicted stat value
+            over_probability (float): Probability of going over the line
+            confidence (str): Confidence level
+
+        Returns:
+            PredictionRecord: The prediction, with values rounded for display
+        """
+        return cls(
+            input_data.player,
+            input_data.stat_type,
+            input_data.prizepicks_line,
+            round(predicted_value, 1),
+            round(over_probability, 2),
+            confidence,
+            features=input_data.features
+        )
+
+    @classmethod
+    def from_row(cls, row):
+        """
+        Build a prediction from a stored prediction row
+
+        Args:
+            row (sequence): player_name, player_id, team, opponent, game_date, game_id, sport,
+                stat_type, predicted_value, over_probability, line, confidence, top_factors
+
+        Returns:
+            PredictionRecord: The prediction
+        """
+        player = PlayerGame(row[1], row[0], row[2], row[3], None, row[5], str(row[4]), row[6])
+        return cls(player, row[7], row[10], row[8], row[9], row[11],
+                   top_factors=json.loads(row[12]) if row[12] else [])
+
+    @property
+    def sport(self):
+        return self.player.sport
+
+    @property
+    def top_factors(self):
+        if self._top_factors is not None:
+            return self._top_factors
+        return top_factors(self.features, self.player.is_home)
+
+    def to_dict(self):
+        """
+        Get the prediction in the JSON format read by the import command
+
+        Returns:
+            dict: Prediction
+        """
+        player = self.player
+        return {
+            'player': player.player_name,
+            'player_id': player.player_id,
+            'team': player.team,
+            'opponent': player.opponent,
+            'date': player.game_date,
+            'game_id': player.game_id,
+            'sport': player.sport,
+            'stat': self.stat_type,
+            'predicted_value': self.predicted_value,
+            'over_probability': self.over_probability,
+            'line': self.line,
+            'confidence': self.confidence,
+            'top_factors': self.top_factors
+        }
+
+    def to_row(self, now):
+        """
+        Get the prediction as a row of the prediction table
+
+        Args:
+            now (datetime): Timestamp for created_at and updated_at
+
+        Returns:
+            dict: Column values
+        """
+        player = self.player
+        return {
+            'player_name': player.player_name,
+            'player_id': player.player_id,
+            'team': player.team,
+            'opponent': player.opponent,
+            'game_date': date.fromisoformat(player.game_date),
+            'game_id': player.game_id,
+            'sport': player.sport,
+            'stat_type': self.stat_type,
+            'predicted_value': self.predicted_value,
+            'over_probability': self.over_probability,
+            'line': self.line,
+            'confidence': self.confidence,
+            'top_factors': json.dumps(self.top_factors),
+            'created_at': now,
+            'updated_at': now
+        }
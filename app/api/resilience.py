@@ -0,0 +1,249 @@
+import os
+import time
+import random
+import logging
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger('resilience')
+
+# Status codes worth retrying: throttling and server-side failures
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+def retry_after_seconds(value):
+    """
+    Parse a Retry-After header
+
+    Args:
+        value (str): Header value, either delay seconds or an HTTP date
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter between attempts of one request
+    """
+
+    def __init__(self, max_retries=None, base_delay=None, max_delay=None):
+        """
+        Initialize the retry policy
+
+        Args:
+            max_retries (int): Retries after the first attempt. Defaults to SPORTRADAR_MAX_RETRIES or 3.
+            base_delay (float): Backoff before the first retry in seconds. Defaults to SPORTRADAR_BACKOFF_BASE or 0.5.
+            max_delay (float): Longest wait between attempts in seconds. Defaults to SPORTRADAR_BACKOFF_MAX or 30.
+        """
+        self.max_retries = int(max_retries if max_retries is not None else os.environ.get('SPORTRADAR_MAX_RETRIES', 3))
+        self.base_delay = float(base_delay or os.environ.get('SPORTRADAR_BACKOFF_BASE', 0.5))
+        self.max_delay = float(max_delay or os.environ.get('SPORTRADAR_BACKOFF_MAX', 30))
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Get how long to wait before the next attempt
+
+        Args:
+            attempt (int): Number of the attempt that just failed, starting at 0
+            retry_after (float): Delay requested by the server, if any
+
+        Returns:
+            float: Seconds to wait, or None if the server asked for longer than max_delay
+        """
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_delay else None
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+class CircuitBreaker:
+    """
+    Stops calls to a failing endpoint family for a while.
+
+    After `failure_threshold` consecutive failed requests the circuit opens and calls
+    are refused until `reset_timeout` has passed. Then a single probe is let through:
+    success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, name, failure_threshold=None, reset_timeout=None):
+        """
+        Initialize the circuit breaker
+
+        Args:
+            name (str): Endpoint family the breaker guards, used in log messages
+            failure_threshold (int): Consecutive failures that open the circuit.
+                Defaults to SPORTRADAR_BREAKER_THRESHOLD or 5.
+            reset_timeout (float): Seconds the circuit stays open before a probe.
+                Defaults to SPORTRADAR_BREAKER_RESET or 60.
+        """
+        self.name = name
+        self.failure_threshold = int(failure_threshold or os.environ.get('SPORTRADAR_BREAKER_THRESHOLD', 5))
+        self.reset_timeout = float(reset_timeout or os.environ.get('SPORTRADAR_BREAKER_RESET', 60))
+        self.failures = 0
+        self.open_until = 0.0
+        self._probing = False
+        self._probe_owner = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        """Whether calls are currently refused"""
+        return time.time() < self.open_until
+
+    def allow(self):
+        """
+        Check whether a call may go through
+
+        Returns:
+            bool: True if the circuit is closed, or if this caller is the half-open probe
+        """
+        with self._lock:
+            if self.failures < self.failure_threshold and not self.is_open:
+                return True
+            if self.is_open or self._probing:
+                return False
+            self._probing = True
+            self._probe_owner = threading.get_ident()
+            return True
+
+    def release_probe(self):
+        """
+        End the calling thread's half-open probe if it recorded neither success nor failure
+
+        Call this once the guarded call is over, whatever its outcome, so a probe
+        that returned early or raised an unrelated error does not keep the circuit
+        refusing calls forever.
+        """
+        with self._lock:
+            if self._probing and self._probe_owner == threading.get_ident():
+                self._probing = False
+                self._probe_owner = None
+
+    def record_success(self):
+        """Close the circuit after a successful call"""
+        with self._lock:
+            if self.failures >= self.failure_threshold:
+                logger.info(f"Circuit for {self.name} closed")
+            self.failures = 0
+            self.open_until = 0.0
+            self._probing = False
+            self._probe_owner = None
+
+    def record_failure(self, open_for=None):
+        """
+        Count a failed call, opening the circuit once the threshold is reached
+
+        Args:
+            open_for (float): Open the circuit for at least this many seconds regardless
+                of the failure count, e.g. when the server asked for a long Retry-After
+        """
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            self._probe_owner = None
+            if open_for is not None:
+                self.failures = max(self.failures, self.failure_threshold)
+            if self.failures >= self.failure_threshold:
+                self.open_until = time.time() + max(self.reset_timeout, open_for or 0)
+                logger.warning(
+                    f"Circuit for {self.name} opened for {self.open_until - time.time():.0f}s "
+                    f"after {self.failures} failures"
+                )
+
+class CircuitBreakers:
+    """
+    Circuit breakers created on demand, one per endpoint family
+    """
+
+    def __init__(self, failure_threshold=None, reset_timeout=None):
+        """
+        Initialize the registry
+
+        Args:
+            failure_threshold (int): Failure threshold for every breaker
+            reset_timeout (float): Reset timeout for every breaker
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, family):
+        """
+        Get the breaker for an endpoint family
+
+        Args:
+            family (str): Endpoint family, e.g. 'nba:players'
+
+        Returns:
+            CircuitBreaker: The family's breaker
+        """
+        with self._lock:
+            breaker = self._breakers.get(family)
+            if breaker is None:
+                breaker = CircuitBreaker(family, self.failure_threshold, self.reset_timeout)
+                self._breakers[family] = breaker
+            return breaker
+
+    def open_families(self):
+        """Get the endpoint families whose circuit is currently open"""
+        with self._lock:
+            return sorted(name for name, breaker in self._breakers.items() if breaker.is_open)
+
+class LatencyTracker:
+    """
+    Recent request latencies per endpoint family, used to decide when to hedge
+    """
+
+    def __init__(self, window=200, min_samples=20):
+        """
+        Initialize the tracker
+
+        Args:
+            window (int): Latest samples kept per endpoint family
+            min_samples (int): Samples needed before a percentile is reported
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, family, seconds):
+        """
+        Record the latency of a completed request
+
+        Args:
+            family (str): Endpoint family
+            seconds (float): Time the request took
+        """
+        with self._lock:
+            samples = self._samples.get(family)
+            if samples is None:
+                samples = self._samples[family] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, family, q=0.95):
+        """
+        Get a latency percentile for an endpoint family
+
+        Args:
+            family (str): Endpoint family
+            q (float): Percentile as a fraction, e.g. 0.95
+
+        Returns:
+            float: Latency in seconds, or None while there are too few samples
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(family, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
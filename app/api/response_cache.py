@@ -0,0 +1,535 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger('response_cache')
+
+def _copy_json(value):
+    """Copy the dicts and lists of a decoded JSON value; scalars are immutable and shared"""
+    if isinstance(value, dict):
+        return {k: _copy_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(v) for v in value]
+    return value
+
+class MemoryCache:
+    """
+    In-process LRU cache bounded by entry count and approximate payload size
+
+    Entries are copied on the way in and out, so callers that modify a payload
+    they were given do not change what later lookups return.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None):
+        """
+        Initialize the memory tier
+
+        Args:
+            max_entries (int): Maximum number of entries. Defaults to SPORTRADAR_MEMORY_CACHE_ENTRIES or 2000.
+            max_bytes (int): Maximum total payload size. Defaults to SPORTRADAR_MEMORY_CACHE_MB (64) megabytes.
+        """
+        self.max_entries = max_entries or int(os.environ.get('SPORTRADAR_MEMORY_CACHE_ENTRIES', 2000))
+        self.max_bytes = max_bytes or int(os.environ.get('SPORTRADAR_MEMORY_CACHE_MB', 64)) * 1024 * 1024
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Get a copy of an entry and mark it most recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+        return _copy_json(entry)
+
+    def set(self, key, entry):
+        """Store an entry, evicting least recently used entries if over budget"""
+        size = entry.get('size', 0)
+        if size > self.max_bytes:
+            return
+
+        entry = _copy_json(entry)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.get('size', 0)
+
+            self._entries[key] = entry
+            self._bytes += size
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.get('size', 0)
+
+    def delete(self, key):
+        """Remove an entry"""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.get('size', 0)
+
+class FileCacheBackend:
+    """
+    Persistent cache tier storing one JSON file per key
+    """
+
+    def __init__(self, cache_dir):
+        """
+        Initialize the file backend
+
+        Args:
+            cache_dir (str): Directory holding the cache files
+        """
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """
+        Load an entry
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            dict: Entry with 'data' and 'stored_at', or None if missing or unreadable
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                payload = f.read()
+                stored_at = os.fstat(f.fileno()).st_mtime
+            stored = json.loads(payload)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error reading cache file {path}: {e}")
+            return None
+
+        if isinstance(stored, dict) and stored.get('_entry') == 1:
+            entry = stored
+        else:
+            # Files written before entries were wrapped hold the bare payload
+            entry = {'data': stored}
+
+        # The file's mtime is the entry's store time, so touch() never rewrites the body
+        entry['stored_at'] = stored_at
+        entry['size'] = len(payload)
+        return entry
+
+    def set(self, key, entry):
+        """
+        Store an entry
+
+        Args:
+            key (str): Cache key
+            entry (dict): Entry to store
+
+        Returns:
+            int: Size of the stored payload in bytes
+        """
+        stored = {k: v for k, v in entry.items() if k not in ('size', 'stored_at')}
+        stored['_entry'] = 1
+        payload = json.dumps(stored)
+
+        # Write to a temporary file and rename so readers never see a partial entry
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        os.utime(path, (entry['stored_at'], entry['stored_at']))
+
+        return len(payload)
+
+    def touch(self, key, stored_at):
+        """
+        Reset an entry's store time without rewriting it
+
+        Args:
+            key (str): Cache key
+            stored_at (float): New store time
+        """
+        try:
+            os.utime(self._path(key), (stored_at, stored_at))
+        except FileNotFoundError:
+            pass
+
+    def delete(self, key):
+        """Remove an entry"""
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+class SQLiteCacheBackend:
+    """
+    Persistent cache tier storing every entry as a compressed blob in one SQLite file
+
+    Writes are single atomic statements, the file is kept under a size budget by
+    evicting the least recently accessed entries, and many keys can be loaded in
+    one query with get_many().
+    """
+
+    def __init__(self, db_path, max_bytes=None):
+        """
+        Initialize the SQLite backend
+
+        Args:
+            db_path (str): Path of the SQLite cache file
+            max_bytes (int): Size budget for stored payloads. Defaults to SPORTRADAR_CACHE_MAX_MB (512) megabytes.
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes or int(os.environ.get('SPORTRADAR_CACHE_MAX_MB', 512)) * 1024 * 1024
+        self.codec = 'zstd' if zstandard is not None else 'zlib'
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entry ("
+            "key TEXT PRIMARY KEY, payload BLOB NOT NULL, codec TEXT NOT NULL, "
+            "size INTEGER NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entry_accessed_at ON cache_entry (accessed_at)")
+
+    def _connection(self):
+        """SQLite connection for the current thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _compress(self, payload):
+        if self.codec == 'zstd':
+            return zstandard.ZstdCompressor(level=3).compress(payload)
+        return zlib.compress(payload, 6)
+
+    @staticmethod
+    def _decompress(blob, codec):
+        if codec == 'zstd':
+            if zstandard is None:
+                raise ValueError('zstandard is not installed')
+            return zstandard.ZstdDecompressor().decompress(blob)
+        return zlib.decompress(blob)
+
+    def _entry_from_row(self, key, row):
+        payload, codec, size, stored_at = row
+        try:
+            entry = json.loads(self._decompress(payload, codec))
+        except Exception as e:
+            logger.error(f"Error decoding cache entry {key}: {e}")
+            return None
+        entry['stored_at'] = stored_at
+        entry['size'] = size
+        return entry
+
+    def get(self, key):
+        """
+        Load an entry
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            dict: Entry with 'data' and 'stored_at', or None if missing or unreadable
+        """
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        """
+        Load several entries in as few queries as possible
+
+        Args:
+            keys (iterable): Cache keys
+
+        Returns:
+            dict: Entries by key; missing keys are left out
+        """
+        keys = list(dict.fromkeys(keys))
+        entries = {}
+        conn = self._connection()
+
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f"SELECT key, payload, codec, size, stored_at FROM cache_entry WHERE key IN ({placeholders})",
+                chunk
+            ).fetchall()
+            for row in rows:
+                entry = self._entry_from_row(row[0], row[1:])
+                if entry is not None:
+                    entries[row[0]] = entry
+
+        if entries:
+            try:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE cache_entry SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key in entries]
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Could not update cache access times: {e}")
+
+        return entries
+
+    def set(self, key, entry):
+        """
+        Store an entry
+
+        Args:
+            key (str): Cache key
+            entry (dict): Entry to store
+
+        Returns:
+            int: Size of the uncompressed payload in bytes, as held by the memory tier
+        """
+        stored = {k: v for k, v in entry.items() if k not in ('size', 'stored_at')}
+        payload = json.dumps(stored)
+        blob = self._compress(payload.encode('utf-8'))
+
+        self._connection().execute(
+            "INSERT OR REPLACE INTO cache_entry (key, payload, codec, size, stored_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, blob, self.codec, len(payload), entry['stored_at'], entry['stored_at'])
+        )
+
+        with self._writes_lock:
+            self._writes += 1
+            check_budget = self._writes % 100 == 1
+        if check_budget:
+            self.evict()
+
+        return len(payload)
+
+    def touch(self, key, stored_at):
+        """
+        Reset an entry's store time without rewriting it
+
+        Args:
+            key (str): Cache key
+            stored_at (float): New store time
+        """
+        self._connection().execute(
+            "UPDATE cache_entry SET stored_at = ?, accessed_at = ? WHERE key = ?",
+            (stored_at, stored_at, key)
+        )
+
+    def delete(self, key):
+        """Remove an entry"""
+        self._connection().execute("DELETE FROM cache_entry WHERE key = ?", (key,))
+
+    def evict(self):
+        """
+        Drop least recently accessed entries until the cache is within its size budget
+
+        The budget applies to the compressed blobs on disk, not to the uncompressed
+        size column.
+
+        Returns:
+            int: Number of entries removed
+        """
+        conn = self._connection()
+        total = conn.execute("SELECT COALESCE(SUM(length(payload)), 0) FROM cache_entry").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        # Keep the most recently used entries that fit in 90% of the budget
+        cursor = conn.execute(
+            "DELETE FROM cache_entry WHERE key IN ("
+            "SELECT key FROM (SELECT key, SUM(length(payload)) OVER (ORDER BY accessed_at DESC, key) AS running "
+            "FROM cache_entry) WHERE running > ?)",
+            (int(self.max_bytes * 0.9),)
+        )
+        logger.info(f"Evicted {cursor.rowcount} cache entries ({total} bytes over a {self.max_bytes} byte budget)")
+        return cursor.rowcount
+
+    def import_file_cache(self, cache_dir, remove=False):
+        """
+        Copy entries written by FileCacheBackend into this store
+
+        Args:
+            cache_dir (str): Directory holding the JSON cache files
+            remove (bool): Delete each file once it has been imported
+
+        Returns:
+            int: Number of entries imported
+        """
+        files = FileCacheBackend(cache_dir)
+        imported = 0
+
+        for filename in os.listdir(cache_dir):
+            if not filename.endswith('.json'):
+                continue
+            key = filename[:-len('.json')]
+            entry = files.get(key)
+            if entry is None:
+                continue
+            self.set(key, entry)
+            imported += 1
+            if remove:
+                files.delete(key)
+
+        return imported
+
+def create_cache_backend(cache_dir, backend=None):
+    """
+    Create the persistent cache tier
+
+    Args:
+        cache_dir (str): Cache directory
+        backend (str): 'sqlite' or 'file'. Defaults to SPORTRADAR_CACHE_BACKEND or 'sqlite'.
+
+    Returns:
+        Persistent cache backend
+    """
+    backend = backend or os.environ.get('SPORTRADAR_CACHE_BACKEND', 'sqlite')
+
+    if backend == 'file':
+        return FileCacheBackend(cache_dir)
+    if backend == 'sqlite':
+        return SQLiteCacheBackend(os.path.join(cache_dir, 'responses.db'))
+
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+class ResponseCache:
+    """
+    Two-tier response cache: an in-process LRU in front of a persistent backend
+    """
+
+    def __init__(self, backend, memory=None):
+        """
+        Initialize the cache
+
+        Args:
+            backend: Persistent tier (SQLiteCacheBackend or FileCacheBackend)
+            memory (MemoryCache): In-process tier. A default-sized one is created if None
+        """
+        self.backend = backend
+        self.memory = memory or MemoryCache()
+
+    def get(self, key):
+        """
+        Get an entry from the memory tier, falling back to the persistent tier
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            dict: Entry with 'data' and 'stored_at', or None on a miss or an unreadable backend
+        """
+        entry = self.memory.get(key)
+        if entry is not None:
+            return entry
+
+        try:
+            entry = self.backend.get(key)
+        except Exception as e:
+            logger.error(f"Error reading cache entry {key}: {e}")
+            return None
+        if entry is not None:
+            self.memory.set(key, entry)
+        return entry
+
+    def get_many(self, keys):
+        """
+        Get several entries, loading memory-tier misses from the backend in bulk
+
+        Args:
+            keys (iterable): Cache keys
+
+        Returns:
+            dict: Entries by key; missing keys are left out
+        """
+        entries = {}
+        misses = []
+        for key in keys:
+            entry = self.memory.get(key)
+            if entry is not None:
+                entries[key] = entry
+            else:
+                misses.append(key)
+
+        if misses:
+            try:
+                if hasattr(self.backend, 'get_many'):
+                    loaded = self.backend.get_many(misses)
+                else:
+                    loaded = {key: entry for key, entry in ((key, self.backend.get(key)) for key in misses) if entry}
+            except Exception as e:
+                logger.error(f"Error reading {len(misses)} cache entries: {e}")
+                loaded = {}
+            for key, entry in loaded.items():
+                self.memory.set(key, entry)
+            entries.update(loaded)
+
+        return entries
+
+    def set(self, key, data, **metadata):
+        """
+        Store a payload in both tiers
+
+        Args:
+            key (str): Cache key
+            data: JSON-serializable payload
+            **metadata: Extra fields stored with the entry
+
+        Returns:
+            dict: The stored entry
+        """
+        entry = dict(metadata, data=data, stored_at=time.time())
+        try:
+            entry['size'] = self.backend.set(key, entry)
+        except Exception as e:
+            logger.error(f"Error writing cache entry {key}: {e}")
+            entry['size'] = 0
+        self.memory.set(key, entry)
+        return entry
+
+    def touch(self, key, entry):
+        """
+        Mark an entry as freshly stored, e.g. after the server confirmed it is unchanged
+
+        Args:
+            key (str): Cache key
+            entry (dict): Entry to refresh
+
+        Returns:
+            dict: The refreshed entry
+        """
+        entry = dict(entry, stored_at=time.time())
+        try:
+            self.backend.touch(key, entry['stored_at'])
+        except Exception as e:
+            logger.error(f"Error refreshing cache entry {key}: {e}")
+        self.memory.set(key, entry)
+        return entry
+
+    def delete(self, key):
+        """Remove an entry from both tiers"""
+        self.memory.delete(key)
+        self.backend.delete(key)
+
+    @staticmethod
+    def age(entry):
+        """Seconds since the entry was stored"""
+        return time.time() - entry['stored_at']
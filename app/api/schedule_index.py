@@ -0,0 +1,221 @@
+import os
+import json
+import sqlite3
+import logging
+import threading
+from datetime import datetime, date, timezone
+
+try:
+    from zoneinfo import ZoneInfo
+    SCHEDULE_TZ = ZoneInfo('America/New_York')
+except Exception:
+    SCHEDULE_TZ = timezone.utc
+
+logger = logging.getLogger('schedule_index')
+
+def game_date_for(scheduled):
+    """
+    Get the schedule date of a game, i.e. its start date in US Eastern time
+
+    Args:
+        scheduled (str): ISO 8601 start time from the API, e.g. '2024-01-15T00:30:00+00:00'
+
+    Returns:
+        str: Date as YYYY-MM-DD, or None if the time cannot be parsed
+    """
+    try:
+        start = datetime.fromisoformat(scheduled.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    return start.astimezone(SCHEDULE_TZ).strftime('%Y-%m-%d')
+
+def iter_schedule_games(schedule):
+    """
+    Iterate over the games in a season schedule payload
+
+    Basketball, baseball and hockey schedules list games at the top level; football
+    schedules group them into weeks.
+
+    Args:
+        schedule (dict): Season schedule payload
+
+    Yields:
+        dict: Game data
+    """
+    if not schedule:
+        return
+    for game in schedule.get('games', []):
+        yield game
+    for week in schedule.get('weeks', []):
+        for game in week.get('games', []):
+            yield game
+
+class ScheduleIndex:
+    """
+    Locally persisted index of season schedules, queried by sport and date range
+    """
+
+    def __init__(self, db_path):
+        """
+        Initialize the schedule index
+
+        Args:
+            db_path (str): Path of the SQLite file holding the index
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS schedule_game ("
+            "sport TEXT NOT NULL, game_id TEXT NOT NULL, season TEXT NOT NULL, "
+            "season_type TEXT NOT NULL, game_date TEXT NOT NULL, scheduled TEXT NOT NULL, "
+            "payload TEXT NOT NULL, PRIMARY KEY (sport, game_id))"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_schedule_game_sport_date "
+            "ON schedule_game (sport, game_date, scheduled)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS schedule_load ("
+            "sport TEXT NOT NULL, season TEXT NOT NULL, season_type TEXT NOT NULL, "
+            "loaded_on TEXT NOT NULL, PRIMARY KEY (sport, season, season_type))"
+        )
+
+    def _connection(self):
+        """SQLite connection for the current thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def loaded_on(self, sport, season, season_type):
+        """
+        Get the day a season schedule was last checked
+
+        Args:
+            sport (str): Sport code
+            season (str): Season year
+            season_type (str): Season type (PRE, REG, PST)
+
+        Returns:
+            str: Date as YYYY-MM-DD, or None if it was never checked
+        """
+        row = self._connection().execute(
+            "SELECT loaded_on FROM schedule_load WHERE sport = ? AND season = ? AND season_type = ?",
+            (sport, str(season), season_type)
+        ).fetchone()
+        return row[0] if row else None
+
+    def mark_checked(self, sport, season, season_type):
+        """
+        Record that a season schedule was checked today without changing its games
+
+        Used when the schedule could not be fetched, so it is not retried on every lookup.
+
+        Args:
+            sport (str): Sport code
+            season (str): Season year
+            season_type (str): Season type (PRE, REG, PST)
+        """
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO schedule_load (sport, season, season_type, loaded_on) VALUES (?, ?, ?, ?)",
+                (sport, str(season), season_type, date.today().strftime('%Y-%m-%d'))
+            )
+
+    def covers(self, sport, seasons, start_date, end_date):
+        """
+        Check whether the index can answer a date range from the given seasons
+
+        Every season must have indexed games, and together they must be scheduled
+        on both sides of (or within) the range.
+
+        Args:
+            sport (str): Sport code
+            seasons (list): Season years the range falls in
+            start_date (date): First day of the range
+            end_date (date): Last day of the range (inclusive)
+
+        Returns:
+            bool: Whether games_between() covers the range
+        """
+        first = last = None
+        conn = self._connection()
+        for season in seasons:
+            season_first, season_last = conn.execute(
+                "SELECT MIN(game_date), MAX(game_date) FROM schedule_game WHERE sport = ? AND season = ?",
+                (sport, str(season))
+            ).fetchone()
+            if season_first is None:
+                return False
+            first = min(first or season_first, season_first)
+            last = max(last or season_last, season_last)
+        return first <= end_date.strftime('%Y-%m-%d') and last >= start_date.strftime('%Y-%m-%d')
+
+    def load(self, sport, season, season_type, schedule, mark_loaded=True):
+        """
+        Replace the indexed games of a season with those in a schedule payload
+
+        Args:
+            sport (str): Sport code
+            season (str): Season year
+            season_type (str): Season type (PRE, REG, PST)
+            schedule (dict): Season schedule payload
+            mark_loaded (bool): Record the season as loaded today. Off for stale payloads,
+                so the season is loaded again once a fresh copy is available.
+
+        Returns:
+            int: Number of games indexed
+        """
+        rows = []
+        for game in iter_schedule_games(schedule):
+            game_date = game_date_for(game.get('scheduled'))
+            if not game.get('id') or game_date is None:
+                continue
+            rows.append((sport, game['id'], str(season), season_type, game_date, game['scheduled'], json.dumps(game)))
+
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "DELETE FROM schedule_game WHERE sport = ? AND season = ? AND season_type = ?",
+                (sport, str(season), season_type)
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO schedule_game "
+                "(sport, game_id, season, season_type, game_date, scheduled, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            if mark_loaded:
+                conn.execute(
+                    "INSERT OR REPLACE INTO schedule_load (sport, season, season_type, loaded_on) VALUES (?, ?, ?, ?)",
+                    (sport, str(season), season_type, date.today().strftime('%Y-%m-%d'))
+                )
+
+        logger.info(f"Indexed {len(rows)} {sport} {season} {season_type} games")
+        return len(rows)
+
+    def games_between(self, sport, start_date, end_date):
+        """
+        Get the indexed games of a sport scheduled within a date range
+
+        Args:
+            sport (str): Sport code
+            start_date (date): First day of the range
+            end_date (date): Last day of the range (inclusive)
+
+        Returns:
+            list: Game data ordered by start time
+        """
+        rows = self._connection().execute(
+            "SELECT payload FROM schedule_game WHERE sport = ? AND game_date BETWEEN ? AND ? "
+            "ORDER BY game_date, scheduled",
+            (sport, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
@@ -0,0 +1,172 @@
+import os
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger('single_flight')
+
+class _Call:
+    """An in-flight call that other threads can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one execution.
+
+    Within a process, callers that arrive while a call for their key is running
+    wait for it and share its result. Across processes on the same machine, the
+    caller running the call holds a lease row in a shared SQLite file; callers in
+    other processes poll for the leader's result (e.g. in a shared cache) until the
+    lease is released, and only run the call themselves if no result appeared.
+    """
+
+    def __init__(self, db_path, lease_ttl=None, wait_timeout=None, poll_interval=0.1):
+        """
+        Initialize single-flight coordination
+
+        Args:
+            db_path (str): Path of the SQLite file holding lease rows
+            lease_ttl (float): Seconds before an abandoned lease expires. Defaults to SPORTRADAR_LEASE_TTL or 60.
+            wait_timeout (float): Longest a caller waits on another process before running the call itself.
+                Defaults to the lease TTL.
+            poll_interval (float): Seconds between checks while waiting on another process
+        """
+        self.db_path = db_path
+        self.lease_ttl = float(lease_ttl or os.environ.get('SPORTRADAR_LEASE_TTL', 60))
+        self.wait_timeout = float(wait_timeout or self.lease_ttl)
+        self.poll_interval = poll_interval
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS lease ("
+            "key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _connection(self):
+        """SQLite connection for the current thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def do(self, key, func, load_result=None, timeout=None):
+        """
+        Run func() once for all concurrent callers with the same key
+
+        Args:
+            key (str): Coalescing key
+            func (callable): Call to run
+            load_result (callable): Polled while another process holds the lease. Returns the
+                leader's result, or None if it is not available yet.
+            timeout (float): Longest to wait on a call made by another caller, e.g. the time
+                left before a request deadline. Unlimited (up to wait_timeout across
+                processes) if None.
+
+        Returns:
+            The result of func(), possibly computed by another caller
+
+        Raises:
+            TimeoutError: If the other caller's result did not arrive within timeout
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"Timed out waiting on the in-flight call for {key}")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run_with_lease(key, func, load_result, timeout)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _run_with_lease(self, key, func, load_result, timeout=None):
+        """
+        Run func() while holding the cross-process lease for key, or wait on the process that holds it
+
+        Waiting gives up after timeout with a TimeoutError, or after wait_timeout by
+        running func() anyway.
+        """
+        owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+        started = time.time()
+
+        while True:
+            try:
+                acquired = self._acquire_lease(key, owner)
+            except sqlite3.Error as e:
+                logger.error(f"Lease store unavailable, fetching {key} without coordination: {e}")
+                return func()
+
+            if acquired:
+                try:
+                    # Another process may have finished between our miss and taking the lease
+                    result = load_result() if load_result is not None else None
+                    return result if result is not None else func()
+                finally:
+                    self._release_lease(key, owner)
+
+            if load_result is not None:
+                result = load_result()
+                if result is not None:
+                    logger.info(f"Reused result for {key} fetched by another process")
+                    return result
+
+            if timeout is not None and time.time() - started > timeout:
+                raise TimeoutError(f"Timed out waiting on another process for {key}")
+
+            if time.time() - started > self.wait_timeout:
+                logger.warning(f"Timed out waiting on another process for {key}")
+                return func()
+
+            time.sleep(self.poll_interval)
+
+    def _acquire_lease(self, key, owner):
+        """Take the lease for key if nobody holds an unexpired one"""
+        conn = self._connection()
+        now = time.time()
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute("SELECT expires_at FROM lease WHERE key = ?", (key,)).fetchone()
+            acquired = row is None or row[0] < now
+            if acquired:
+                conn.execute(
+                    "INSERT OR REPLACE INTO lease (key, owner, expires_at) VALUES (?, ?, ?)",
+                    (key, owner, now + self.lease_ttl)
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        return acquired
+
+    def _release_lease(self, key, owner):
+        """Release the lease for key if this caller still owns it"""
+        try:
+            self._connection().execute("DELETE FROM lease WHERE key = ? AND owner = ?", (key, owner))
+        except sqlite3.Error as e:
+            logger.error(f"Could not release lease for {key}: {e}")
@@ -4,6 +4,16 @@ import json
 import logging
 from datetime import datetime, timedelta
 import time
+import hashlib
+import sqlite3
+import threading
+from app.api.fixtures import transport_from_env
+from app.api.response_cache import ResponseCache, create_cache_backend
+from app.api.rate_limiter import TokenBucketRateLimiter
+from app.api.single_flight import SingleFlight
+from app.api.schedule_index import ScheduleIndex
+from app.api.resilience import RetryPolicy, CircuitBreakers, LatencyTracker, RETRYABLE_STATUS, retry_after_seconds
+from app.api.deadline import current_deadline
 
 # Configure logging
 logging.basicConfig(
@@ -21,33 +31,78 @@ class SportradarAPI:
     Client for interacting with the Sportradar API to fetch live sports data
     """
     
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, transport=None):
         """
         Initialize the Sportradar API client
         
         Args:
             api_key (str): Sportradar API key. If None, will look for SPORTRADAR_API_KEY env variable
+            transport (HttpTransport): Pooled transport to send requests through. If None, one is created
+                according to SPORTRADAR_TRANSPORT (live, record:<archive>, replay:<archive> or synthetic)
         """
         self.api_key = api_key or os.environ.get('SPORTRADAR_API_KEY')
         if not self.api_key:
             logger.warning("No API key provided. Set SPORTRADAR_API_KEY environment variable or pass api_key parameter")
         
+        # SPORTRADAR_API_HOST can point the client at a local stand-in server (see app/api/fixtures.py)
+        api_host = os.environ.get('SPORTRADAR_API_HOST', 'https://api.sportradar.us').rstrip('/')
         self.base_urls = {
-            'nba': 'https://api.sportradar.us/nba/trial/v8/en',
-            'nfl': 'https://api.sportradar.us/nfl/official/trial/v7/en',
-            'mlb': 'https://api.sportradar.us/mlb/trial/v7/en',
-            'nhl': 'https://api.sportradar.us/nhl/trial/v7/en',
-            'ncaafb': 'https://api.sportradar.us/ncaafb/trial/v7/en',
-            'ncaamb': 'https://api.sportradar.us/ncaamb/trial/v8/en'
+            'nba': f'{api_host}/nba/trial/v8/en',
+            'nfl': f'{api_host}/nfl/official/trial/v7/en',
+            'mlb': f'{api_host}/mlb/trial/v7/en',
+            'nhl': f'{api_host}/nhl/trial/v7/en',
+            'ncaafb': f'{api_host}/ncaafb/trial/v7/en',
+            'ncaamb': f'{api_host}/ncaamb/trial/v8/en'
         }
         
-        self.cache_dir = '/home/ubuntu/sports_predictor_web/cache'
+        self.cache_dir = os.environ.get(
+            'SPORTRADAR_CACHE_DIR',
+            os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'cache')
+        )
         os.makedirs(self.cache_dir, exist_ok=True)
         
+        # In-process LRU in front of the persistent cache store
+        self.cache = ResponseCache(create_cache_backend(self.cache_dir))
+        
+        # How long past its TTL an entry may still be served while it is refreshed
+        self.max_stale = int(os.environ.get('SPORTRADAR_MAX_STALE', 7 * 86400))
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        
+        # Keep-alive connection pool and worker threads for concurrent fetches
+        self.transport = transport or transport_from_env()
+        
+        # Token buckets shared by every local process using this cache directory
+        self.rate_limiter = TokenBucketRateLimiter(
+            os.environ.get('SPORTRADAR_RATE_LIMIT_DB', os.path.join(self.cache_dir, 'rate_limit.db'))
+        )
+        self.key_id = hashlib.sha1((self.api_key or '').encode()).hexdigest()[:12]
+        
+        # Season schedules indexed by date, reloaded at most once a day
+        self.schedule_index = ScheduleIndex(os.path.join(self.cache_dir, 'schedule.db'))
+        
+        # Concurrent misses for the same cache key share one request, across threads and local processes
+        self.single_flight = SingleFlight(
+            os.environ.get('SPORTRADAR_LEASE_DB', os.path.join(self.cache_dir, 'leases.db'))
+        )
+        
+        # Transient failures are retried with backoff; endpoint families that keep failing are short-circuited
+        self.retry_policy = RetryPolicy()
+        self.breakers = CircuitBreakers()
+        
+        # Reads made under a hedging deadline get a duplicate request once they run past the family's p95
+        self.latency = LatencyTracker()
+        self.hedging = os.environ.get('SPORTRADAR_HEDGE', '1').lower() not in ('0', 'false', 'no')
+        self.hedge_min_delay = float(os.environ.get('SPORTRADAR_HEDGE_MIN_DELAY', 0.05))
+        
     def _make_request(self, url, params=None, cache_key=None, cache_ttl=3600):
         """
         Make a request to the Sportradar API with caching
         
+        Fresh cache entries are returned directly. Expired entries are returned
+        immediately as well while a background refresh fetches a new copy, so
+        callers only wait on the network when nothing is cached at all.
+        
         Args:
             url (str): Full URL for the API endpoint
             params (dict): Query parameters to include in the request
@@ -57,46 +112,306 @@ class SportradarAPI:
         Returns:
             dict: JSON response from the API
         """
-        if not params:
-            params = {}
+        # Check cache if cache_key is provided
+        if cache_key:
+            entry = self.cache.get(cache_key)
+            if entry is not None:
+                age = self.cache.age(entry)
+                if age < cache_ttl:
+                    logger.debug(f"Using cached data for {cache_key}")
+                    return entry['data']
+                
+                if age < cache_ttl + self.max_stale:
+                    logger.info(f"Serving stale data for {cache_key} while refreshing")
+                    self._refresh_in_background(url, params, cache_key, entry)
+                    if isinstance(entry['data'], dict):
+                        return dict(entry['data'], _stale=True)
+                    return entry['data']
+            
+            return self._fetch(url, params, cache_key, entry)
+        
+        return self._fetch(url, params, cache_key)
+    
+    def _fetch(self, url, params=None, cache_key=None, entry=None):
+        """
+        Fetch a payload from the network, coalescing concurrent fetches of the same cache key
+        
+        Callers in this process that miss on a key already being fetched wait for that
+        fetch. Callers in other local processes wait for the fetching process to store
+        its result in the shared cache instead of issuing their own request.
+        
+        Args:
+            url (str): Full URL for the API endpoint
+            params (dict): Query parameters to include in the request
+            cache_key (str): Key for caching the response
+            entry (dict): Expired cache entry to revalidate, if any
+            
+        Returns:
+            dict: JSON response from the API
+        """
+        if not cache_key:
+            return self._fetch_from_network(url, params)
+        
+        seen_at = entry['stored_at'] if entry is not None else 0
+        
+        def load_result():
+            # Accept anything another process stored after the copy we already had
+            stored = self.cache.backend.get(cache_key)
+            if stored is None or stored['stored_at'] <= seen_at:
+                return None
+            self.cache.memory.set(cache_key, stored)
+            return stored['data']
+        
+        # Callers waiting on someone else's fetch give up at their own request deadline
+        deadline = current_deadline()
+        try:
+            return self.single_flight.do(
+                cache_key,
+                lambda: self._fetch_from_network(url, params, cache_key, entry),
+                load_result,
+                timeout=deadline.remaining() if deadline is not None else None
+            )
+        except TimeoutError as e:
+            logger.warning(f"Request deadline passed while waiting on another fetch: {e}")
+            return self._stale_fallback(cache_key, entry)
+    
+    def _fetch_from_network(self, url, params=None, cache_key=None, entry=None):
+        """
+        Fetch a payload from the network and store it in the cache
+        
+        If an expired cache entry is given and it carries an ETag or Last-Modified
+        validator, the request is made conditional. A 304 response only refreshes the
+        entry's TTL; the cached body is reused without being downloaded again.
+        
+        Connection errors, timeouts, 429s and 5xx responses are retried with jittered
+        exponential backoff, honoring Retry-After. When the request still fails, the
+        endpoint family's circuit is open, or the request deadline set by the caller
+        (see app/api/deadline.py) has passed, the last cached payload is returned
+        marked as stale.
+        
+        Args:
+            url (str): Full URL for the API endpoint
+            params (dict): Query parameters to include in the request
+            cache_key (str): Key for caching the response
+            entry (dict): Expired cache entry to revalidate, if any
+            
+        Returns:
+            dict: JSON response from the API
+        """
+        family = self._endpoint_family(url)
+        sport = self._sport_for_url(url)
+        deadline = current_deadline()
+        breaker = self.breakers.get(family)
+        if not breaker.allow():
+            logger.warning(f"Circuit for {breaker.name} is open, skipping request to {url}")
+            return self._stale_fallback(cache_key, entry)
+        
+        params = dict(params or {})
             
         # Add API key to parameters
         params['api_key'] = self.api_key
         
-        # Check cache if cache_key is provided
-        if cache_key:
-            cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-            if os.path.exists(cache_file):
-                file_modified_time = os.path.getmtime(cache_file)
-                if time.time() - file_modified_time < cache_ttl:
-                    try:
-                        with open(cache_file, 'r') as f:
-                            logger.info(f"Using cached data for {cache_key}")
-                            return json.load(f)
-                    except Exception as e:
-                        logger.error(f"Error reading cache file: {e}")
-        
-        # Make the API request
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        
         try:
-            logger.info(f"Making API request to {url}")
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Cache the response if cache_key is provided
-            if cache_key:
-                with open(cache_file, 'w') as f:
-                    json.dump(data, f)
-                    
-            # Respect API rate limits
-            time.sleep(1)
-            
-            return data
-        except requests.exceptions.RequestException as e:
-            logger.error(f"API request failed: {e}")
-            if hasattr(e.response, 'text'):
-                logger.error(f"Response: {e.response.text}")
+            attempt = 0
+            while True:
+                retry_after = None
+                try:
+                    waited = self.rate_limiter.acquire(
+                        sport, self.key_id,
+                        max_wait=deadline.remaining() if deadline is not None else None
+                    )
+                
+                    if waited is None or (deadline is not None and deadline.expired):
+                        logger.warning(f"Request deadline passed before calling {url}")
+                        return self._stale_fallback(cache_key, entry)
+                
+                    logger.info(f"Making API request to {url}")
+                    started = time.monotonic()
+                    response = self.transport.get_hedged(
+                        url,
+                        params=params,
+                        headers=headers or None,
+                        timeout=self._timeout_for(deadline),
+                        hedge_after=self._hedge_delay(family, deadline),
+                        allow_hedge=lambda: self._take_hedge_token(sport)
+                    )
+                    self.latency.record(family, time.monotonic() - started)
+                
+                    if response.status_code == 304 and entry is not None:
+                        breaker.record_success()
+                        logger.info(f"Cached data for {cache_key} is still current")
+                        return self.cache.touch(cache_key, entry)['data']
+                
+                    if response.status_code in RETRYABLE_STATUS:
+                        retry_after = retry_after_seconds(response.headers.get('Retry-After'))
+                
+                    response.raise_for_status()
+                    data = response.json()
+                    breaker.record_success()
+                
+                    # Cache the response and its validators if cache_key is provided
+                    if cache_key:
+                        self.cache.set(
+                            cache_key,
+                            data,
+                            etag=response.headers.get('ETag'),
+                            last_modified=response.headers.get('Last-Modified')
+                        )
+                
+                    return data
+                except requests.exceptions.RequestException as e:
+                    status = e.response.status_code if e.response is not None else None
+                    if status is not None and status not in RETRYABLE_STATUS:
+                        # The endpoint answered; the request itself is bad (e.g. an unknown ID)
+                        breaker.record_success()
+                        logger.error(f"API request failed: {e}")
+                        if hasattr(e.response, 'text'):
+                            logger.error(f"Response: {e.response.text}")
+                        return None
+                
+                    delay = self.retry_policy.delay(attempt, retry_after)
+                    out_of_time = deadline is not None and delay is not None and delay >= deadline.remaining()
+                    if attempt < self.retry_policy.max_retries and delay is not None and not out_of_time:
+                        logger.warning(f"API request failed ({e}), retrying in {delay:.1f}s")
+                        time.sleep(delay)
+                        attempt += 1
+                        continue
+                
+                    logger.error(f"API request failed after {attempt + 1} attempts: {e}")
+                    breaker.record_failure(retry_after if delay is None else None)
+                    return self._stale_fallback(cache_key, entry)
+        finally:
+            # A probe that ended without a verdict must not hold the circuit half-open
+            breaker.release_probe()
+    
+    def _timeout_for(self, deadline):
+        """Get the (connect, read) timeout of a request, shortened to fit the request deadline"""
+        connect_timeout, read_timeout = self.transport.timeout
+        if deadline is None:
+            return connect_timeout, read_timeout
+        remaining = max(deadline.remaining(), 0.01)
+        return min(connect_timeout, remaining), min(read_timeout, remaining)
+    
+    def _hedge_delay(self, family, deadline):
+        """
+        Get how long to wait before hedging a request
+        
+        Args:
+            family (str): Endpoint family of the request
+            deadline (Deadline): Deadline of the current request, if any
+            
+        Returns:
+            float: The family's p95 latency, or None if the request should not be hedged
+        """
+        if not self.hedging or deadline is None or not deadline.hedge:
             return None
+        p95 = self.latency.percentile(family)
+        if p95 is None:
+            return None
+        delay = max(p95, self.hedge_min_delay)
+        return delay if delay < deadline.remaining() else None
+    
+    def _take_hedge_token(self, sport):
+        """Spend a rate limit token on a hedged request, without waiting for one"""
+        rate, burst = self.rate_limiter.limits_for(sport)
+        try:
+            return self.rate_limiter.try_acquire(f"{sport}:{self.key_id}", rate, burst) == 0
+        except sqlite3.Error as e:
+            logger.error(f"Rate limiter unavailable, not hedging: {e}")
+            return False
+    
+    def _stale_fallback(self, cache_key, entry=None):
+        """
+        Get the last cached payload for a request that could not be made
+        
+        Args:
+            cache_key (str): Key of the cached response
+            entry (dict): Cache entry already looked up by the caller, if any
+            
+        Returns:
+            dict: Copy of the cached payload with '_stale' set, or None if nothing is cached
+        """
+        if cache_key and entry is None:
+            entry = self.cache.get(cache_key)
+        if entry is None or not isinstance(entry.get('data'), dict):
+            return None
+        
+        logger.warning(f"Serving stale data for {cache_key} ({self.cache.age(entry):.0f}s old)")
+        return dict(entry['data'], _stale=True)
+    
+    def _endpoint_family(self, url):
+        """
+        Get the endpoint family a URL belongs to, e.g. 'nba:players/profile'
+        
+        IDs and dates are left out so every player profile shares one circuit breaker.
+        """
+        sport = self._sport_for_url(url)
+        path = url[len(self.base_urls.get(sport, '')):] if sport in self.base_urls else url
+        segments = [segment for segment in path.split('/') if segment]
+        if not segments:
+            return sport
+        return f"{sport}:{segments[0]}/{segments[-1].split('.')[0]}"
+    
+    def _refresh_in_background(self, url, params, cache_key, entry=None):
+        """
+        Refresh a cache entry on the transport's thread pool
+        
+        Only one refresh per cache key runs at a time in this process.
+        
+        Args:
+            url (str): Full URL for the API endpoint
+            params (dict): Query parameters to include in the request
+            cache_key (str): Key for caching the response
+            entry (dict): Expired cache entry to revalidate
+        """
+        with self._refresh_lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+        
+        def refresh():
+            try:
+                self._fetch(url, params, cache_key, entry)
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(cache_key)
+        
+        try:
+            self.transport.executor.submit(refresh)
+        except RuntimeError as e:
+            logger.error(f"Could not schedule refresh for {cache_key}: {e}")
+            with self._refresh_lock:
+                self._refreshing.discard(cache_key)
+    
+    def _sport_for_url(self, url):
+        """Get the sport code whose base URL the given URL belongs to"""
+        for sport, base_url in self.base_urls.items():
+            if url.startswith(base_url):
+                return sport
+        return 'default'
+    
+    def fetch_many(self, calls):
+        """
+        Run a batch of client calls concurrently over the pooled transport
+        
+        Args:
+            calls (iterable): Tuples of (method_name, *args), e.g. ('get_team_roster', 'nba', team_id)
+            
+        Yields:
+            tuple: (call, result) pairs as each call finishes
+        """
+        def run(method_name, *args):
+            return getattr(self, method_name)(*args)
+        
+        for call, result in self.transport.map_concurrent(run, calls):
+            yield call, result
     
     def get_daily_schedule(self, sport, date=None):
         """
@@ -199,7 +514,7 @@ class SportradarAPI:
             return None
             
         if season_year is None:
-            season_year = datetime.now().year
+            season_year = self.season_year_for(sport, datetime.now().date())
             
         # Different endpoints for different sports
         if sport == 'nba':
@@ -228,18 +543,134 @@ class SportradarAPI:
         Returns:
             list: List of upcoming games
         """
+        if days <= 0:
+            return []
+        
+        # Answer from the local season schedule index when it is available
+        start_date = datetime.now().date()
+        end_date = start_date + timedelta(days=days - 1)
+        seasons = sorted({self.season_year_for(sport, start_date), self.season_year_for(sport, end_date)})
+        
+        self._refresh_schedule_index(sport, seasons)
+        if self.schedule_index.covers(sport, seasons, start_date, end_date):
+            return self.schedule_index.games_between(sport, start_date, end_date)
+        
+        # Fall back to one daily schedule call per day
+        logger.warning(f"No {sport} season schedule indexed for {start_date} to {end_date}, fetching daily schedules")
         all_games = []
         today = datetime.now()
+        dates = [today + timedelta(days=i) for i in range(days)]
         
-        for i in range(days):
-            date = today + timedelta(days=i)
-            schedule = self.get_daily_schedule(sport, date)
-            
+        # Fetch all days concurrently, then restore date order
+        schedules = {}
+        for call, schedule in self.fetch_many(('get_daily_schedule', sport, date) for date in dates):
+            schedules[call[2]] = schedule
+        
+        for date in dates:
+            schedule = schedules.get(date)
             if schedule and 'games' in schedule:
                 all_games.extend(schedule['games'])
                 
         return all_games
     
+    def get_season_schedule(self, sport, season_year=None, season_type='REG'):
+        """
+        Get the full schedule for a season
+        
+        Args:
+            sport (str): Sport code (nba, nfl, mlb, nhl, ncaafb, ncaamb)
+            season_year (str): Season year (e.g., '2024')
+            season_type (str): Season type (PRE, REG, PST)
+            
+        Returns:
+            dict: Season schedule data
+        """
+        if sport not in self.base_urls:
+            logger.error(f"Unsupported sport: {sport}")
+            return None
+            
+        if season_year is None:
+            season_year = self.season_year_for(sport, datetime.now().date())
+            
+        url = f"{self.base_urls[sport]}/games/{season_year}/{season_type}/schedule.json"
+        cache_key = f"{sport}_season_schedule_{season_year}_{season_type}"
+        
+        return self._make_request(url, cache_key=cache_key, cache_ttl=86400)  # Cache for 24 hours
+    
+    def season_year_for(self, sport, day):
+        """
+        Get the season year a date falls in
+        
+        Seasons are named after the year they start in, so basketball and hockey games
+        played before August, and football games played before March, belong to the
+        previous year's season.
+        
+        Args:
+            sport (str): Sport code
+            day (date): Date to look up
+            
+        Returns:
+            int: Season year
+        """
+        if sport in ('nba', 'nhl', 'ncaamb'):
+            return day.year if day.month >= 8 else day.year - 1
+        if sport in ('nfl', 'ncaafb'):
+            return day.year if day.month >= 3 else day.year - 1
+        return day.year
+    
+    def _refresh_schedule_index(self, sport, seasons):
+        """
+        Load the regular and postseason schedules of the given seasons into the index,
+        at most once a day each
+        
+        Args:
+            sport (str): Sport code
+            seasons (list): Season years
+        """
+        today = datetime.now().strftime('%Y-%m-%d')
+        
+        for season_year in seasons:
+            for season_type in ('REG', 'PST'):
+                if self.schedule_index.loaded_on(sport, season_year, season_type) == today:
+                    continue
+                
+                schedule = self.get_season_schedule(sport, season_year, season_type)
+                if schedule and schedule.get('_stale'):
+                    # Served from an expired cache entry while it refreshes: index it if the
+                    # season has nothing yet, but keep checking until a fresh copy arrives
+                    if self.schedule_index.loaded_on(sport, season_year, season_type) is None:
+                        self.schedule_index.load(sport, season_year, season_type, schedule, mark_loaded=False)
+                elif schedule:
+                    self.schedule_index.load(sport, season_year, season_type, schedule)
+                else:
+                    # Postseason schedules are not published until late in the season
+                    self.schedule_index.mark_checked(sport, season_year, season_type)
+    
+    def get_team_season_stats(self, sport, team_id, season_year=None, season_type='REG'):
+        """
+        Get season statistics for a team and every player on it
+        
+        Args:
+            sport (str): Sport code (nba, nfl, mlb, nhl, ncaafb, ncaamb)
+            team_id (str): Team ID
+            season_year (str): Season year (e.g., '2024')
+            season_type (str): Season type (PRE, REG, PST)
+            
+        Returns:
+            dict: Team statistics data including a 'players' list
+        """
+        if sport not in self.base_urls:
+            logger.error(f"Unsupported sport: {sport}")
+            return None
+            
+        if season_year is None:
+            season_year = self.season_year_for(sport, datetime.now().date())
+            
+        url = f"{self.base_urls[sport]}/seasons/{season_year}/{season_type}/teams/{team_id}/statistics.json"
+        cache_key = f"{sport}_team_{team_id}_stats_{season_year}_{season_type}"
+        
+        return self._make_request(url, cache_key=cache_key, cache_ttl=86400)  # Cache for 24 hours
+    
     def get_player_stats(self, sport, player_id, season_year=None):
         """
         Get season stats for a player
@@ -257,7 +688,7 @@ class SportradarAPI:
             return None
             
         if season_year is None:
-            season_year = datetime.now().year
+            season_year = self.season_year_for(sport, datetime.now().date())
             
         url = f"{self.base_urls[sport]}/seasons/{season_year}/REG/players/{player_id}/statistics.json"
         cache_key = f"{sport}_player_{player_id}_stats_{season_year}"
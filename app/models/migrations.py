@@ -0,0 +1,213 @@
+"""
+Versioned schema migrations for databases created before a model change.
+
+db.create_all() builds new tables with every constraint and index declared on the
+models, but never alters tables that already exist. Each migration below brings an
+existing database up to one schema version; the versions applied are recorded in the
+schema_version table. Migrations are idempotent, so they are also safe on fresh
+databases.
+
+    FLASK_APP=run.py flask migrate-db
+"""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import UniqueConstraint, inspect, text
+
+from app.models.prediction import Prediction, ActualResult, PerformanceSummary, PREDICTION_KEY
+from app.models.performance import rebuild_performance_summary
+
+logger = logging.getLogger('migrations')
+
+def _has_key(inspector, table, columns):
+    """Whether a table has a unique index or constraint on exactly these columns"""
+    keys = [tuple(index['column_names']) for index in inspector.get_indexes(table) if index.get('unique')]
+    keys += [tuple(constraint['column_names']) for constraint in inspector.get_unique_constraints(table)]
+    return tuple(columns) in keys
+
+def _ensure_unique_key(conn, table, columns, name):
+    """
+    Add a unique key to a table created without it
+
+    Duplicate rows are removed first, keeping the most recent one of each key.
+    """
+    inspector = inspect(conn)
+    if not inspector.has_table(table) or _has_key(inspector, table, columns):
+        return
+
+    column_list = ', '.join(columns)
+    conn.execute(text(
+        f"DELETE FROM {table} WHERE id NOT IN (SELECT MAX(id) FROM {table} GROUP BY {column_list})"
+    ))
+    conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {table} ({column_list})"))
+
+def _create_indexes(conn, model):
+    """Create the indexes declared on a model that the table does not have yet"""
+    if not inspect(conn).has_table(model.__tablename__):
+        return
+    for index in model.__table__.indexes:
+        index.create(conn, checkfirst=True)
+
+def add_prediction_key(conn):
+    _ensure_unique_key(conn, 'prediction', PREDICTION_KEY, 'uq_prediction_player_game_stat')
+
+def add_query_indexes(conn):
+    _create_indexes(conn, Prediction)
+    _ensure_unique_key(conn, 'actual_result', PREDICTION_KEY, 'uq_actual_result_player_game_stat')
+
+def add_performance_summary(conn):
+    PerformanceSummary.__table__.create(conn, checkfirst=True)
+    if inspect(conn).has_table('prediction') and inspect(conn).has_table('actual_result'):
+        rebuild_performance_summary(conn)
+
+# (version, description, function); append new migrations, never reorder or edit applied ones
+MIGRATIONS = [
+    (1, 'Unique (player_id, game_id, stat_type) key on prediction', add_prediction_key),
+    (2, 'Query indexes on prediction and unique key on actual_result', add_query_indexes),
+    (3, 'Performance summary table, backfilled from settled predictions', add_performance_summary),
+]
+
+def applied_versions(conn):
+    """
+    Get the schema versions applied to a database
+
+    Args:
+        conn: SQLAlchemy connection
+
+    Returns:
+        set: Applied versions
+    """
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, "
+        "description VARCHAR(200) NOT NULL, applied_at TIMESTAMP NOT NULL)"
+    ))
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_version"))}
+
+def migrate(engine):
+    """
+    Apply every pending migration, each in its own transaction
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Database to migrate
+
+    Returns:
+        list: Versions applied by this call
+    """
+    with engine.begin() as conn:
+        applied = applied_versions(conn)
+
+    newly_applied = []
+    for version, description, migration in MIGRATIONS:
+        if version in applied:
+            continue
+        logger.info(f"Applying schema migration {version}: {description}")
+        with engine.begin() as conn:
+            # Index builds on large tables may outlast the regular statement timeout
+            if conn.dialect.name == 'postgresql':
+                conn.execute(text("SET LOCAL statement_timeout = 0"))
+            migration(conn)
+            conn.execute(text(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (:version, :description, :now)"
+            ), {'version': version, 'description': description, 'now': datetime.utcnow()})
+        newly_applied.append(version)
+
+    return newly_applied
+
+def pending_migrations(engine):
+    """
+    Get the migrations not yet applied to a database
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Database to check
+
+    Returns:
+        list: (version, description) of each pending migration
+    """
+    with engine.begin() as conn:
+        applied = applied_versions(conn)
+    return [(version, description) for version, description, _ in MIGRATIONS if version not in applied]
+
+def migrate_at_startup(engine, apply=True):
+    """
+    Bring the schema up to date when the application starts
+
+    Tables created by db.create_all() on an existing database are empty until their
+    migration backfills them (the performance summary in particular), so pending
+    migrations are applied here rather than left for `flask migrate-db`. When applying
+    is disabled or fails, each pending migration is logged as an error instead.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Database to migrate
+        apply (bool): Apply pending migrations, or only report them
+
+    Returns:
+        list: Versions applied by this call
+    """
+    try:
+        if apply:
+            applied = migrate(engine)
+            if applied:
+                logger.info(f"Applied schema migrations: {', '.join(str(version) for version in applied)}")
+            return applied
+    except Exception as e:
+        logger.error(f"Error applying schema migrations: {e}")
+
+    try:
+        pending = pending_migrations(engine)
+    except Exception as e:
+        logger.error(f"Error checking schema migrations: {e}")
+        return []
+
+    for version, description in pending:
+        logger.error(f"Schema migration {version} ({description}) is not applied; run `flask migrate-db`")
+    return []
+
+def missing_indexes(engine):
+    """
+    Find the indexes and unique keys declared on the models that the database lacks
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Database to check
+
+    Returns:
+        list: (table, index name, columns) for each missing index
+    """
+    inspector = inspect(engine)
+    missing = []
+
+    for model in (Prediction, ActualResult):
+        table = model.__table__
+        if not inspector.has_table(table.name):
+            continue
+        existing = {tuple(index['column_names']) for index in inspector.get_indexes(table.name)}
+        existing |= {tuple(constraint['column_names']) for constraint in inspector.get_unique_constraints(table.name)}
+
+        declared = [(index.name, tuple(column.name for column in index.columns)) for index in table.indexes]
+        declared += [
+            (constraint.name, tuple(column.name for column in constraint.columns))
+            for constraint in table.constraints if isinstance(constraint, UniqueConstraint)
+        ]
+        missing += [(table.name, name, columns) for name, columns in declared if columns not in existing]
+
+    return missing
+
+def check_indexes(engine):
+    """
+    Log a warning for every declared index the database lacks
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Database to check
+
+    Returns:
+        list: The missing indexes, as returned by missing_indexes()
+    """
+    try:
+        missing = missing_indexes(engine)
+    except Exception as e:
+        logger.error(f"Error checking database indexes: {e}")
+        return []
+
+    for table, name, columns in missing:
+        logger.warning(f"Missing index {name} on {table} ({', '.join(columns)}); run `flask migrate-db`")
+    return missing
@@ -0,0 +1,219 @@
+"""
+Incrementally maintained prediction performance summary.
+
+The performance_summary table holds, for each (sport, stat type, confidence, game
+date), how many predictions have an actual result and how many of them called
+over/under correctly. Whenever the session flushes actual results (or predictions),
+the groups they belong to are recounted inside the same transaction, so the
+performance endpoints only roll up summary rows instead of joining the whole history.
+
+Bulk SQL writes bypass the session. upsert_predictions() and bulk_import_predictions()
+recount the groups they touch themselves; other bulk writers collect settled_groups()
+before the write and pass them, with the groups after it, to
+refresh_performance_summary() in the same transaction. To resync the table after
+writing results by hand, run:
+
+    FLASK_APP=run.py flask rebuild-performance
+"""
+
+import logging
+from datetime import datetime
+from itertools import chain
+
+from sqlalchemy import and_, case, delete, event, func, inspect, insert, select, tuple_
+
+from app.models.prediction import db, Prediction, ActualResult, PerformanceSummary, PREDICTION_KEY
+from app.models.sqlite_profile import ReadRoutingSession
+
+logger = logging.getLogger('performance')
+
+# Columns of a summary group, taken from the prediction
+PERFORMANCE_GROUP = ('sport', 'stat_type', 'confidence', 'game_date')
+
+# Groups or keys per IN list, well below SQLite's bound parameter limit
+CHUNK_SIZE = 200
+
+def _chunks(values):
+    values = list(values)
+    for i in range(0, len(values), CHUNK_SIZE):
+        yield values[i:i + CHUNK_SIZE]
+
+def _group_columns():
+    return [getattr(Prediction, column) for column in PERFORMANCE_GROUP]
+
+def _settled_counts(groups=None):
+    """Count settled and correct predictions per group, optionally only for some groups"""
+    # Correct when the over/under call (over_probability > 0.5) matches the result
+    correct = case(
+        (and_(Prediction.over_probability > 0.5, ActualResult.actual_value > Prediction.line), 1),
+        (and_(Prediction.over_probability <= 0.5, ActualResult.actual_value <= Prediction.line), 1),
+        else_=0
+    )
+    stmt = select(
+        *_group_columns(),
+        func.count().label('total'),
+        func.sum(correct).label('correct')
+    ).join_from(
+        Prediction, ActualResult,
+        and_(*(getattr(ActualResult, column) == getattr(Prediction, column) for column in PREDICTION_KEY))
+    ).group_by(*_group_columns())
+
+    if groups is not None:
+        stmt = stmt.where(tuple_(*_group_columns()).in_(groups))
+    return stmt
+
+def _write_counts(conn, stmt):
+    """Insert the summary rows of a _settled_counts() statement"""
+    now = datetime.utcnow()
+    rows = [
+        dict(zip(PERFORMANCE_GROUP, row[:4]), total=row.total, correct=row.correct or 0, updated_at=now)
+        for row in conn.execute(stmt)
+    ]
+    if rows:
+        conn.execute(insert(PerformanceSummary.__table__), rows)
+    return len(rows)
+
+def groups_for_results(conn, keys):
+    """
+    Find the summary groups of the predictions behind some actual results
+
+    Args:
+        conn: SQLAlchemy connection
+        keys (iterable): (player_id, game_id, stat_type) keys
+
+    Returns:
+        set: (sport, stat_type, confidence, game_date) groups
+    """
+    key_columns = tuple_(*(getattr(Prediction, column) for column in PREDICTION_KEY))
+    groups = set()
+    for chunk in _chunks(keys):
+        stmt = select(*_group_columns()).where(key_columns.in_(chunk)).distinct()
+        groups.update(tuple(row) for row in conn.execute(stmt))
+    return groups
+
+def settled_groups(conn, keys=None, where=None):
+    """
+    Find the summary groups of predictions that have an actual result
+
+    Args:
+        conn: SQLAlchemy connection
+        keys (iterable): Only predictions with these (player_id, game_id, stat_type) keys
+        where: Only predictions matching this SQL expression on Prediction columns
+
+    Returns:
+        set: (sport, stat_type, confidence, game_date) groups
+    """
+    stmt = select(*_group_columns()).join_from(
+        Prediction, ActualResult,
+        and_(*(getattr(ActualResult, column) == getattr(Prediction, column) for column in PREDICTION_KEY))
+    ).distinct()
+    if where is not None:
+        stmt = stmt.where(where)
+    if keys is None:
+        return {tuple(row) for row in conn.execute(stmt)}
+
+    key_columns = tuple_(*(getattr(Prediction, column) for column in PREDICTION_KEY))
+    groups = set()
+    for chunk in _chunks(keys):
+        groups.update(tuple(row) for row in conn.execute(stmt.where(key_columns.in_(chunk))))
+    return groups
+
+def refresh_performance_summary(conn, groups):
+    """
+    Recount summary groups from their predictions and actual results
+
+    Args:
+        conn: SQLAlchemy connection, inside the transaction that changed the data
+        groups (iterable): (sport, stat_type, confidence, game_date) groups to recount
+
+    Returns:
+        int: Number of summary rows written; groups left without results are removed
+    """
+    table = PerformanceSummary.__table__
+    group_columns = tuple_(*(table.c[column] for column in PERFORMANCE_GROUP))
+    written = 0
+    for chunk in _chunks(groups):
+        conn.execute(delete(table).where(group_columns.in_(chunk)))
+        written += _write_counts(conn, _settled_counts(chunk))
+    return written
+
+def rebuild_performance_summary(conn):
+    """
+    Recount every summary group from the full prediction history
+
+    Args:
+        conn: SQLAlchemy connection
+
+    Returns:
+        int: Number of summary rows written
+    """
+    conn.execute(delete(PerformanceSummary.__table__))
+    written = _write_counts(conn, _settled_counts())
+    logger.info(f"Rebuilt performance summary: {written} groups")
+    return written
+
+def _values(obj, columns):
+    """Current values of some columns and, if the pending flush changed them, the previous ones"""
+    state = inspect(obj)
+    current = tuple(getattr(obj, column) for column in columns)
+    previous = tuple(
+        state.attrs[column].history.deleted[0] if state.attrs[column].history.deleted else value
+        for column, value in zip(columns, current)
+    )
+    return {current, previous}
+
+@event.listens_for(ReadRoutingSession, 'after_flush')
+def _refresh_after_flush(session, flush_context):
+    """Recount the summary groups touched by a flush, in the flush's transaction"""
+    result_keys = set()
+    groups = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, ActualResult):
+            result_keys |= _values(obj, PREDICTION_KEY)
+        elif isinstance(obj, Prediction):
+            groups |= _values(obj, PERFORMANCE_GROUP)
+
+    if not result_keys and not groups:
+        return
+
+    conn = session.connection()
+    groups |= groups_for_results(conn, result_keys)
+    refresh_performance_summary(conn, groups)
+
+def performance_totals(sport=None, date_from=None, date_to=None):
+    """
+    Roll up the summary rows matching some filters
+
+    Args:
+        sport (str): Only this sport
+        date_from (date): First game date
+        date_to (date): Last game date
+
+    Returns:
+        dict: 'total' and 'correct' counts overall, plus the same counts by
+            'confidence' level and by 'sport'
+    """
+    stmt = select(
+        PerformanceSummary.sport,
+        PerformanceSummary.confidence,
+        func.sum(PerformanceSummary.total),
+        func.sum(PerformanceSummary.correct)
+    ).group_by(PerformanceSummary.sport, PerformanceSummary.confidence)
+
+    if sport:
+        stmt = stmt.where(PerformanceSummary.sport == sport)
+    if date_from:
+        stmt = stmt.where(PerformanceSummary.game_date >= date_from)
+    if date_to:
+        stmt = stmt.where(PerformanceSummary.game_date <= date_to)
+
+    totals = {'total': 0, 'correct': 0, 'confidence': {}, 'sport': {}}
+    for row_sport, confidence, total, correct in db.session.execute(stmt):
+        for counts in (
+            totals,
+            totals['confidence'].setdefault(confidence, {'total': 0, 'correct': 0}),
+            totals['sport'].setdefault(row_sport, {'total': 0, 'correct': 0})
+        ):
+            counts['total'] += total
+            counts['correct'] += correct
+    return totals
@@ -1,14 +1,31 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects import postgresql, sqlite
+import io
 import os
+import csv
 from datetime import datetime
 import json
+from app.models.sqlite_profile import ReadRoutingSession
 
-# Initialize SQLAlchemy
-db = SQLAlchemy()
+# Initialize SQLAlchemy; reads of GET requests go to the read-only engine when there is one
+db = SQLAlchemy(session_options={'class_': ReadRoutingSession})
+
+# Natural key of a prediction: one per player, game and stat type
+PREDICTION_KEY = ('player_id', 'game_id', 'stat_type')
 
 class Prediction(db.Model):
     """Model for storing predictions"""
+    __table_args__ = (
+        db.UniqueConstraint(*PREDICTION_KEY, name='uq_prediction_player_game_stat'),
+        # Listing filters: sport and date range, confidence and date range, one game
+        db.Index('ix_prediction_sport_game_date', 'sport', 'game_date'),
+        db.Index('ix_prediction_confidence_game_date', 'confidence', 'game_date'),
+        db.Index('ix_prediction_game_id', 'game_id'),
+        # A player's predictions for one stat, newest first
+        db.Index('ix_prediction_player_stat_game_date', 'player_id', 'stat_type', 'game_date'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     player_name = db.Column(db.String(100), nullable=False)
     player_id = db.Column(db.String(100), nullable=False)
@@ -39,8 +56,132 @@ class Prediction(db.Model):
                 return []
         return []
 
+def upsert_rows(conn, table, key, rows, chunk_size=1000):
+    """
+    Insert rows, updating the existing ones with the same key
+    
+    Rows are written with INSERT ... ON CONFLICT DO UPDATE, one executemany per chunk,
+    inside the caller's transaction. id and created_at are kept on update.
+    
+    Args:
+        conn: SQLAlchemy connection (SQLite or PostgreSQL)
+        table (sqlalchemy.Table): Table to write
+        key (tuple): Columns of the table's unique key
+        rows (list): Column values by name, the same columns in every row
+        chunk_size (int): Rows per statement execution
+        
+    Returns:
+        int: Number of rows written
+    """
+    # A key may only appear once per statement, so the last row of each key wins
+    rows = list({tuple(row[column] for column in key): row for row in rows}.values())
+    if not rows:
+        return 0
+    
+    inserts = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+    if conn.dialect.name not in inserts:
+        raise ValueError(f"Upserts are not supported on {conn.dialect.name}")
+    
+    stmt = inserts[conn.dialect.name](table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(key),
+        set_={
+            column: stmt.excluded[column] for column in rows[0]
+            if column not in key and column not in ('id', 'created_at')
+        }
+    )
+    
+    for i in range(0, len(rows), chunk_size):
+        conn.execute(stmt, rows[i:i + chunk_size])
+    return len(rows)
+
+def _settled_keys(rows):
+    return [tuple(row[column] for column in PREDICTION_KEY) for row in rows]
+
+def upsert_predictions(conn, rows, chunk_size=1000):
+    """
+    Insert predictions, updating the existing ones with the same player, game and stat type
+    
+    Performance summary groups of predictions that already have an actual result are
+    recounted in the same transaction.
+    
+    Args:
+        conn: SQLAlchemy connection
+        rows (list): Column values by name, the same columns in every row
+        chunk_size (int): Rows per statement execution
+        
+    Returns:
+        int: Number of predictions written
+    """
+    from app.models.performance import settled_groups, refresh_performance_summary
+    
+    keys = _settled_keys(rows)
+    groups = settled_groups(conn, keys)
+    written = upsert_rows(conn, Prediction.__table__, PREDICTION_KEY, rows, chunk_size)
+    refresh_performance_summary(conn, groups | settled_groups(conn, keys))
+    return written
+
+def bulk_import_predictions(conn, rows):
+    """
+    Bulk-load predictions, updating the existing ones with the same player, game and stat type
+    
+    On PostgreSQL (psycopg2) the rows are streamed with COPY into a temporary staging
+    table and merged with a single INSERT ... SELECT ... ON CONFLICT. Other backends
+    fall back to upsert_predictions(). Either way, the performance summary groups of
+    already settled predictions are recounted in the same transaction.
+    
+    Args:
+        conn: SQLAlchemy connection
+        rows (list): Column values by name, the same columns in every row
+        
+    Returns:
+        int: Number of predictions written
+    """
+    rows = list({tuple(row[column] for column in PREDICTION_KEY): row for row in rows}.values())
+    if not rows:
+        return 0
+    
+    cursor = conn.connection.dbapi_connection.cursor() if conn.dialect.name == 'postgresql' else None
+    if cursor is None or not hasattr(cursor, 'copy_expert'):
+        return upsert_predictions(conn, rows)
+    
+    from app.models.performance import settled_groups, refresh_performance_summary
+    
+    keys = _settled_keys(rows)
+    groups = settled_groups(conn, keys)
+    
+    columns = [column for column in rows[0] if column != 'id']
+    column_list = ', '.join(columns)
+    updates = ', '.join(
+        f"{column} = EXCLUDED.{column}" for column in columns
+        if column not in PREDICTION_KEY and column != 'created_at'
+    )
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(['\\N' if row[column] is None else row[column] for column in columns])
+    buffer.seek(0)
+    
+    try:
+        cursor.execute(
+            f"CREATE TEMP TABLE prediction_import ON COMMIT DROP AS SELECT {column_list} FROM prediction WITH NO DATA"
+        )
+        cursor.copy_expert(f"COPY prediction_import ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+        cursor.execute(
+            f"INSERT INTO prediction ({column_list}) SELECT {column_list} FROM prediction_import "
+            f"ON CONFLICT (player_id, game_id, stat_type) DO UPDATE SET {updates}"
+        )
+    finally:
+        cursor.close()
+    
+    refresh_performance_summary(conn, groups | settled_groups(conn, keys))
+    return len(rows)
+
 class ActualResult(db.Model):
     """Model for storing actual results"""
+    __table_args__ = (db.UniqueConstraint(*PREDICTION_KEY, name='uq_actual_result_player_game_stat'),)
+    
     id = db.Column(db.Integer, primary_key=True)
     player_name = db.Column(db.String(100), nullable=False)
     player_id = db.Column(db.String(100), nullable=False)
@@ -53,6 +194,29 @@ class ActualResult(db.Model):
     def __repr__(self):
         return f'<ActualResult {self.player_name} {self.stat_type}>'
 
+class PerformanceSummary(db.Model):
+    """Model for storing settled prediction counts by sport, stat type, confidence and game date"""
+    sport = db.Column(db.String(50), primary_key=True)
+    stat_type = db.Column(db.String(50), primary_key=True)
+    confidence = db.Column(db.String(20), primary_key=True)
+    game_date = db.Column(db.Date, primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    correct = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<PerformanceSummary {self.sport} {self.stat_type} {self.confidence} {self.game_date}>'
+
+class GameFingerprint(db.Model):
+    """Model for storing the digest of the inputs a game's predictions were last built from"""
+    game_id = db.Column(db.String(100), primary_key=True)
+    sport = db.Column(db.String(50), nullable=False)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<GameFingerprint {self.game_id}>'
+
 class Game(db.Model):
     """Model for storing game information"""
     id = db.Column(db.String(100), primary_key=True)
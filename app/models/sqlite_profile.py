@@ -0,0 +1,114 @@
+"""
+SQLite performance profile, applied to every connection an engine opens.
+
+WAL lets readers keep reading while the pipeline writes, busy_timeout makes writers
+wait for each other instead of failing with "database is locked", and the cache and
+mmap sizes keep hot pages in memory. Read-only engines (used for GET requests) also
+set query_only, so a read can never take the write lock.
+
+Every pragma can be tuned through an environment variable:
+
+    SQLITE_JOURNAL_MODE=WAL SQLITE_SYNCHRONOUS=NORMAL SQLITE_BUSY_TIMEOUT=5000
+    SQLITE_CACHE_SIZE=-65536 SQLITE_MMAP_SIZE=268435456
+"""
+
+import os
+import logging
+
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql import Select
+
+logger = logging.getLogger('sqlite_profile')
+
+# Bind key of the read-only engine that serves GET requests
+READONLY_BIND = 'readonly'
+
+def sqlite_pragmas(read_only=False):
+    """
+    Get the pragmas of the profile
+
+    Args:
+        read_only (bool): Pragmas for a read-only connection
+
+    Returns:
+        list: (name, value) pairs, in the order they are applied
+    """
+    pragmas = [
+        ('busy_timeout', int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))),
+        ('cache_size', int(os.environ.get('SQLITE_CACHE_SIZE', -65536))),
+        ('mmap_size', int(os.environ.get('SQLITE_MMAP_SIZE', 268435456))),
+        ('temp_store', 'MEMORY')
+    ]
+    if read_only:
+        pragmas.append(('query_only', 'ON'))
+    else:
+        # The journal mode is stored in the database file, so only writers set it
+        pragmas.insert(0, ('journal_mode', os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')))
+        pragmas.append(('synchronous', os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')))
+    return pragmas
+
+def apply_sqlite_profile(engine, read_only=False):
+    """
+    Apply the profile to every new connection of an engine; other databases are left alone
+
+    Args:
+        engine (sqlalchemy.engine.Engine): The engine
+        read_only (bool): Whether the engine only serves reads
+
+    Returns:
+        sqlalchemy.engine.Engine: The engine
+    """
+    if engine.dialect.name != 'sqlite' or engine.url.database in (None, '', ':memory:'):
+        return engine
+
+    pragmas = sqlite_pragmas(read_only)
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+    return engine
+
+def readonly_url(url):
+    """
+    Get the read-only variant of a SQLite file URL
+
+    Args:
+        url (str): SQLite database URL
+
+    Returns:
+        str: URL opening the same file with mode=ro, or None for other databases
+    """
+    url = make_url(url)
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return None
+    path = os.path.abspath(url.database)
+    return f"sqlite:///file:{path}?mode=ro&uri=true"
+
+class ReadRoutingSession(Session):
+    """
+    Session that sends the SELECTs of GET and HEAD requests to the read-only engine
+
+    Flushes and any other statement keep using the model's regular engine.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and isinstance(clause, Select)
+            and has_request_context()
+            and request.method in ('GET', 'HEAD')
+        ):
+            engine = self._db.engines.get(READONLY_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -7,7 +7,9 @@ from datetime import datetime, timedelta
 # Add the app directory to the path
 sys.path.append('/home/ubuntu/sports_predictor_web')
 from app.api.live_data_pipeline import LiveDataPipeline
-from app.models.prediction import db, Prediction, ActualResult
+from app.api.deadline import with_deadline
+from app.models.prediction import db, Prediction
+from app.models.performance import performance_totals
 
 # Configure logging
 logging.basicConfig(
@@ -53,6 +55,7 @@ def update_predictions():
         }), 500
 
 @api_bp.route('/upcoming_games', methods=['GET'])
+@with_deadline()
 def get_upcoming_games():
     """
     Endpoint to get upcoming games from Sportradar API
@@ -179,39 +182,26 @@ def get_performance():
         date_from = request.args.get('date_from')
         date_to = request.args.get('date_to')
         
-        # Build query to join predictions with actual results
-        query = db.session.query(
-            Prediction, ActualResult
-        ).join(
-            ActualResult, 
-            (Prediction.player_id == ActualResult.player_id) & 
-            (Prediction.game_id == ActualResult.game_id) & 
-            (Prediction.stat_type == ActualResult.stat_type)
-        )
-        
-        if sport:
-            query = query.filter(Prediction.sport == sport)
-        
+        date_from_obj = None
         if date_from:
             try:
                 date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
-                query = query.filter(Prediction.game_date >= date_from_obj)
             except ValueError:
                 pass
         
+        date_to_obj = None
         if date_to:
             try:
                 date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
-                query = query.filter(Prediction.game_date <= date_to_obj)
             except ValueError:
                 pass
         
-        # Execute query
-        results = query.all()
+        # Roll up the performance summary instead of joining every settled prediction
+        totals = performance_totals(sport=sport, date_from=date_from_obj, date_to=date_to_obj)
         
         # Calculate performance metrics
-        total_predictions = len(results)
-        correct_predictions = 0
+        total_predictions = totals['total']
+        correct_predictions = totals['correct']
         high_confidence_total = 0
         high_confidence_correct = 0
         medium_confidence_total = 0
@@ -219,44 +209,18 @@ def get_performance():
         low_confidence_total = 0
         low_confidence_correct = 0
         
-        sport_performance = {}
-        
-        for pred, actual in results:
-            # Determine if prediction was correct
-            actual_value = actual.actual_value
-            line = pred.line
-            predicted_over = pred.over_probability > 0.5
-            actual_over = actual_value > line
-            
-            is_correct = (predicted_over == actual_over)
-            
-            if is_correct:
-                correct_predictions += 1
-            
-            # Track by confidence level
-            if pred.confidence == 'High':
-                high_confidence_total += 1
-                if is_correct:
-                    high_confidence_correct += 1
-            elif pred.confidence == 'Medium':
-                medium_confidence_total += 1
-                if is_correct:
-                    medium_confidence_correct += 1
+        for confidence, counts in totals['confidence'].items():
+            if confidence == 'High':
+                high_confidence_total += counts['total']
+                high_confidence_correct += counts['correct']
+            elif confidence == 'Medium':
+                medium_confidence_total += counts['total']
+                medium_confidence_correct += counts['correct']
             else:  # Low
-                low_confidence_total += 1
-                if is_correct:
-                    low_confidence_correct += 1
-            
-            # Track by sport
-            if pred.sport not in sport_performance:
-                sport_performance[pred.sport] = {
-                    'total': 0,
-                    'correct': 0
-                }
-            
-            sport_performance[pred.sport]['total'] += 1
-            if is_correct:
-                sport_performance[pred.sport]['correct'] += 1
+                low_confidence_total += counts['total']
+                low_confidence_correct += counts['correct']
+        
+        sport_performance = totals['sport']
         
         # Calculate accuracy percentages
         overall_accuracy = (correct_predictions / total_predictions) * 100 if total_predictions > 0 else 0
@@ -305,6 +269,7 @@ def get_performance():
         }), 500
 
 @api_bp.route('/player/<player_id>', methods=['GET'])
+@with_deadline(hedge=True)
 def get_player_details(player_id):
     """
     Endpoint to get player details from Sportradar API
@@ -343,6 +308,7 @@ def get_player_details(player_id):
         }), 500
 
 @api_bp.route('/game/<game_id>', methods=['GET'])
+@with_deadline(hedge=True)
 def get_game_details(game_id):
     """
     Endpoint to get game details from Sportradar API
@@ -29,8 +29,7 @@ def get_dates():
 @main_bp.route('/api/performance')
 def get_performance():
     """API endpoint to get performance metrics"""
-    from sqlalchemy import func
-    from app.models.prediction import ActualResult
+    from app.models.performance import performance_totals
     
     # Get date range from query parameters
     days = request.args.get('days', 30, type=int)
@@ -39,30 +38,17 @@ def get_performance():
     # Get sport filter
     sport = request.args.get('sport', None)
     
-    # Base query
-    query = Prediction.query.join(ActualResult)
+    # Roll up the performance summary rows in the range
+    totals = performance_totals(sport=sport, date_from=start_date.date())
     
-    # Apply filters
-    if sport:
-        query = query.filter(Prediction.sport == sport)
-    query = query.filter(Prediction.date >= start_date)
-    
-    # Get total predictions
-    total = query.count()
-    
-    # Get correct predictions (over/under)
-    correct = query.filter(
-        ((Prediction.over_probability > 0.5) & (ActualResult.result == 'over')) | 
-        ((Prediction.over_probability <= 0.5) & (ActualResult.result == 'under'))
-    ).count()
+    # Get total and correct predictions (over/under)
+    total = totals['total']
+    correct = totals['correct']
     
     # Get high confidence predictions
-    high_conf = query.filter(Prediction.confidence == 'High').count()
-    high_conf_correct = query.filter(
-        (Prediction.confidence == 'High') & 
-        (((Prediction.over_probability > 0.5) & (ActualResult.result == 'over')) | 
-         ((Prediction.over_probability <= 0.5) & (ActualResult.result == 'under')))
-    ).count()
+    high = totals['confidence'].get('High', {'total': 0, 'correct': 0})
+    high_conf = high['total']
+    high_conf_correct = high['correct']
     
     # Calculate accuracy
     accuracy = (correct / total) * 100 if total > 0 else 0
@@ -71,22 +57,13 @@ def get_performance():
     # Get performance by sport
     sport_performance = []
     if not sport:
-        sports = Prediction.query.with_entities(Prediction.sport).distinct().all()
-        for s in sports:
-            sport_name = s[0]
-            sport_query = query.filter(Prediction.sport == sport_name)
-            sport_total = sport_query.count()
-            if sport_total > 0:
-                sport_correct = sport_query.filter(
-                    ((Prediction.over_probability > 0.5) & (ActualResult.result == 'over')) | 
-                    ((Prediction.over_probability <= 0.5) & (ActualResult.result == 'under'))
-                ).count()
-                sport_accuracy = (sport_correct / sport_total) * 100
+        for sport_name, counts in sorted(totals['sport'].items()):
+            if counts['total'] > 0:
                 sport_performance.append({
                     'sport': sport_name,
-                    'total': sport_total,
-                    'correct': sport_correct,
-                    'accuracy': sport_accuracy
+                    'total': counts['total'],
+                    'correct': counts['correct'],
+                    'accuracy': (counts['correct'] / counts['total']) * 100
                 })
     
     return jsonify({
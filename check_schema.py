@@ -1,15 +1,15 @@
-import sqlite3
+from sqlalchemy import inspect
 
-# Connect to the database
-conn = sqlite3.connect('app.db')
-cursor = conn.cursor()
+from app.models.database import make_engine
+
+# Connect to the database (DATABASE_URL, or the default SQLite file)
+engine = make_engine()
 
 # Get table info
-cursor.execute("PRAGMA table_info(prediction)")
-columns = cursor.fetchall()
+columns = inspect(engine).get_columns('prediction')
 
 print("Prediction table schema:")
-for col in columns:
-    print(f"Column {col[0]}: {col[1]} ({col[2]})")
+for i, col in enumerate(columns):
+    print(f"Column {i}: {col['name']} ({col['type']})")
 
-conn.close()
+engine.dispose()
@@ -29,7 +29,7 @@ WEB_APP_PATH = '.'
 PREDICTIONS_OUTPUT_DIR = os.path.join(PREDICTOR_PATH, 'output', 'predictions')
 WEB_APP_VENV = os.path.join(WEB_APP_PATH, 'venv', 'bin', 'python')
 
-def run_predictor(mode='predict', sport=None, date=None):
+def run_predictor(mode='predict', sport=None, date=None, served=False):
     """
     Run the neural network sports predictor with specified parameters.
     
@@ -37,12 +37,30 @@ def run_predictor(mode='predict', sport=None, date=None):
         mode: Operation mode (collect, train, predict, full)
         sport: Sport to process (default: all)
         date: Date to process in YYYY-MM-DD format (default: today)
+        served: In predict mode, score today's predictions with the live data pipeline
+            on the model server (MODEL_SERVER_SOCKET) instead of the predictor. The
+            server must be started with PREDICTOR_MODEL naming the predictor's model
+            factory, or it scores with the placeholder model
     
     Returns:
         True if successful, False otherwise
     """
     logger.info(f"Running predictor in {mode} mode")
     
+    # Only on request: the model server scores with its own model (PREDICTOR_MODEL),
+    # not the predictor's
+    if mode == 'predict' and served:
+        if date:
+            logger.error("--served only predicts today's games; drop --date")
+            return False
+        if not os.environ.get('MODEL_SERVER_SOCKET'):
+            logger.error("--served requires MODEL_SERVER_SOCKET to point at a running model server")
+            return False
+        if not os.environ.get('PREDICTOR_MODEL'):
+            logger.warning("PREDICTOR_MODEL is not set; unless the model server was started with it, "
+                           "--served predictions come from the placeholder model")
+        return run_served_predictions(sport)
+    
     # Build command
     cmd = [sys.executable, os.path.join(PREDICTOR_PATH, 'main.py'), f'--mode={mode}']
     
@@ -63,6 +81,33 @@ def run_predictor(mode='predict', sport=None, date=None):
         logger.error(f"Stderr: {e.stderr}")
         return False
 
+def run_served_predictions(sport=None):
+    """
+    Generate predictions with the live data pipeline, scored by the model server.
+    
+    The model stays loaded in the server, so this skips the predictor's startup and
+    model load. Predictions are saved to the database and written as JSON files to
+    the predictions output directory.
+    
+    Args:
+        sport: Sport to process (default: all)
+    
+    Returns:
+        True if successful, False otherwise
+    """
+    from app.api.live_data_pipeline import LiveDataPipeline
+    
+    try:
+        pipeline = LiveDataPipeline()
+        if sport:
+            pipeline.supported_sports = [sport]
+        count = pipeline.run_pipeline()
+        logger.info(f"Generated {count} predictions through the model server")
+        return True
+    except Exception as e:
+        logger.error(f"Error generating predictions through the model server: {e}")
+        return False
+
 def import_predictions_to_webapp():
     """
     Import predictions from the neural network output to the web application database.
@@ -194,6 +239,11 @@ def main():
     parser.add_argument('--date', type=str, default=None,
                         help='Date to process in YYYY-MM-DD format (default: today)')
     
+    parser.add_argument('--served', action='store_true',
+                        help='In predict mode, score with the model server at MODEL_SERVER_SOCKET instead of the predictor. '
+                             'Start the server with PREDICTOR_MODEL=package.module:factory returning the '
+                             'predictor model; without it the server scores with the placeholder model')
+    
     args = parser.parse_args()
     
     # Create logs directory if it doesn't exist
@@ -205,7 +255,7 @@ def main():
     elif args.mode == 'train':
         success = run_predictor(mode='train', sport=args.sport, date=args.date)
     elif args.mode == 'predict':
-        success = run_predictor(mode='predict', sport=args.sport, date=args.date)
+        success = run_predictor(mode='predict', sport=args.sport, date=args.date, served=args.served)
     elif args.mode == 'import':
         success = import_predictions_to_webapp()
     elif args.mode == 'full':
@@ -13,7 +13,8 @@ import schedule
 from datetime import datetime, timedelta
 import requests
 from app import create_app, db
-from app.models.prediction import Prediction
+from app.models.prediction import Prediction, GameFingerprint
+from app.models.performance import settled_groups, refresh_performance_summary
 from app.api.sportradar_client import SportradarAPI
 from app.api.live_data_pipeline import LiveDataPipeline
 
@@ -29,9 +30,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger('data_pipeline')
 
-def run_pipeline():
+# Days of upcoming games each run covers
+DAYS_AHEAD = int(os.environ.get('PIPELINE_DAYS_AHEAD', 7))
+
+def run_pipeline(pipeline=None, full=False):
     """
     Run the data pipeline to fetch live data and update predictions.
+    
+    Args:
+        pipeline (LiveDataPipeline): Pipeline to run, reused between scheduled runs. Created if None.
+        full (bool): Recompute every game instead of only games whose inputs changed
     """
     logger.info("Starting data pipeline run")
     
@@ -40,50 +48,43 @@ def run_pipeline():
         app = create_app()
         with app.app_context():
             # Initialize the live data pipeline
-            pipeline = LiveDataPipeline()
-            
-            # Fetch data for all major sports
-            sports = ['nba', 'nfl', 'mlb', 'nhl', 'soccer']
+            pipeline = pipeline or LiveDataPipeline()
             
-            for sport in sports:
-                logger.info(f"Processing {sport.upper()} data")
-                try:
-                    # Fetch live data
-                    data = pipeline.fetch_data(sport)
-                    
-                    # Generate predictions
-                    predictions = pipeline.generate_predictions(data, sport)
-                    
-                    # Save predictions to database
-                    count = pipeline.save_predictions(predictions)
-                    
-                    logger.info(f"Successfully processed {count} predictions for {sport.upper()}")
-                except Exception as e:
-                    logger.error(f"Error processing {sport} data: {str(e)}")
+            # Fetch games, rosters and stats for every supported sport and save new predictions
+            count = pipeline.run_pipeline(days_ahead=DAYS_AHEAD, incremental=not full)
+            logger.info(f"Successfully processed {count} predictions")
             
-            # Clean up old predictions (older than 30 days)
+            # Clean up old predictions and fingerprints (older than 30 days)
             thirty_days_ago = datetime.now().date() - timedelta(days=30)
-            old_predictions = Prediction.query.filter(Prediction.date < thirty_days_ago).all()
-            for pred in old_predictions:
-                db.session.delete(pred)
+            old = Prediction.game_date < thirty_days_ago
+            groups = settled_groups(db.session.connection(), where=old)
+            deleted = Prediction.query.filter(old).delete()
+            refresh_performance_summary(db.session.connection(), groups)
+            GameFingerprint.query.filter(GameFingerprint.updated_at < thirty_days_ago).delete()
             db.session.commit()
-            logger.info(f"Cleaned up {len(old_predictions)} old predictions")
+            logger.info(f"Cleaned up {deleted} old predictions")
             
             logger.info("Data pipeline run completed successfully")
     except Exception as e:
         logger.error(f"Error in data pipeline: {str(e)}")
 
-def schedule_pipeline():
+def schedule_pipeline(full=False):
     """
     Schedule the data pipeline to run every 10 minutes.
+    
+    Args:
+        full (bool): Recompute every game on the first run instead of only changed games
     """
     logger.info("Starting scheduled data pipeline")
     
+    # One pipeline for every run keeps its client caches warm
+    pipeline = LiveDataPipeline()
+    
     # Run immediately on startup
-    run_pipeline()
+    run_pipeline(pipeline, full=full)
     
-    # Schedule to run every 10 minutes
-    schedule.every(10).minutes.do(run_pipeline)
+    # Schedule to run every 10 minutes; unchanged games are skipped
+    schedule.every(10).minutes.do(run_pipeline, pipeline)
     
     logger.info("Pipeline scheduled to run every 10 minutes")
     
@@ -98,13 +99,15 @@ def main():
     
     parser.add_argument('--schedule', action='store_true',
                         help='Run the pipeline on a schedule (every 10 minutes)')
+    parser.add_argument('--full', action='store_true',
+                        help='Recompute every game, not only games whose inputs changed')
     
     args = parser.parse_args()
     
     if args.schedule:
-        schedule_pipeline()
+        schedule_pipeline(full=args.full)
     else:
-        run_pipeline()
+        run_pipeline(full=args.full)
 
 if __name__ == '__main__':
     main()
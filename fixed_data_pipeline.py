@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 import requests
 import json
 import random
+import hashlib
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -108,6 +109,27 @@ class LiveDataPipeline:
         self.api = SportradarAPI()
         self.output_dir = 'output/predictions'
         os.makedirs(self.output_dir, exist_ok=True)
+        
+        # Digest of the data each sport's predictions were last generated from
+        # (kept outside output/predictions so the import command does not pick it up)
+        self.fingerprints_file = 'output/fingerprints.json'
+        self.fingerprints = self._load_fingerprints()
+    
+    def _load_fingerprints(self):
+        """Load the fingerprints recorded by earlier runs"""
+        try:
+            with open(self.fingerprints_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_fingerprints(self):
+        """Record the current fingerprints"""
+        try:
+            with open(self.fingerprints_file, 'w') as f:
+                json.dump(self.fingerprints, f, indent=2)
+        except OSError as e:
+            logger.error(f"Error saving fingerprints: {e}")
     
     def run_pipeline(self):
         """Run the complete data pipeline"""
@@ -129,11 +151,20 @@ class LiveDataPipeline:
             # Fetch data from API
             data = self.api.fetch_data(sport, 'games/schedule')
             
+            # Skip the sport if its data is unchanged since its predictions were written
+            fingerprint = hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()
+            filename = os.path.join(self.output_dir, f"{sport}_predictions.json")
+            if self.fingerprints.get(sport) == fingerprint and os.path.exists(filename):
+                logger.info(f"{sport.upper()} data unchanged, keeping existing predictions")
+                return
+            
             # Generate predictions
             predictions = self.generate_predictions(sport, data)
             
             # Save predictions
-            self.save_predictions(sport, predictions)
+            if self.save_predictions(sport, predictions):
+                self.fingerprints[sport] = fingerprint
+                self._save_fingerprints()
         except Exception as e:
             logger.error(f"Error processing {sport} data: {e}")
     
@@ -226,7 +257,7 @@ class LiveDataPipeline:
         """Save predictions to JSON file"""
         if not predictions:
             logger.warning(f"No predictions generated for {sport}")
-            return
+            return False
         
         filename = os.path.join(self.output_dir, f"{sport}_predictions.json")
         
@@ -234,8 +265,10 @@ class LiveDataPipeline:
             with open(filename, 'w') as f:
                 json.dump(predictions, f, indent=2)
             logger.info(f"Saved {len(predictions)} predictions for {sport} to {filename}")
+            return True
         except Exception as e:
             logger.error(f"Error saving predictions for {sport}: {e}")
+            return False
     
     def cleanup_old_predictions(self):
         """Remove predictions older than 30 days"""
@@ -1,36 +1,24 @@
 import os
 import json
-import sqlite3
 from datetime import datetime
 
-# Connect to the database
-conn = sqlite3.connect('app.db')
-cursor = conn.cursor()
+from sqlalchemy import delete
 
-# Create predictions table if it doesn't exist
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS prediction (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    player TEXT,
-    team TEXT,
-    opponent TEXT,
-    sport TEXT,
-    date DATE,
-    stat TEXT,
-    predicted_value FLOAT,
-    over_probability FLOAT,
-    line FLOAT,
-    confidence TEXT,
-    confidence_score FLOAT,
-    prediction_range_low FLOAT,
-    prediction_range_high FLOAT,
-    top_factors TEXT
-)
-''')
+from app.models.database import make_engine
+from app.models.prediction import db, Prediction, bulk_import_predictions
+from app.models.performance import settled_groups, refresh_performance_summary
 
-# Clear existing predictions
-cursor.execute('DELETE FROM prediction')
-conn.commit()
+# Connect to the database (DATABASE_URL, or the default SQLite file)
+engine = make_engine()
+
+# Create the prediction, actual result and performance summary tables if they don't exist
+db.metadata.create_all(engine)
+
+# Clear existing predictions, and the performance summary counts of the settled ones
+with engine.begin() as conn:
+    groups = settled_groups(conn)
+    conn.execute(delete(Prediction.__table__))
+    refresh_performance_summary(conn, groups)
 
 # Generate mock predictions
 sports = ['NBA', 'NFL', 'MLB', 'NHL', 'SOCCER']
@@ -79,88 +67,59 @@ import random
 from datetime import datetime, timedelta
 
 # Current date
-today = datetime.now().strftime("%Y-%m-%d")
-tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+today = datetime.now().date()
+tomorrow = (datetime.now() + timedelta(days=1)).date()
+now = datetime.utcnow()
+
+factors = ["Recent performance", "Team matchup", "Home court advantage", 
+          "Rest days", "Injury status", "Historical performance"]
+
+def mock_prediction(sport, player, stat, game_date):
+    """Generate a random prediction row for a player and stat on one date"""
+    predicted_value = round(random.uniform(10, 30), 1)
+    over_probability = round(random.uniform(0.3, 0.7), 2)
+    line = round(random.uniform(8, 25), 1)
+    confidence_score = round(random.uniform(30, 95), 1)
+    
+    if confidence_score > 80:
+        confidence = "High"
+    elif confidence_score > 60:
+        confidence = "Medium"
+    else:
+        confidence = "Low"
+    
+    teams = sorted([player["team"], player["opponent"]])
+    return {
+        'player_name': player["name"],
+        'player_id': f"mock-{sport}-{player['name']}",
+        'team': player["team"],
+        'opponent': player["opponent"],
+        'game_date': game_date,
+        'game_id': f"mock-{sport}-{teams[0]}-{teams[1]}-{game_date.isoformat()}",
+        'sport': sport,
+        'stat_type': stat,
+        'predicted_value': predicted_value,
+        'over_probability': over_probability,
+        'line': line,
+        'confidence': confidence,
+        'top_factors': json.dumps(random.sample(factors, 3)),
+        'created_at': now,
+        'updated_at': now
+    }
+
+# Generate predictions for today and tomorrow (with different values)
+rows = [
+    mock_prediction(sport, player, stat, game_date)
+    for sport in sports
+    for player in players[sport]
+    for stat in stats[sport]
+    for game_date in (today, tomorrow)
+]
 
-# Insert predictions
-for sport in sports:
-    for player in players[sport]:
-        for stat in stats[sport]:
-            # Generate random values
-            predicted_value = round(random.uniform(10, 30), 1)
-            over_probability = round(random.uniform(0.3, 0.7), 2)
-            line = round(random.uniform(8, 25), 1)
-            confidence_score = round(random.uniform(30, 95), 1)
-            
-            if confidence_score > 80:
-                confidence = "High"
-            elif confidence_score > 60:
-                confidence = "Medium"
-            else:
-                confidence = "Low"
-            
-            range_low = round(predicted_value * random.uniform(0.8, 0.95), 1)
-            range_high = round(predicted_value * random.uniform(1.05, 1.2), 1)
-            
-            factors = ["Recent performance", "Team matchup", "Home court advantage", 
-                      "Rest days", "Injury status", "Historical performance"]
-            top_factors = "|".join(random.sample(factors, 3))
-            
-            # Insert for today
-            cursor.execute('''
-            INSERT INTO prediction (
-                player, team, opponent, sport, date, stat, 
-                predicted_value, over_probability, line, 
-                confidence, confidence_score, 
-                prediction_range_low, prediction_range_high, 
-                top_factors
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                player["name"], player["team"], player["opponent"], 
-                sport, today, stat,
-                predicted_value, over_probability, line,
-                confidence, confidence_score,
-                range_low, range_high,
-                top_factors
-            ))
-            
-            # Insert for tomorrow (with different values)
-            predicted_value = round(random.uniform(10, 30), 1)
-            over_probability = round(random.uniform(0.3, 0.7), 2)
-            line = round(random.uniform(8, 25), 1)
-            confidence_score = round(random.uniform(30, 95), 1)
-            
-            if confidence_score > 80:
-                confidence = "High"
-            elif confidence_score > 60:
-                confidence = "Medium"
-            else:
-                confidence = "Low"
-            
-            range_low = round(predicted_value * random.uniform(0.8, 0.95), 1)
-            range_high = round(predicted_value * random.uniform(1.05, 1.2), 1)
-            
-            top_factors = "|".join(random.sample(factors, 3))
-            
-            cursor.execute('''
-            INSERT INTO prediction (
-                player, team, opponent, sport, date, stat, 
-                predicted_value, over_probability, line, 
-                confidence, confidence_score, 
-                prediction_range_low, prediction_range_high, 
-                top_factors
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                player["name"], player["team"], player["opponent"], 
-                sport, tomorrow, stat,
-                predicted_value, over_probability, line,
-                confidence, confidence_score,
-                range_low, range_high,
-                top_factors
-            ))
+# Load them in one bulk import (COPY on PostgreSQL)
+with engine.begin() as conn:
+    bulk_import_predictions(conn, rows)
 
-# Commit changes and close connection
-conn.commit()
-conn.close()
+engine.dispose()
 
 print("Successfully imported predictions into the database!")
@@ -10,12 +10,38 @@ def init_db():
         db.create_all()
         print('Database initialized.')
 
+@app.cli.command('migrate-db')
+def migrate_db():
+    """Apply pending schema migrations (constraints and indexes) to the database."""
+    from app.models.migrations import migrate, missing_indexes
+    
+    with app.app_context():
+        applied = migrate(db.engine)
+        if applied:
+            print(f"Applied schema migrations: {', '.join(str(version) for version in applied)}")
+        else:
+            print('Database schema is up to date')
+        
+        for table, name, columns in missing_indexes(db.engine):
+            print(f"Still missing index {name} on {table} ({', '.join(columns)})")
+
+@app.cli.command('rebuild-performance')
+def rebuild_performance():
+    """Recount the performance summary from every prediction with an actual result."""
+    from app.models.performance import rebuild_performance_summary
+    
+    with app.app_context():
+        groups = rebuild_performance_summary(db.session.connection())
+        db.session.commit()
+        print(f'Rebuilt performance summary: {groups} groups')
+
 @app.cli.command('import-predictions')
 def import_predictions():
     """Import predictions from the neural sports predictor output."""
     import os
     import json
     from datetime import datetime
+    from app.models.prediction import bulk_import_predictions
     
     predictor_output_dir = 'output/predictions'
     
@@ -30,8 +56,10 @@ def import_predictions():
             print('No JSON files found in directory')
             return
         
+        now = datetime.utcnow()
+        rows = []
+        
         # Process each file
-        imported_count = 0
         for filename in json_files:
             file_path = os.path.join(predictor_output_dir, filename)
             
@@ -55,66 +83,59 @@ def import_predictions():
             
             # Process predictions
             for pred_data in data:
-                # Check if prediction already exists
-                existing = Prediction.query.filter_by(
-                    player=pred_data.get('player'),
-                    date=date,
-                    stat=pred_data.get('stat')
-                ).first()
+                # Prefer the prediction's own sport and date over the filename's
+                pred_sport = (pred_data.get('sport') or sport).lower()
+                try:
+                    game_date = datetime.strptime(pred_data['date'], '%Y-%m-%d').date()
+                except (KeyError, TypeError, ValueError):
+                    game_date = date
                 
-                if existing:
-                    # Update existing prediction
-                    existing.team = pred_data.get('team', '')
-                    existing.opponent = pred_data.get('opponent', '')
-                    existing.predicted_value = pred_data.get('predicted_value', 0.0)
-                    existing.over_probability = pred_data.get('over_probability', 0.5)
-                    existing.line = pred_data.get('line')
-                    existing.confidence = pred_data.get('confidence', 'Medium')
-                    existing.confidence_score = pred_data.get('confidence_score', 50.0)
-                    
-                    # Handle prediction range
-                    pred_range = pred_data.get('prediction_range')
-                    if pred_range and len(pred_range) == 2:
-                        existing.prediction_range_low = pred_range[0]
-                        existing.prediction_range_high = pred_range[1]
-                    
-                    # Handle top factors
-                    top_factors = pred_data.get('top_factors')
-                    if top_factors:
-                        existing.top_factors = '|'.join(top_factors)
-                else:
-                    # Create new prediction
-                    new_prediction = Prediction(
-                        player=pred_data.get('player', ''),
-                        team=pred_data.get('team', ''),
-                        opponent=pred_data.get('opponent', ''),
-                        sport=sport,
-                        date=date,
-                        stat=pred_data.get('stat', ''),
-                        predicted_value=pred_data.get('predicted_value', 0.0),
-                        over_probability=pred_data.get('over_probability', 0.5),
-                        line=pred_data.get('line'),
-                        confidence=pred_data.get('confidence', 'Medium'),
-                        confidence_score=pred_data.get('confidence_score', 50.0)
-                    )
-                    
-                    # Handle prediction range
-                    pred_range = pred_data.get('prediction_range')
-                    if pred_range and len(pred_range) == 2:
-                        new_prediction.prediction_range_low = pred_range[0]
-                        new_prediction.prediction_range_high = pred_range[1]
-                    
-                    # Handle top factors
-                    top_factors = pred_data.get('top_factors')
-                    if top_factors:
-                        new_prediction.top_factors = '|'.join(top_factors)
-                    
-                    db.session.add(new_prediction)
-                    imported_count += 1
-            
-            db.session.commit()
+                player = pred_data.get('player', '')
+                team = pred_data.get('team', '')
+                opponent = pred_data.get('opponent', '')
+                
+                # Files without IDs get stable ones, so importing them again updates
+                # the same predictions
+                game_id = pred_data.get('game_id') or f"{pred_sport}-{game_date}-" + '-'.join(sorted([team, opponent]))
+                
+                rows.append({
+                    'player_name': player,
+                    'player_id': pred_data.get('player_id') or f"{pred_sport}-{team}-{player}",
+                    'team': team,
+                    'opponent': opponent,
+                    'game_date': game_date,
+                    'game_id': game_id,
+                    'sport': pred_sport,
+                    'stat_type': pred_data.get('stat', ''),
+                    'predicted_value': pred_data.get('predicted_value', 0.0),
+                    'over_probability': pred_data.get('over_probability', 0.5),
+                    'line': pred_data.get('line') or 0.0,
+                    'confidence': pred_data.get('confidence', 'Medium'),
+                    'top_factors': json.dumps(pred_data.get('top_factors') or []),
+                    'created_at': now,
+                    'updated_at': now
+                })
+        
+        # One bulk load on (player_id, game_id, stat_type) for every file, in a single transaction
+        imported_count = bulk_import_predictions(db.session.connection(), rows)
+        db.session.commit()
         
         print(f'Successfully imported {imported_count} predictions')
 
+@app.cli.command('migrate-cache')
+def migrate_cache():
+    """Move one-file-per-key Sportradar cache entries into the SQLite cache store."""
+    import os
+    from app.api.sportradar_client import SportradarAPI
+    from app.api.response_cache import SQLiteCacheBackend
+    
+    api = SportradarAPI()
+    if not isinstance(api.cache.backend, SQLiteCacheBackend):
+        print('SPORTRADAR_CACHE_BACKEND is not sqlite, nothing to migrate')
+        return
+    
+    imported = api.cache.backend.import_file_cache(api.cache_dir, remove=True)
+    print(f'Migrated {imported} cache files into {api.cache.backend.db_path}')
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', debug=True)